@@ -0,0 +1,172 @@
+'''
+Comments:
+Offline benchmark of the gesture pipeline. Replays a recorded video file or a directory of images through
+Model.process_frame() for the events of a mode from mode_controller.json, without the Camera, View or GUI.
+The trigger functions of the events are replaced by no-ops, so no gesture event handlers (mouse, keyboard, etc.)
+are ever created or called. Reports frames per second, the latency distribution of every module and peak RSS.
+
+Usage: python benchmark.py <video file or image directory> [--mode MODE] [--warmup N] [--max-frames N] [--output FILE]
+'''
+import argparse
+import os
+import sys
+from collections import Counter
+from time import perf_counter
+from typing import Callable, Iterator, Optional
+
+import cv2
+import numpy as np
+
+from scripts.core.model import Model
+from scripts.event_mapper import EventMapper
+from scripts.tools.json_editors.mode_editor import ModeEditor
+from scripts.tools.latency_metrics import LatencyRecorder
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+class NullEventHandlers:
+    """Stands in for GestureEventHandlers, every trigger function only counts how often it was called"""
+
+    def __init__(self) -> None:
+        self.triggered = Counter()  # dict: "<handler> <function>" -> number of calls
+
+    def get_handler_func(self, handler_name: str, func_name: str) -> Callable:
+        name = f"{handler_name} {func_name}"
+
+        def trigger(*args, **kwargs) -> None:
+            self.triggered[name] += 1
+        return trigger
+
+
+def read_frames(source: str) -> Iterator[np.ndarray]:
+    """Yields the frames of a video file, or the images of a directory in name order.
+    The frames are yielded as recorded, like the Camera reads them, as the landmark detectors do the mirroring.
+
+    :param source: path of the video file or image directory
+    :type source: str
+    :raises RuntimeError: if the source cannot be read
+    """
+    if os.path.isdir(source):
+        names = sorted(name for name in os.listdir(source) if name.lower().endswith(IMAGE_EXTENSIONS))
+        if not names:
+            raise RuntimeError("Attempt to benchmark a directory without any images: " + source)
+        for name in names:
+            image = cv2.imread(os.path.join(source, name))
+            if image is None:
+                raise RuntimeError("Attempt to read an invalid image: " + name)
+            yield image
+        return
+
+    capture = cv2.VideoCapture(source)
+    if not capture.isOpened():
+        raise RuntimeError("Attempt to benchmark a video that cannot be opened: " + source)
+    try:
+        while True:
+            success, image = capture.read()
+            if not success:
+                return
+            yield image
+    finally:
+        capture.release()
+
+
+def get_peak_rss_mb() -> Optional[float]:
+    """
+    :return: peak resident set size of this process in MB, or None if it cannot be measured on this platform
+    :rtype: Optional[float]
+    """
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def benchmark(source: str, mode: str, warmup: int, max_frames: Optional[int]) -> LatencyRecorder:
+    """Runs the frames of the source through a Model with the events of the given mode.
+
+    :param source: path of the video file or image directory
+    :type source: str
+    :param mode: name of the mode in mode_controller.json
+    :type mode: str
+    :param warmup: number of frames processed before the measurements start
+    :type warmup: int
+    :param max_frames: maximum number of measured frames, all frames of the source if None
+    :type max_frames: Optional[int]
+    :raises RuntimeError: if the mode does not exist or the source has no frames after the warm-up
+    :return: recorded latencies of every stage
+    :rtype: LatencyRecorder
+    """
+    modes = ModeEditor().get_data("modes")
+    if mode not in modes:
+        raise RuntimeError("Attempt to benchmark a mode that does not exist: " + mode)
+
+    # keep every measurement, so the percentiles are over the whole run. Not enabled during the warm-up.
+    recorder = LatencyRecorder(enabled=False, window_size=max_frames or 1000000)
+    handlers = NullEventHandlers()
+    model = Model(recorder)
+    EventMapper(handlers).switch_events_in_model(model, set(), modes[mode])
+    print(f"Mode: {mode}, modules: {', '.join(sorted(model.get_module_names()))}")
+
+    measured = 0
+    total_time = 0
+    start = perf_counter()
+    try:
+        for frame_nr, image in enumerate(read_frames(source)):
+            if frame_nr == warmup:
+                recorder.set_enabled(True)
+                start = perf_counter()
+            if frame_nr < warmup:
+                model.process_frame(image)
+                continue
+            frame_start = perf_counter()
+            model.process_frame(image)
+            frame_time = perf_counter() - frame_start
+            recorder.record("process_frame", frame_time * 1000)
+            total_time += frame_time
+            measured += 1
+            if max_frames is not None and measured >= max_frames:
+                break
+        wall_time = perf_counter() - start
+    finally:
+        model.close()
+
+    if measured == 0:
+        raise RuntimeError("Attempt to benchmark a source with no frames after the warm-up: " + source)
+    peak_rss = get_peak_rss_mb()
+    print(f"Frames: {measured} (after {warmup} warm-up frames)")
+    print(f"FPS: {measured / total_time:.2f} processing only, {measured / wall_time:.2f} including decoding")
+    print(f"Peak RSS: {f'{peak_rss:.1f} MB' if peak_rss is not None else 'not available on this platform'}")
+    print(f"{'stage':<32}" + "".join(f"{field:>10}" for field in ("mean", "p50", "p95", "p99", "max")) + " (ms)")
+    for stage, summary in recorder.get_summary().items():
+        print(f"{stage:<32}" + "".join(f"{summary[field]:>10.2f}" for field in ("mean", "p50", "p95", "p99", "max")))
+    if handlers.triggered:
+        print("Triggered: " + ", ".join(f"{name} x{count}" for name, count in sorted(handlers.triggered.items())))
+    return recorder
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the gesture pipeline on a recorded video or image directory.')
+    parser.add_argument('source', type=str,
+                        help='Video file or directory of images to replay.')
+    parser.add_argument('--mode', type=str, default=None,
+                        help='Mode from mode_controller.json. Default: the current mode')
+    parser.add_argument('--warmup', type=int, default=10,
+                        help='Number of frames processed before measuring. Default: 10')
+    parser.add_argument('--max-frames', type=int, default=None,
+                        help='Maximum number of measured frames. Default: all frames')
+    parser.add_argument('--output', type=str, default=None,
+                        help='Also write the latencies to a .csv or .json file.')
+    args = parser.parse_args()
+
+    mode = args.mode or ModeEditor().get_data("current_mode")
+    recorder = benchmark(args.source, mode, args.warmup, args.max_frames)
+    if args.output:
+        print(f"Latencies written to {recorder.write(args.output)}")
+
+
+if __name__ == "__main__":
+    main()
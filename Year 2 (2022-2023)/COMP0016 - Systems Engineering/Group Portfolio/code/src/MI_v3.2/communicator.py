@@ -24,7 +24,7 @@ ERRORS = {
     "illegal_config_operation": "The request you made cannot be performed on the config file"
 }
 CONTROL_COMMANDS = ("START", "STOP", "END", "SHOW",
-                    "HIDE", "REBOOT", "CURRENT_STATE")
+                    "HIDE", "REBOOT", "CURRENT_STATE", "METRICS", "READY")
 SPEECH_ON_SUFFIX = "_speech"
 
 events_editor = api.events_editor()
@@ -62,7 +62,9 @@ class Communicator:
             "RECORD": self._process_record_request,
             # "HEATMAP": self._process_heatmap_request,
             "CALIBRATE_MODULE": self._process_calibration_request,
-            "SPEECH": self._process_speech_request
+            "SPEECH": self._process_speech_request,
+            "METRICS": self._get_metrics,
+            "READY": self._get_readiness
         }
         self.operation = None
         self.request = None
@@ -119,10 +121,10 @@ class Communicator:
 
     @staticmethod
     def _reboot():
-        api.stop()
+        duration = api.stop()
         api.start()
-        log.info("Communicator: Rebooted")
-        return "Rebooted"
+        log.info(f"Communicator: Rebooted (stopped in {duration:.0f} ms)")
+        return f"Rebooted (stopped in {duration:.0f} ms)"
 
 
     @staticmethod
@@ -134,9 +136,9 @@ class Communicator:
 
     @staticmethod
     def _stop():
-        api.stop()
+        duration = api.stop()
         log.info("Communicator: MI Stopped")
-        return "MI Stopped"
+        return f"MI Stopped in {duration:.0f} ms"
 
 
     @staticmethod
@@ -156,6 +158,23 @@ class Communicator:
         return "Inactive"
 
 
+    @staticmethod
+    def _get_metrics(path: Optional[str] = None):
+        """METRICS returns the latency of each stage of the frame loop, METRICS: <path> writes it to a .csv or .json file"""
+        if path:
+            return f"Latency metrics written to {api.write_latency_metrics(path.strip())}"
+        metrics = api.get_latency_metrics()
+        if not metrics:
+            return "No latency metrics recorded"
+        return metrics
+
+
+    @staticmethod
+    def _get_readiness():
+        """READY returns the state of the modules being pre-initialized and the time until the first frame was processed"""
+        return api.get_readiness()
+
+
     @staticmethod
     def _hide():
         api.hide_view()
@@ -168,12 +187,6 @@ class Communicator:
         return "View shown"
 
 
-    @staticmethod
-    def _reboot():
-        api.stop()
-        api.start()
-
-
     @staticmethod
     def _change_mode(mode: str):
         api.change_mode(mode)
@@ -182,8 +195,8 @@ class Communicator:
 
     @staticmethod
     def _calibrate_module(module: str, params: Optional[Any] = None):
-        api.calibrate_module(module, params)
-        return f"Calibrated module: {module}"
+        duration = api.calibrate_module(module, params)
+        return f"Calibrated module: {module} in {duration:.0f} ms"
 
 
     def _process_calibration_request(self, request: str):
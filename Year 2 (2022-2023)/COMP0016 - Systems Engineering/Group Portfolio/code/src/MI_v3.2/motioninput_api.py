@@ -8,19 +8,26 @@ This is the starting point of MI
 import os
 import subprocess
 import time
-from threading import Lock
-from typing import Set
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from threading import Lock, Thread
+from typing import Any, Callable, Dict, Optional, Set
+
+import numpy as np
 
 # Local
 from scripts.tools.logger import logger_config, logger_stop
 from scripts.tools import zeromq_client
 from scripts import *
+from scripts.frame_pipeline import FramePipeline
+from scripts.tools.latency_metrics import LatencyMetrics
+from scripts.tools.startup_profiler import StartupProfiler
+from scripts.tools.json_editors.json_editor import flush_pending_saves
 
 # TODO: KeyboardListener currently not used 
 #from scripts.tools.keyboard_listener import KeyboardListener
 
 # TODO: Custom gestures currently not used 
-from scripts.tools.customize_gesture_recorder import CustomizeGestureRecorder
+# the CustomizeGestureRecorder is imported by record_gesture(), as it loads the hand and body modules
 # from scripts.tools.gesture_recorder import GestureRecorder
 # from scripts.tools.heat_map import HeatMap
 
@@ -30,13 +37,22 @@ log = logger_config(file_name = 'data/logging/MI_logs.log', config = Config())
 
 
 
+# bodypart types in events.json that are not the name of their module
+BODYPART_TYPE_MODULES = {"dom_hand": "hand", "off_hand": "hand"}
+
+STOP_TIMEOUT = 10.0  # seconds stop() waits for the main thread to stop MI
+CALIBRATION_TIMEOUT = 300.0  # seconds calibrate_module() waits, calibrations may wait for the user
+FRAME_TIMEOUT = 0.1  # seconds the main thread waits for a new frame before drawing the last one and handling the keys again
+
+
 class MotionInputAPI:
     _lock = Lock()
     _mode_editor = ModeEditor()
     _gestures_editor = GestureEditor(get_primitives=False)
     _events_editor = EventEditor()
     _config_editor = Config().get_editor()
-    _customize_gesture_recorder = CustomizeGestureRecorder()
+    _customize_gesture_recorder = None  # created on the first record_gesture()
+    _latency_metrics = LatencyMetrics()
     # TODO: KeyboardListener
     #_keyboard_listener = KeyboardListener()
     #_keyboard_listener.start()
@@ -45,18 +61,19 @@ class MotionInputAPI:
     _view_hidden = False
     _model = None
     _mode_controller = None
+    _pipeline = None  # set only if the frame loop is pipelined (general/pipelined_frame_loop)
     _change_camera = False
-    _calibrating = None
-    _calibrating_params = None
+    # OpenCV does not like multithreading, so everything that interacts with the OpenCV window (stopping MI closes it,
+    # calibrations may open it) is requested by the communicator thread and done by the main thread in run()
+    _calibration_request = None  # (name of the module, params, Future completed once calibrated)
+    _stop_request = None  # Future completed once MI has stopped
     _active = False
-    _stop_next_iteration = False  # as the view needs to be closed by the main thread and not the communicator thread we use this little hack (:
-    _modules = {
-        "hand": HandModule,
-        "speech": SpeechModule,
-        "body": BodyModule,
-        "head": HeadModule,
-        "eye": EyeModule
-    }
+    _modules = MODULES  # the module classes are imported on first use
+    # dict: name of the module -> "initializing", "ready" or "failed", for the modules pre-initialized in the background
+    _module_readiness = {}
+    _readiness_lock = Lock()
+    _start_time = None  # perf_counter() when start() was last called
+    _time_to_first_frame = None  # ms from start() until the first processed frame was displayed
     _welcome_msg = WelcomeMsg()
     # TODO: Custom gestures - Heatmap
     # _heatmap = HeatMap()
@@ -69,14 +86,61 @@ class MotionInputAPI:
         Calls the pre-initialization method on all given modules. 
         This performs all of the time consuming setup of the Module before initialization.
         If is not called, then all the setup is done when the Modules are first initialized. 
+        Returns straight away, the modules are pre-initialized (and warmed up) concurrently in the background, see get_readiness().
+        start() also does this for the modules of the current mode.
         :param names: set of module names ("hand"/"speech"/"body"/"head"/"eye")
         :type names: Set[str]
         """
         with cls._lock:
             if cls._active:
                 raise RuntimeError("Cannot pre-initialize modules. MI is already running")
-            for name in names:
-                cls._modules[name].pre_initialize()
+            cls._pre_initialize_in_background(names)
+
+
+    @classmethod
+    def _pre_initialize_in_background(cls, names: Set[str]) -> None:
+        """Pre-initializes each of the modules on its own thread, each followed by a warm-up inference on a blank frame.
+        Modules initialized (e.g. by start()) while this is running wait for it and then use the warmed up landmark detector.
+        """
+        camera_config = cls._config_editor.get_data("general/camera")
+        warm_up_frame = np.zeros((camera_config["camera_h"], camera_config["camera_w"], 3), np.uint8)
+        for name in names:
+            with cls._readiness_lock:
+                if cls._module_readiness.get(name) == "initializing":
+                    continue
+                cls._module_readiness[name] = "initializing"
+            Thread(target=cls._pre_initialize_module, args=(name, warm_up_frame), name=f"pre_initialize_{name}", daemon=True).start()
+
+
+    @classmethod
+    def _pre_initialize_module(cls, name: str, warm_up_frame: np.ndarray) -> None:
+        try:
+            module_class = cls._modules[name]
+            with StartupProfiler().measure("pre_initialize", f"module {name}"):
+                module_class.pre_initialize(warm_up_frame)
+            state = "ready"
+        except Exception as error:
+            log.exception(f"Failed to pre-initialize the {name} module: {error}")
+            state = "failed"
+        with cls._readiness_lock:
+            cls._module_readiness[name] = state
+
+
+    @classmethod
+    def _get_current_mode_module_names(cls) -> Set[str]:
+        """
+        :return: names of the modules used by the events of the current mode, read from the JSONs without loading the events
+        :rtype: Set[str]
+        """
+        events = cls._events_editor.get_all_data()
+        modes = cls._mode_editor.get_data("modes")
+        current_mode = cls._mode_editor.get_data("current_mode")
+        names = set()
+        for event_name in modes.get(current_mode, ()):
+            if event_name not in events: continue
+            for bodypart_type in events[event_name]["bodypart_names_to_type"].values():
+                names.add(BODYPART_TYPE_MODULES.get(bodypart_type, bodypart_type))
+        return {name for name in names if name in cls._modules}
 
 
     @classmethod
@@ -88,8 +152,15 @@ class MotionInputAPI:
         with cls._lock:
             if cls._active:
                 raise RuntimeError("MI is already running")
+            cls._start_time = time.perf_counter()
+            cls._time_to_first_frame = None
+            # the modules load their ML models while the camera is being opened
+            cls._pre_initialize_in_background(cls._get_current_mode_module_names())
             cls._camera = Camera()
-            cls._model = Model()
+            cls._model = Model(cls._latency_metrics)
+            # the metrics only describe the current run
+            cls._latency_metrics.reset()
+            cls._latency_metrics.start_writer()
 
             # Start zeromq client thread if it is enabled in the config file
             if cls._config_editor.get_data("general/zeromq_client_enabled"):
@@ -105,8 +176,13 @@ class MotionInputAPI:
             # cls._gesture_recorder = GestureRecorder()
             # to change the events that are used, change the mode_config dict in the mode_controller.py
             cls._mode_controller = ModeController(cls._model, cls._view)
+            # capture, inference and gesture/event dispatch on separate threads, the main thread only displays
+            if cls._config_editor.get_data("general/pipelined_frame_loop"):
+                cls._pipeline = FramePipeline(cls._camera, cls._model, cls._mode_controller)
+                cls._pipeline.start()
             cls._active = True
         log.info("[[MI Started]]")
+        StartupProfiler().log_report()
 
 
     @classmethod
@@ -117,32 +193,52 @@ class MotionInputAPI:
         with cls._lock:
 
             # Calibration
-            if cls._calibrating is not None: # allows calibrating from main thread (for opencv to work)
-                cls._modules[cls._calibrating].calibrate(cls._calibrating_params)
-                cls._calibrating_params = None
-                cls._calibrating = None
+            if cls._calibration_request is not None: # allows calibrating from main thread (for opencv to work)
+                name, params, request = cls._calibration_request
+                cls._calibration_request = None
+                cls._complete_request(request, lambda: cls._modules[name].calibrate(params))
 
             # Modes Iteration
-            if cls._stop_next_iteration:
-                cls._stop()
-                cls._stop_next_iteration = False
+            if cls._stop_request is not None:
+                request = cls._stop_request
+                cls._stop_request = None
+                cls._complete_request(request, cls._stop)
 
             # If MI running
             if cls._active:
-                # Read Camera
-                image, data = cls._camera.read()
-                # Mode change if needed
-                cls._mode_controller.change_mode_if_needed()
-                # TODO: Hotkeys
-                #cls._mode_controller.change_hotkeys_folder_if_needed()
-                # TODO is frame_data used here?
-                # FPS
-                frame_data = cls._model.process_frame(image)
+                if cls._pipeline is not None:
+                    # the frame has already been read and processed by the pipeline threads
+                    processed = cls._pipeline.get_display_frame(FRAME_TIMEOUT)
+                    image, data = processed if processed is not None else (None, None)
+                    # mode changes asked for by the event handlers on the dispatch thread are made here
+                    cls._pipeline.change_mode_if_needed()
+                else:
+                    # Read Camera
+                    with cls._latency_metrics.measure("camera_read"):
+                        image, data = cls._camera.read(FRAME_TIMEOUT)
+                    # Mode change if needed
+                    cls._mode_controller.change_mode_if_needed()
+                    # TODO: Hotkeys
+                    #cls._mode_controller.change_hotkeys_folder_if_needed()
+                    # TODO is frame_data used here?
+                    # FPS
+                    if image is not None:
+                        frame_data = cls._model.process_frame(image)
                 # TODO: Custom gestures
                 # cls._gesture_recorder.record_gesture(frame_data, cls._model)
 
+                new_frame = image is not None
+                if not new_frame:
+                    # no new frame in time (e.g. the camera was unplugged), the last one is drawn again
+                    # so the window stays responsive and the keys (ESC, changing the camera) are still handled
+                    image, data = cls._camera.get_last_frame()
+
                 # Pressed Keys for Camera
-                pressed_key = cls._view.update_display(image)
+                with cls._latency_metrics.measure("update_display"):
+                    pressed_key = cls._view.update_display(image)
+                if cls._time_to_first_frame is None and new_frame:
+                    cls._time_to_first_frame = (time.perf_counter() - cls._start_time) * 1000
+                    log.info(f"Time to first responsive frame: {cls._time_to_first_frame:.0f} ms")
                 if pressed_key == ord('.') and not cls._change_camera:
                     cls._change_camera = True
                     cls._view.update_change_camera(True, data["camera_nr"])
@@ -188,7 +284,8 @@ class MotionInputAPI:
 
                 # Camera setup 
                 if not data["pass"] or cls._change_camera:
-                    if cls._camera.change_camera(pressed_key):
+                    camera_changer = cls._pipeline if cls._pipeline is not None else cls._camera
+                    if camera_changer.change_camera(pressed_key):
                         cls._change_camera = False
                         cls._view.update_change_camera(False, data["camera_nr"])
 
@@ -211,6 +308,9 @@ class MotionInputAPI:
     @classmethod
     def _stop(cls) -> None:
         cls._active = False
+        # the pipeline threads use the model and camera so they need to stop first
+        if cls._pipeline is not None:
+            cls._pipeline.stop()
 
         # cls._gesture_recorder.write_data_into_DB()
         if cls._view is not None:
@@ -219,31 +319,41 @@ class MotionInputAPI:
             cls._mode_controller.close()
         if cls._camera is not None:
             cls._camera.close()
+        if cls._model is not None:
+            cls._model.close()
+        cls._latency_metrics.stop_writer()
+        flush_pending_saves()
 
         cls._view = None
         cls._camera = None
         cls._model = None
         cls._mode_controller = None
+        cls._pipeline = None
         # cls._gesture_recorder = None
 
 
     @classmethod
-    def stop(cls) -> None:
+    def stop(cls, timeout: Optional[float] = STOP_TIMEOUT) -> float:
         """
         ### STOP MI ###
-        :raises RuntimeError: error raised if MI is not running
+        Waits until the main thread has stopped MI in run().
+        :param timeout: maximum number of seconds to wait, None to wait indefinitely, defaults to STOP_TIMEOUT
+        :type timeout: Optional[float]
+        :raises RuntimeError: error raised if MI is not running or did not stop in time
+        :return: ms it took to stop MI
+        :rtype: float
         """
-        if not cls._active:
-            raise RuntimeError("MI is not running")
-        cls._stop_next_iteration = True
-        while cls._stop_next_iteration:
-            """
-            needs improvement 
-            OpenCv does not like multithreading
-            so had to make sure that all the method calls that interact with
-            the OpenCV window are made from the main thread 
-            """
-            time.sleep(0.01)
+        start = time.perf_counter()
+        with cls._lock:
+            if not cls._active:
+                raise RuntimeError("MI is not running")
+            if cls._stop_request is None:
+                cls._stop_request = Future()
+            request = cls._stop_request
+        cls._wait_for_request(request, timeout, "stop MI")
+        duration = (time.perf_counter() - start) * 1000
+        log.info(f"MI stopped in {duration:.0f} ms")
+        return duration
 
 
     @classmethod
@@ -280,26 +390,84 @@ class MotionInputAPI:
 
 
     @classmethod
-    def calibrate_module(cls, name: str, params: Optional[Any] = None) -> None:
+    def calibrate_module(cls, name: str, params: Optional[Any] = None, timeout: Optional[float] = CALIBRATION_TIMEOUT) -> float:
         """
-        Calls the calibration method on the specified module
+        Calls the calibration method on the specified module, and waits until the main thread has done it in run()
         :param name: name of the module ("hand"/"speech"/"body"/"head"/"eye")
         :type name: str
+        :param timeout: maximum number of seconds to wait, None to wait indefinitely, defaults to CALIBRATION_TIMEOUT
+        :type timeout: Optional[float]
+        :raises RuntimeError: error raised if MI is running, another calibration is pending or it did not finish in time
+        :return: ms it took to calibrate the module
+        :rtype: float
         """
+        start = time.perf_counter()
         with cls._lock:
             if cls._active:
                 raise RuntimeError("Cannot calibrate. MI is already running")
-            cls._calibrating = name
-            cls._calibrating_params = params
+            if cls._calibration_request is not None:
+                raise RuntimeError("Cannot calibrate. Another calibration is pending")
+            request = Future()
+            cls._calibration_request = (name, params, request)
+        cls._wait_for_request(request, timeout, "calibrate module " + name)
+        duration = (time.perf_counter() - start) * 1000
+        log.info(f"Module {name} calibrated in {duration:.0f} ms")
+        return duration
+
+
+    @staticmethod
+    def _complete_request(request: Future, action: Callable[[], None]) -> None:
+        # any error is passed on to the thread waiting for the request instead of stopping the main thread
+        try:
+            action()
+        except Exception as error:
+            log.exception(f"Request failed: {error}")
+            request.set_exception(error)
+        else:
+            request.set_result(None)
+
+
+    @staticmethod
+    def _wait_for_request(request: Future, timeout: Optional[float], action: str) -> None:
+        try:
+            request.result(timeout)
+        except FutureTimeoutError:
+            raise RuntimeError(f"Attempt to {action} timed out after {timeout} s")
+
+
+    @classmethod
+    def get_readiness(cls) -> Dict[str, Any]:
+        """
+        Returns the state of the modules pre-initialized in the background and the time until MI first responded
+        :return: "modules": name of every module mapped to "initializing", "ready" or "failed",
+            and "first_frame_ms": ms from start() to the first processed frame, None if not displayed yet
+        :rtype: Dict[str, Any]
+        """
+        with cls._readiness_lock:
+            modules = dict(cls._module_readiness)
+        return {"modules": modules, "first_frame_ms": cls._time_to_first_frame}
 
-        while cls._calibrating is not None:
-            """ 
-            needs improvement 
-            OpenCv does not like multithreading, 
-            so had to make sure that all the method calls that interact with 
-            the OpenCV window are made from the main thread 
-            """
-            time.sleep(0.01)
+
+    @classmethod
+    def get_latency_metrics(cls) -> Dict[str, Dict[str, float]]:
+        """
+        Returns the latency of each stage of the frame loop in the current (or last) run
+        :return: name of every stage mapped to its count, mean, p50, p95, p99 and max latency in ms
+        :rtype: Dict[str, Dict[str, float]]
+        """
+        return cls._latency_metrics.get_summary()
+
+
+    @classmethod
+    def write_latency_metrics(cls, path: Optional[str] = None) -> str:
+        """
+        Writes the latency of each stage of the frame loop to a CSV (.csv) or JSON file
+        :param path: file to write to, defaults to general/latency_metrics/output_file
+        :type path: Optional[str], optional
+        :return: absolute path of the written file
+        :rtype: str
+        """
+        return cls._latency_metrics.write(path)
 
 
     @classmethod
@@ -338,6 +506,10 @@ class MotionInputAPI:
                 angle_change = False
             else:
                 angle_change = True
+            if cls._customize_gesture_recorder is None:
+                with StartupProfiler().measure("import", "customize gesture recorder"):
+                    from scripts.tools.customize_gesture_recorder import CustomizeGestureRecorder
+                cls._customize_gesture_recorder = CustomizeGestureRecorder()
             res = cls._customize_gesture_recorder.record_gesture_from_file(file_path, "hand", hand, name, angle_change,
                                                                         phrase, attention_point, event,
                                                                         cls._gestures_editor, cls._mode_editor, 
@@ -1,18 +1,36 @@
+import importlib
 import os
 import sys
 
-from .body_module import *  # TODO: make sure this needs to be imported?
 from .core import *
 from .event_mapper import EventMapper
-from .eye_module import *
-from .gesture_event_handlers import *
 from .gesture_events import *
-from .gesture_loader import GestureLoader
-from .hand_module import *
-from .head_module import *
+from .gesture_loader import GestureLoader, MODULES
 from .mode_controller import ModeController
-from .speech_module import *
 from .tools import *
+from .tools.startup_profiler import StartupProfiler
+
+# the module packages are not imported here, as they load MediaPipe, OpenVINO, Vosk, etc., and neither are the gesture
+# event handlers, which load the Windows input libraries. Their classes (e.g. "from scripts import HandPosition") are
+# still available, the package is imported on first use
+_LAZY_PACKAGES = ("hand_module", "body_module", "head_module", "eye_module", "speech_module", "gesture_event_handlers")
+
+
+def __getattr__(name: str):
+    if name.startswith("__"): raise AttributeError(name)  # e.g. __all__ looked up by "from scripts import *"
+    for package in _LAZY_PACKAGES:
+        module = _import_package(package)
+        if hasattr(module, name):
+            return getattr(module, name)
+    raise AttributeError(f"module {__name__} has no attribute {name}")
+
+
+def _import_package(package: str):
+    full_name = f"{__name__}.{package}"
+    if full_name in sys.modules:
+        return sys.modules[full_name]
+    with StartupProfiler().measure("import", f"package {package}"):
+        return importlib.import_module(full_name)
 
 # use: from scripts import DATA_PATH, to get absolute path of data folder.
 # ALWAYS use DATA_PATH
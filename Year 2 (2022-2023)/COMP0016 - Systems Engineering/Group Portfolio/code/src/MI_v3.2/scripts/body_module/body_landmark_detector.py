@@ -1,11 +1,10 @@
 '''
 Author: Jason Ho
 '''
-import cv2
 import mediapipe as mp
 import numpy as np
 
-from scripts.core import RawData, LandmarkDetector
+from scripts.core import FrameContext, RawData, LandmarkDetector, mirror_name
 from scripts.tools.config import Config
 
 
@@ -54,25 +53,26 @@ class BodyLandmarkDetector(LandmarkDetector):
             "left_ankle_extremity":28,
             "right_ankle_extremity":27
             }
+        # the frame is processed as captured, so each landmark (named as on the mirrored view) is read from the pose
+        # landmark of its mirror image, e.g. "left_wrist" from "right_wrist"
+        self._landmark_index_dict = {landmark: self._landmark_index_dict[mirror_name(landmark)] for landmark in self._landmark_index_dict}
+        self._extremity_landmark_index_dict = {landmark: self._extremity_landmark_index_dict[mirror_name(landmark)]
+                                               for landmark in self._extremity_landmark_index_dict}
         config = Config()
         self._ankle_visibility_threshold = config.get_data("modules/body/ankle_visibility_threshold")
 
 
-    def get_raw_data(self, raw_data: RawData, image: np.ndarray) -> None:
-        """Adds the coordinates of all landmarks detected on the image into the RawData instance.
+    def get_raw_data(self, raw_data: RawData, frame: FrameContext) -> None:
+        """Adds the coordinates of all landmarks detected on the frame into the RawData instance.
 
         :param raw_data: RawData instance to add the landmarks to
         :type raw_data: RawData
-        :param image: Image to proccess with mediapipe and read the landmarks locations from
-        :type image: np.ndarray
+        :param frame: Frame to proccess with mediapipe and read the landmarks locations from
+        :type frame: FrameContext
         """
-        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        image.flags.writeable = False
-        results = self._pose.process(image)
+        results = self._pose.process(frame.get_rgb())
         pose_landmarks = results.pose_landmarks
-        image.flags.writeable = True
-        image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
-        frame_height, frame_width = image.shape[0], image.shape[1]
+        frame_height, frame_width = frame.get_size()
         
         if pose_landmarks:
             left_ankle_index = self._landmark_index_dict["left_ankle"]
@@ -83,12 +83,12 @@ class BodyLandmarkDetector(LandmarkDetector):
                 or (pose_landmarks.landmark[right_ankle_index].visibility > self._ankle_visibility_threshold):
                 for landmark in self._landmark_index_dict.keys():
                     index = int(self._landmark_index_dict[landmark])
-                    coordinates = np.array([pose_landmarks.landmark[index].x * frame_width, pose_landmarks.landmark[index].y * frame_height, pose_landmarks.landmark[index].z])
+                    coordinates = np.array([(1 - pose_landmarks.landmark[index].x) * frame_width, pose_landmarks.landmark[index].y * frame_height, pose_landmarks.landmark[index].z])
                     raw_data.add_landmark("body", landmark, coordinates)
             
             if len(self._extremity_landmark_index_dict) > 0:
                 for landmark in self._extremity_landmark_index_dict.keys():
                     index = int(self._extremity_landmark_index_dict[landmark])
-                    coordinates = np.array([pose_landmarks.landmark[index].x * frame_width, pose_landmarks.landmark[index].y * frame_height, pose_landmarks.landmark[index].z])
+                    coordinates = np.array([(1 - pose_landmarks.landmark[index].x) * frame_width, pose_landmarks.landmark[index].y * frame_height, pose_landmarks.landmark[index].z])
                     raw_data.add_landmark("body", landmark, coordinates)
                     
\ No newline at end of file
@@ -181,7 +181,7 @@ class PoseClassification(object):
         if used_primitives is None:
             used_pose_samples = pose_samples
         else:
-            used_primitives.add("idle")
+            used_primitives = used_primitives | {"idle"}  # the given set is shared with the module, so it is not modified
             used_pose_samples = [sample for sample in pose_samples if sample.class_name in used_primitives] # restricts checked exercises to the ones actually being used
         for sample_idx, sample in enumerate(used_pose_samples):
             euclidean_dist =np.linalg.norm((sample.embedding - pose_embedding) * (1., 1., 0.2))
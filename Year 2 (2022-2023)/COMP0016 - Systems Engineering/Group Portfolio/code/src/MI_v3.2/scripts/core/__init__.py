@@ -2,12 +2,16 @@
 stuff text
 
 """
+from .frame_context import FrameContext
 from .gesture import Gesture
 from .gesture_event import GestureEvent
-from .gesture_factory import GestureFactory, Primitive
+from .gesture_factory import GestureFactory, Primitive, PrimitiveIndex
+from .landmark_filter import LandmarkFilter, OneEuroFilter
 from .model import Model
 from .module import Module, LandmarkDetector
 from .position import Position
 from .position_tracker import PositionTracker
-from .raw_data import RawData
+from .raw_data import LandmarkArray, RawData
+from .mirroring import mirror_name, mirror_x
+from .region_of_interest import RegionOfInterestTracker
 
@@ -0,0 +1,117 @@
+'''
+Comments:
+Read-only view of one camera frame that is shared by all the modules processing it.
+Colour conversions and downscaled copies are computed on first request and then reused,
+so however many modules ask for e.g. the RGB image it is only produced once per frame.
+'''
+import threading
+from typing import Tuple
+
+import cv2
+import numpy as np
+
+
+def _read_only(image: np.ndarray) -> np.ndarray:
+    # a view that cannot be written to, while the original array stays writeable for the View to draw on
+    view = image.view()
+    view.flags.writeable = False
+    return view
+
+
+class FrameContext:
+    def __init__(self, frame: np.ndarray) -> None:
+        self._bgr = _read_only(frame)
+        self._rgb = None
+        self._resized = {}  # dict: (width, height, colour) -> resized image
+        self._lock = threading.Lock()  # the modules may request the same variant at the same time
+
+    def get_bgr(self) -> np.ndarray:
+        """
+        :return: the frame as captured by the camera (BGR), not writeable
+        :rtype: np.ndarray
+        """
+        return self._bgr
+
+    def get_rgb(self) -> np.ndarray:
+        """Returns the frame converted to RGB (as expected by mediapipe). Converted at most once per frame.
+
+        :return: the frame in RGB, not writeable
+        :rtype: np.ndarray
+        """
+        if self._rgb is None:
+            with self._lock:
+                if self._rgb is None:
+                    self._rgb = _read_only(cv2.cvtColor(self._bgr, cv2.COLOR_BGR2RGB))
+        return self._rgb
+
+    def get_resized(self, width: int, height: int, colour: str = "bgr") -> np.ndarray:
+        """Returns the frame downscaled to the given size. Each size and colour combination is computed at most once per frame.
+
+        :param width: width of the returned image
+        :type width: int
+        :param height: height of the returned image
+        :type height: int
+        :param colour: "bgr" or "rgb", defaults to "bgr"
+        :type colour: str
+        :raises RuntimeError: if the colour is neither "bgr" nor "rgb"
+        :return: the resized frame, not writeable
+        :rtype: np.ndarray
+        """
+        key = (int(width), int(height), colour)
+        if key not in self._resized:
+            source = self._get_colour(colour)
+            with self._lock:
+                if key not in self._resized:
+                    resized = cv2.resize(source, key[:2], interpolation=cv2.INTER_AREA)
+                    self._resized[key] = _read_only(resized)
+        return self._resized[key]
+
+    def get_scaled(self, scale: float, colour: str = "bgr") -> np.ndarray:
+        """Returns the frame scaled by the given factor, see get_resized()
+
+        :param scale: factor to scale both sides of the frame by
+        :type scale: float
+        :param colour: "bgr" or "rgb", defaults to "bgr"
+        :type colour: str
+        :return: the scaled frame, not writeable
+        :rtype: np.ndarray
+        """
+        height, width = self.get_size()
+        return self.get_resized(max(1, round(width * scale)), max(1, round(height * scale)), colour)
+
+    def get_region(self, x_min: int, y_min: int, x_max: int, y_max: int, colour: str = "bgr") -> np.ndarray:
+        """Returns a rectangular region of the frame, e.g. around the landmarks detected on the previous frame.
+        Not cached, as each module crops its own region.
+
+        :param x_min: left edge of the region in pixels
+        :type x_min: int
+        :param y_min: top edge of the region in pixels
+        :type y_min: int
+        :param x_max: right edge of the region in pixels (exclusive)
+        :type x_max: int
+        :param y_max: bottom edge of the region in pixels (exclusive)
+        :type y_max: int
+        :param colour: "bgr" or "rgb", defaults to "bgr"
+        :type colour: str
+        :raises RuntimeError: if the colour is neither "bgr" nor "rgb"
+        :return: the region of the frame (contiguous, as expected by the ML libraries), not writeable
+        :rtype: np.ndarray
+        """
+        if colour == "rgb" and self._rgb is None:
+            # only the region is converted, unless another module already needed the whole frame in RGB
+            return _read_only(cv2.cvtColor(self._bgr[y_min:y_max, x_min:x_max], cv2.COLOR_BGR2RGB))
+        return _read_only(np.ascontiguousarray(self._get_colour(colour)[y_min:y_max, x_min:x_max]))
+
+    def get_size(self) -> Tuple[int, int]:
+        """
+        :return: height and width of the frame
+        :rtype: Tuple[int, int]
+        """
+        return self._bgr.shape[0], self._bgr.shape[1]
+
+    def _get_colour(self, colour: str) -> np.ndarray:
+        if colour == "bgr":
+            return self._bgr
+        if colour == "rgb":
+            return self.get_rgb()
+        raise RuntimeError("Attempt to get a frame in an unsupported colour space: " + colour)
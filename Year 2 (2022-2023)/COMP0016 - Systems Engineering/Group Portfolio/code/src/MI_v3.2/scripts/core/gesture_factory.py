@@ -2,8 +2,10 @@
 Author: Carmen Meinson
 '''
 
+import threading
+import weakref
 from collections import namedtuple
-from typing import Set, Optional, Type
+from typing import Iterable, Optional, Set, Tuple, Type
 
 from .gesture import Gesture
 from .position import Position
@@ -12,34 +14,141 @@ from .position_tracker import PositionTracker
 Primitive = namedtuple('Primitive', ['name', 'state'])  # Set[Tuple[str, boolean]]
 
 
+# Every primitive used by a module is given one bit. A gesture is then compiled into a mask of the bits of
+# its primitives and the bits that have to be set (the primitives that have to be True), and a position into
+# the bits of the primitives it has a state for and the bits of the ones that are True.
+# The Module encodes each position once per frame for all the primitives it uses, so matching it against a gesture
+# is then two ANDs and two comparisons, however many primitives there are.
+
+class PrimitiveIndex:
+    """Bit index of the primitives of one module, shared by all of its gesture factories"""
+
+    def __init__(self) -> None:
+        self._bits = {}  # dict: name of the primitive -> its bit
+        self._names = []  # names of the primitives, in the order of their bits
+        # dict: position -> (bits read, bits with a state, bits that are True), so each primitive of a position
+        # is read once however many gestures check it
+        self._encoded = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def compile(self, primitives: Set[Primitive]) -> Optional[Tuple[int, int]]:
+        """
+        :param primitives: primitives that describe a gesture
+        :type primitives: Set[Primitive]
+        :return: the mask of the bits of all the primitives and the bits that have to be set,
+            or None if a primitive has a state that no position can be in
+        :rtype: Optional[Tuple[int, int]]
+        """
+        mask = 0
+        expected = 0
+        for primitive in primitives:
+            bit = self._get_bit(primitive.name)
+            if primitive.state == True:
+                expected |= bit
+            elif primitive.state != False:
+                return None
+            mask |= bit
+        return mask, expected
+
+    def get_mask(self, names: Iterable[str]) -> int:
+        """
+        :param names: names of primitives
+        :type names: Iterable[str]
+        :return: the bits of the primitives
+        :rtype: int
+        """
+        mask = 0
+        for name in names:
+            mask |= self._get_bit(name)
+        return mask
+
+    def encode(self, position: Position, mask: int) -> Tuple[int, int]:
+        """Only the primitives in the mask are read from the position, the ones read before for other gestures are reused.
+
+        :param position: position to encode
+        :type position: Position
+        :param mask: bits of the primitives of interest
+        :type mask: int
+        :return: the bits (within the mask) of the primitives that have a state in the position, and of the ones that are True
+        :rtype: Tuple[int, int]
+        """
+        read, known, true = self._encoded.get(position, (0, 0, 0))
+        missing = mask & ~read
+        if missing:
+            read |= missing
+            while missing:
+                bit = missing & -missing  # lowest bit left
+                missing ^= bit
+                state = position.get_primitive(self._names[bit.bit_length() - 1])
+                if state == True:
+                    known |= bit
+                    true |= bit
+                elif state == False:  # None (or any other value) matches no gesture
+                    known |= bit
+            with self._lock:
+                self._encoded[position] = (read, known, true)
+        return known & mask, true & mask
+
+    def _get_bit(self, name: str) -> int:
+        # bits are never reused, so gestures compiled earlier stay valid when primitives are no longer used
+        if name not in self._bits:
+            with self._lock:
+                if name not in self._bits:
+                    self._bits[name] = 1 << len(self._names)
+                    self._names.append(name)
+        return self._bits[name]
+
+
 # Every gesture factory instance is generated from a set of (String,Bool) pairs that describe the gesture
 # The factory creates a gesture instance if the conditions (truth values of all primitives) are met
 
 class GestureFactory:
-    def __init__(self, name: str, gesture_class: Type[Gesture], primitives: Set[Primitive]) -> None:
+    def __init__(self, name: str, gesture_class: Type[Gesture], primitives: Set[Primitive],
+                 primitive_index: Optional[PrimitiveIndex] = None) -> None:
+        """
+        :param primitive_index: index of the primitives of the module, shared with its other factories. A new one is made if None
+        :type primitive_index: Optional[PrimitiveIndex]
+        """
         self._primitives = primitives
         self._gesture_class = gesture_class
         self._name = name
+        self._primitive_index = primitive_index if primitive_index is not None else PrimitiveIndex()
+        self._compiled = self._primitive_index.compile(primitives)
 
-    def update(self, tracker: PositionTracker) -> Optional[Gesture]:
+    def update(self, tracker: PositionTracker, encoded: Optional[Tuple[int, int]] = None) -> Optional[Gesture]:
         """Creates an instance of the gesture it represents if the current position in the provided tracker matches the gesture criteria (if all the primitives of interest are in needed states)
 
         :param tracker: tracker containing the current position to be checked
         :type tracker: PositionTracker
+        :param encoded: the current position encoded by the PrimitiveIndex (with at least the primitives of this gesture), defaults to None (encoded here)
+        :type encoded: Optional[Tuple[int, int]]
         :return: a new gesture instance if such is created
         :rtype: Optional[Gesture]
         """
-        if self._check_position(tracker.get_current_position()):
+        if self.matches(*encoded) if encoded is not None else self._check_position(tracker.get_current_position()):
             return self._gesture_class(self._name, self._check_position, tracker)
         return None
 
+    def matches(self, known: int, true: int) -> bool:
+        """
+        :param known: bits of the primitives that have a state in the position (see PrimitiveIndex.encode)
+        :type known: int
+        :param true: bits of the primitives that are True in the position
+        :type true: int
+        :return: whether the encoded position matches the gesture
+        :rtype: bool
+        """
+        if self._compiled is None: return False
+        mask, expected = self._compiled
+        return known & mask == mask and true & mask == expected
+
     def get_name(self) -> str:
         return self._name
 
+    def get_primitives(self) -> Set[Primitive]:
+        return self._primitives
+
     def _check_position(self, position: Position) -> bool:
         # if all primitives match or if no primitives were defined, returns true!
-        if position is None: return False
-        for primitive in self._primitives:
-            if position.get_primitive(primitive.name) != primitive.state:
-                return False
-        return True
+        if position is None or self._compiled is None: return False
+        return self.matches(*self._primitive_index.encode(position, self._compiled[0]))
@@ -0,0 +1,154 @@
+'''
+Comments:
+Smooths the landmarks the detectors add to RawData with a One Euro filter (Casiez et al. 2012): an exponential
+low-pass filter whose cutoff frequency rises with the speed of the landmark, so jitter is removed while the landmark is
+still and it barely lags while it moves. That is less lag than averaging the last n positions.
+The filter works element-wise on whole arrays, so all the landmarks of a body part are filtered in a single NumPy call
+per frame rather than one Python filter object per coordinate.
+'''
+from time import perf_counter
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .raw_data import LandmarkArray, RawData
+
+MIN_TIME_STEP = 1e-3  # seconds, used if two frames arrive with (almost) the same timestamp
+
+
+class OneEuroFilter:
+    def __init__(self, min_cutoff: float = 1.0, beta: float = 0.0, d_cutoff: float = 1.0) -> None:
+        """
+        :param min_cutoff: cutoff frequency (Hz) while the values are still, lower removes more jitter, defaults to 1.0
+        :type min_cutoff: float
+        :param beta: how much the cutoff frequency rises with the speed of the values, higher lags less, defaults to 0.0
+        :type beta: float
+        :param d_cutoff: cutoff frequency (Hz) of the filter of the speed, defaults to 1.0
+        :type d_cutoff: float
+        """
+        self._min_cutoff = min_cutoff
+        self._beta = beta
+        self._d_cutoff = d_cutoff
+        self._value = None  # last filtered values, None until the first call
+        self._speed = None  # last filtered speed of the values (per second)
+        self._time = None
+
+    def filter(self, values: np.ndarray, now: float, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Filters the next values. Each element is filtered independently of the others.
+        If the shape of the values changes the filter starts over.
+
+        :param values: the values on this frame
+        :type values: np.ndarray
+        :param now: time of the values in seconds (perf_counter)
+        :type now: float
+        :param out: array to write the filtered values to (may be values itself), defaults to None (a new array)
+        :type out: Optional[np.ndarray]
+        :return: the filtered values
+        :rtype: np.ndarray
+        """
+        values = np.asarray(values, dtype=float)
+        if self._value is None or self._value.shape != values.shape:
+            self._value = values.copy()
+            self._speed = np.zeros_like(values)
+        else:
+            time_step = max(now - self._time, MIN_TIME_STEP)
+            speed = (values - self._value) / time_step
+            self._speed += self._get_alpha(time_step, self._d_cutoff) * (speed - self._speed)
+            cutoff = self._min_cutoff + self._beta * np.abs(self._speed)
+            self._value += self._get_alpha(time_step, cutoff) * (values - self._value)
+        self._time = now
+        if out is None:
+            return self._value.copy()
+        out[...] = self._value
+        return out
+
+    def reset(self) -> None:
+        self._value = None
+        self._speed = None
+        self._time = None
+
+    @staticmethod
+    def _get_alpha(time_step: float, cutoff):
+        # smoothing factor of an exponential filter with the given cutoff frequency (scalar or per element)
+        time_constant = 1.0 / (2 * np.pi * cutoff)
+        return 1.0 / (1.0 + time_constant / time_step)
+
+
+class LandmarkFilter:
+    """Filters all the landmarks of every body part in a RawData instance, keeping a OneEuroFilter per body part.
+    Only float coordinates are filtered, anything else a detector adds (e.g. pixel boxes or phrases) is left as it is."""
+
+    def __init__(self, min_cutoff: float = 1.0, beta: float = 0.0, d_cutoff: float = 1.0) -> None:
+        """
+        :param min_cutoff: see OneEuroFilter, defaults to 1.0
+        :type min_cutoff: float
+        :param beta: see OneEuroFilter, defaults to 0.0
+        :type beta: float
+        :param d_cutoff: see OneEuroFilter, defaults to 1.0
+        :type d_cutoff: float
+        """
+        self._min_cutoff = min_cutoff
+        self._beta = beta
+        self._d_cutoff = d_cutoff
+        self._filters = {}  # dict: name of the body part -> (layout of its landmarks, OneEuroFilter)
+
+    def apply(self, raw_data: RawData, now: Optional[float] = None) -> None:
+        """Replaces the landmarks in the RawData with their filtered coordinates.
+        Body parts that are not in the RawData (aka were not detected on the frame) are filtered from scratch when they
+        are detected again, so they do not slide over from where they were lost.
+
+        :param raw_data: RawData instance the module's landmark detector added the landmarks of the frame to
+        :type raw_data: RawData
+        :param now: time of the frame in seconds, defaults to None (perf_counter)
+        :type now: Optional[float]
+        """
+        if now is None: now = perf_counter()
+        bodyparts = set(raw_data.get_bodyparts())
+        for bodypart in list(self._filters):
+            if bodypart not in bodyparts:
+                del self._filters[bodypart]
+        for bodypart in bodyparts:
+            self._apply_to_bodypart(raw_data, bodypart, now)
+
+    def reset(self) -> None:
+        self._filters = {}
+
+    def _apply_to_bodypart(self, raw_data: RawData, bodypart: str, now: float) -> None:
+        landmarks = raw_data.get_data(bodypart)
+        array = raw_data.get_array(bodypart)
+        # the landmarks that are not rows of the array, e.g. all the landmarks of a body part added one by one
+        names = [name for name in landmarks if array is None or name not in landmarks.get_rows()]
+        filtered_names = [name for name in names if self._is_filterable(landmarks[name])]
+        parts = [np.ravel(landmarks[name]) for name in filtered_names]
+        if array is not None:
+            parts.insert(0, array.ravel())
+        if not parts: return
+
+        layout = (None if array is None else array.shape,) + tuple((name, np.shape(landmarks[name])) for name in filtered_names)
+        one_euro_filter = self._get_filter(bodypart, layout)
+        filtered = one_euro_filter.filter(np.concatenate(parts), now)
+
+        start = 0
+        if array is not None:
+            # added as a new array, as the detector may have added the same one for several body parts
+            unfiltered = landmarks
+            raw_data.add_landmark_array(bodypart, filtered[:array.size].reshape(array.shape), unfiltered.get_rows())
+            landmarks = raw_data.get_data(bodypart)
+            for name in names:
+                landmarks[name] = unfiltered[name]
+            start = array.size
+        for name, (_, shape) in zip(filtered_names, layout[1:]):
+            size = int(np.prod(shape))
+            coordinates = filtered[start:start + size].reshape(shape)
+            landmarks[name] = coordinates if shape else float(coordinates)
+            start += size
+
+    def _get_filter(self, bodypart: str, layout: Tuple) -> OneEuroFilter:
+        # a body part whose landmarks changed (e.g. a landmark is sometimes missing) is filtered from scratch
+        if bodypart not in self._filters or self._filters[bodypart][0] != layout:
+            self._filters[bodypart] = (layout, OneEuroFilter(self._min_cutoff, self._beta, self._d_cutoff))
+        return self._filters[bodypart][1]
+
+    @staticmethod
+    def _is_filterable(coordinates) -> bool:
+        return isinstance(coordinates, (np.ndarray, float, np.floating)) and np.asarray(coordinates).dtype.kind == "f"
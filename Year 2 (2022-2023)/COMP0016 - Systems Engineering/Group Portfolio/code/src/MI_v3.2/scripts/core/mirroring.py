@@ -0,0 +1,51 @@
+'''
+Comments:
+The camera frames are processed as captured, but MI works in mirrored (selfie view) coordinates, as that is how the
+user sees themselves. So instead of flipping the pixels of every frame, the landmark detectors mirror the coordinates
+of the landmarks they add to RawData, and the View flips the frame only when it is displayed.
+Mirroring also swaps left and right: e.g. the landmark an ML model calls the left eye on the captured frame is the
+right eye on the mirrored one.
+'''
+import re
+from typing import Optional
+
+import numpy as np
+
+
+def mirror_x(points: np.ndarray, width: float = 1.0, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Mirrors the x coordinates (horizontal flip).
+
+    :param points: xy(z) coordinates (one point, or n points as an n x 2 or n x 3 array)
+    :type points: np.ndarray
+    :param width: width of the frame in the units of the coordinates, defaults to 1.0 (normalised)
+    :type width: float
+    :param out: array to write the mirrored points to (may be points itself), defaults to None (a new array)
+    :type out: Optional[np.ndarray]
+    :return: the points with every x replaced by width - x
+    :rtype: np.ndarray
+    """
+    if out is not None:
+        if out is not points: out[...] = points
+        out[..., 0] = width - out[..., 0]
+        return out
+    mirrored = np.array(points, dtype=float)
+    mirrored[..., 0] = width - mirrored[..., 0]
+    return mirrored
+
+
+def mirror_name(name: str) -> str:
+    """Swaps left and right in a landmark name or label, e.g. "left-eye-top-right" -> "right-eye-top-left", "Left" -> "Right".
+    Lower case "left" and "right" are only swapped at the start of a word, so e.g. "bright" is left as it is.
+
+    :param name: the name
+    :type name: str
+    :return: the name of the mirrored landmark
+    :rtype: str
+    """
+    return re.sub(r"(?<![A-Za-z])(left|right)|Left|Right", _swap_side, name)
+
+
+def _swap_side(match: re.Match) -> str:
+    side = match.group(0)
+    swapped = "right" if side.lower() == "left" else "left"
+    return swapped.capitalize() if side[0].isupper() else swapped
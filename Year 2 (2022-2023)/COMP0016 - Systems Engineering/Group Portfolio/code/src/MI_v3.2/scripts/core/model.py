@@ -2,19 +2,36 @@
 Author: Carmen Meinson
 '''
 import threading
-from typing import Dict, Set
+import weakref
+from contextlib import nullcontext
+from time import perf_counter
+from typing import TYPE_CHECKING, ContextManager, Dict, Optional, Set, Tuple
 
 import numpy as np
 
+from .frame_context import FrameContext
 from .gesture import Gesture
 from .gesture_event import GestureEvent
 from .gesture_factory import Primitive
 from .module import Module
+from .module_schedule import ModuleSchedule
+from .module_worker_pool import ModuleTask, ModuleWorkerPool
 from .raw_data import RawData
 
+if TYPE_CHECKING:
+    from scripts.tools.latency_metrics import LatencyRecorder
+
+
+def _no_measure(stage: str) -> ContextManager:
+    return nullcontext()
+
 
 class Model:
-    def __init__(self) -> None:
+    def __init__(self, latency_metrics: Optional["LatencyRecorder"] = None) -> None:
+        """
+        :param latency_metrics: if given, the duration of each module update and of the gesture and event updates is recorded in it
+        :type latency_metrics: Optional[LatencyRecorder]
+        """
         # dict: name of the gesture -> gesture event instances that use it
         self._gesture_to_events = {}
         # dict: name of the gesture -> name of the module that it belongs to
@@ -26,9 +43,31 @@ class Model:
 
         self._events = {}  # dict: event name -> event instance
         self._modules = {}  # dict: module name -> Module instance
-
-    def add_module(self, module_name: str, module: Module) -> None:
+        self._schedules = {}  # dict: module name -> ModuleSchedule deciding on which frames it is updated
+        # dict: module name -> RawData of the landmarks it detected the last time it was updated, reused on the frames it is not
+        self._last_module_data = {}
+        # dict: RawData returned by detect_landmarks() -> (dict: module name -> RawData of that module), read by dispatch()
+        self._module_data_of_frame = weakref.WeakKeyDictionary()
+        self._module_data_lock = threading.Lock()
+        # dict: module name -> the RawData of that module last passed to its trackers by dispatch()
+        self._dispatched_module_data = {}
+        # one long-lived worker thread per module, used when more than one module is active
+        self._worker_pool = ModuleWorkerPool()
+        # context manager timing the code inside it, e.g. with self._measure("update_active_events"): ...
+        self._measure = latency_metrics.measure if latency_metrics is not None else _no_measure
+
+    def add_module(self, module_name: str, module: Module, schedule: Optional[ModuleSchedule] = None) -> None:
+        """
+        :param schedule: on which frames the module is updated, every frame if None
+        :type schedule: Optional[ModuleSchedule]
+        """
         self._modules[module_name] = module
+        self._schedules[module_name] = schedule if schedule is not None else ModuleSchedule()
+        self._worker_pool.add(module_name, module)
+
+    def close(self) -> None:
+        """Stops the worker threads of all modules. Should be called once the model is no longer used."""
+        self._worker_pool.close()
 
     def get_module_names(self) -> Set[str]:
         """
@@ -150,6 +189,10 @@ class Model:
 
         if len(module.get_currently_used_primitives()) == 0:
             self._modules.pop(module_name)
+            self._schedules.pop(module_name)
+            self._last_module_data.pop(module_name, None)
+            self._dispatched_module_data.pop(module_name, None)
+            self._worker_pool.remove(module_name)
 
         self._gesture_to_module.pop(gesture_name)
         self._gesture_to_events.pop(gesture_name)
@@ -158,6 +201,7 @@ class Model:
         """
         Process the frame in following steps:
             - Process the frame in each module, from which we obtain the frames raw data and new Gesture instances may be created.
+              Modules that are not due for an update on this frame (see ModuleSchedule) add the raw data of their last update instead.
             - Activate in the model each Gesture that was created from the modules, which may (de)activate of some gesture events
             - Update all the currently active gestures, which may result in deactivation of some of them, 
               and consequently (de)activation of some gesture events
@@ -170,75 +214,121 @@ class Model:
         """
 
         frame_data = RawData()
-        self._update_modules(frame_data, frame)
+        # all modules read the same frame, so colour conversions and resizing are only done once
+        frame_context = FrameContext(frame)
+        new_gestures = self._run_in_modules(frame_data,
+                                            lambda module, data: module.update_and_get_activated_gestures(data, frame_context),
+                                            "module")[0]
+        self._activate_gestures(new_gestures)
         self._update_active_gestures()
         self._update_active_events()
         return frame_data
 
-    def _update_modules(self, frame_data: RawData, frame: np.ndarray) -> None:
-        new_gestures = set()
-
-        modules = list(self._modules.values())
-        if len(modules) == 1:  # no need for threads if only 1 module is active
-            self._update_module(modules[0], new_gestures, frame_data, frame)
-        else:
-            self._thread_updating_modules(new_gestures, frame_data, frame)
-
-        for gesture in new_gestures:
-            self._activate_gesture(gesture)
-
-    def _thread_updating_modules(self, new_gestures: Set[Gesture], frame_data: RawData, frame: np.ndarray) -> None:
-        all_threads = []
-        all_frame_datas = []
-        all_new_gestures = []
-
-        for module in self._modules.values():
-            module_frame_data = RawData()
-            all_frame_datas.append(module_frame_data)
+    def detect_landmarks(self, frame: np.ndarray) -> RawData:
+        """First stage of process_frame() when it is split in two (e.g. when run as a pipeline).
+        Only runs the landmark detectors of all modules, without touching any trackers, gestures or events.
+        So it can run on the next frame while dispatch() is still handling the previous one,
+        as long as no modules are added or removed in the meantime.
 
-            module_new_gestures = set()
-            all_new_gestures.append(module_new_gestures)
+        :param frame: image reflecting the frame
+        :type frame: ndarray
+        :return: Coordinates of all the landmarks detected in the frame
+        :rtype: RawData
+        """
+        frame_data = RawData()
+        frame_context = FrameContext(frame)
 
-            # Debugging
-            #if random.random() > 0.8:
-            #print("MODULE: ", module)
-            name = f"Thread Model: {module}"
-            module_thread = threading.Thread(target=self._update_module, name=name, args=(
-                module, module_new_gestures, module_frame_data, np.copy(frame)))
-            all_threads.append(module_thread)
+        def detect(module: Module, data: RawData) -> Set[Gesture]:
+            module.detect_landmarks(data, frame_context)
+            return set()
 
-            module_thread.start()
-            module_thread.join()
+        module_data = self._run_in_modules(frame_data, detect, "detect_landmarks")[1]
+        with self._module_data_lock:
+            self._module_data_of_frame[frame_data] = module_data
+        return frame_data
 
-        for gestures in all_new_gestures:
-            new_gestures.update(gestures)
+    def dispatch(self, frame_data: RawData) -> None:
+        """Second stage of process_frame() when it is split in two.
+        Updates the trackers of all modules with the landmarks returned by detect_landmarks(),
+        then activates the new gestures, updates the active gestures and runs the active events.
 
-        for datas in all_frame_datas:
-            frame_data.combine(datas)
+        :param frame_data: Coordinates of all the landmarks detected in the frame
+        :type frame_data: RawData
+        """
+        with self._module_data_lock:
+            module_data = self._module_data_of_frame.pop(frame_data, {})
+        new_gestures = set()
+        for module_name, module in list(self._modules.items()):
+            data = module_data.get(module_name)
+            if data is not None:
+                # skipped by the schedule, its trackers have already been updated with these landmarks
+                if self._dispatched_module_data.get(module_name) is data: continue
+                self._dispatched_module_data[module_name] = data
+            with self._measure("update_gestures/" + module_name):
+                new_gestures.update(module.update_gestures(frame_data))
+        self._activate_gestures(new_gestures)
+        self._update_active_gestures()
+        self._update_active_events()
 
-    def _update_module(self, module: Module, new_gestures: Set[Gesture], module_frame_data: RawData,
-                       frame: np.ndarray) -> None:
-        new_gestures.update(
-            module.update_and_get_activated_gestures(module_frame_data, frame))
+    def _run_in_modules(self, frame_data: RawData, task: ModuleTask, stage: str) -> Tuple[Set[Gesture], Dict[str, RawData]]:
+        # returns the new gestures, and the RawData of each module (new, or reused if the module was not due for an update)
+        new_gestures = set()
+        module_names = {module: name for name, module in self._modules.items()}
+
+        def timed_task(module: Module, data: RawData) -> Set[Gesture]:
+            # recorded per module, e.g. "module/hand"
+            with self._measure(stage + "/" + module_names[module]):
+                return task(module, data)
+
+        now = perf_counter()
+        due = []
+        module_data = {}
+        for name in module_names.values():
+            if self._schedules[name].should_update(now) or name not in self._last_module_data:
+                due.append(name)
+            else:
+                # the gestures activated on its last update stay active, only no new ones are created
+                module_data[name] = self._last_module_data[name]
+
+        if len(due) == 1:  # no need for threads if only 1 module is updated
+            data = RawData()
+            new_gestures.update(timed_task(self._modules[due[0]], data))
+            module_data[due[0]] = data
+        elif due:
+            # all modules process the frame at the same time and we wait for the slowest one
+            for name, (module_new_gestures, data) in self._worker_pool.run(timed_task, due).items():
+                new_gestures.update(module_new_gestures)
+                module_data[name] = data
+
+        for name, data in module_data.items():
+            self._last_module_data[name] = data
+            frame_data.combine(data)
+        return new_gestures, module_data
+
+    def _activate_gestures(self, new_gestures: Set[Gesture]) -> None:
+        for gesture in new_gestures:
+            self._activate_gesture(gesture)
 
     def _update_active_gestures(self) -> None:
         gestures_to_deactivate = set()
-        for gesture in self._active_gestures:
-            if not gesture.update():  # if no longer active
-                gestures_to_deactivate.add(gesture)
+        with self._measure("update_active_gestures"):
+            for gesture in self._active_gestures:
+                if not gesture.update():  # if no longer active
+                    gestures_to_deactivate.add(gesture)
 
-        for gesture in gestures_to_deactivate:
-            self._deactivate_gesture(gesture)
+            for gesture in gestures_to_deactivate:
+                self._deactivate_gesture(gesture)
 
     def _update_active_events(self) -> None:
         events_to_deactivate = set()
-        for event in self._active_events:
-            event.update()
-            if not event.get_state():
-                events_to_deactivate.add(event)
+        with self._measure("update_active_events"):
+            for event in self._active_events:
+                event.update()
+                if not event.get_state():
+                    events_to_deactivate.add(event)
 
-        for event in events_to_deactivate:
-            self._active_events.remove(event)
+            for event in events_to_deactivate:
+                self._active_events.remove(event)
 
     def _activate_gesture(self, gesture: Gesture) -> None:
         self._active_gestures.add(gesture)
@@ -2,13 +2,16 @@
 Author: Carmen Meinson
 '''
 
-from typing import Any, Optional, Set
+import threading
+from typing import Any, FrozenSet, List, Optional, Set
 
 import numpy as np
 
 from scripts.core.position import Position
+from .frame_context import FrameContext
 from .gesture import Gesture
-from .gesture_factory import GestureFactory, Primitive
+from .gesture_factory import GestureFactory, Primitive, PrimitiveIndex
+from .landmark_filter import LandmarkFilter
 from .position_tracker import PositionTracker
 from .raw_data import RawData
 
@@ -19,17 +22,23 @@ class LandmarkDetector:
     def __init__(self):
         raise NotImplementedError()
 
-    def get_raw_data(self, raw_data: RawData, image: np.ndarray) -> None:
-        """Adds the xy(z) coordinates of all the landmarks detected on the image into the RawData instance.
+    def get_raw_data(self, raw_data: RawData, frame: FrameContext) -> None:
+        """Adds the xy(z) coordinates of all the landmarks detected on the frame into the RawData instance.
+        The frame is shared with the other modules and must not be written to.
 
         :param raw_data: RawData instance to add the landmarks to
         :type raw_data: RawData
-        :param image: Image to process with mediapipe and read the landmarks locations from
-        :type image: ndarray
+        :param frame: Frame to process with mediapipe and read the landmarks locations from
+        :type frame: FrameContext
         """
         raise NotImplementedError()
 
 
+# dict: module class -> lock held while it is pre-initialized, so it is only done once if started from several threads
+_pre_initialization_locks = {}
+_pre_initialization_locks_lock = threading.Lock()
+
+
 class Module:
     _position_class = Position  # e.g. HandPosition
     _gesture_class = Gesture  # e.g. HandGesture
@@ -38,17 +47,25 @@ class Module:
     _tracker_names = set()  # names of the trackers from the specific landmark detector e.g. {"Left", "Right"}
 
     _pre_initialized = False
+    _warm_up_on_frame = True  # False if the landmark detector does not process the camera frames (e.g. speech)
+    _prepared_detector = None  # landmark detector created and warmed up by pre_initialize(), used by the next instance
 
     def __init__(self) -> None:
         self.pre_initialize()
         self._primitive_to_gesture_factories = {}  # dict: name of the primitive -> gesture factory instances that use it / can be expanded on runtime
         self._gesture_name_to_factory = {}  # dict: name of the gesture -> the gestures factory
+        self._primitive_index = PrimitiveIndex()  # bit of every primitive, the gestures are compiled to bitmasks over it
+        # derived from the two dicts above whenever a gesture is added or removed, so nothing is rebuilt per frame
+        self._used_primitives = frozenset()  # names of all primitives used by any gesture
+        self._used_mask = 0  # bits of the used primitives in the primitive index
+        self._primitive_factories = {}  # dict: name of the primitive -> gesture factories that use it, in the order the gestures were added
         self._position_trackers = {name: PositionTracker(name, self._position_class) for name in
                                    self._tracker_names}  # dict: name of the tracker -> tracker instance / can be expanded or decreased on runtime
-        self._landmark_detector = self._landmark_detector_class()
+        self._landmark_detector = self._take_prepared_detector() or self._landmark_detector_class()
+        self._landmark_filter = None  # smooths the landmarks of each frame, None if they are used as detected
         self._active = False
 
-    def update_and_get_activated_gestures(self, frame_data: RawData, image: np.ndarray) -> Set[Gesture]:
+    def update_and_get_activated_gestures(self, frame_data: RawData, frame: FrameContext) -> Set[Gesture]:
         """ 
         - Use the modules landmark detector (ML library) to retrieve the RawData (aka the coordinates of all landmarks) from the frame.
         - Update all position trackers with the RawData, which results in a set of primitives that had changed since the last frame.
@@ -56,16 +73,50 @@ class Module:
 
         :param frame_data: RawData instance to store the detected landmarks in
         :type frame_data: RawData
-        :param image: frame
-        :type image: ndarray
+        :param frame: read-only frame shared by all modules
+        :type frame: FrameContext
         :return: set of the new Gestures that were created
         :rtype: Set[Gesture]
         """
         if not self._active:
             return set()
-        self._landmark_detector.get_raw_data(frame_data, image)
+        self._detect(frame_data, frame)
         return self._update_trackers_and_factories(frame_data)
 
+    def detect_landmarks(self, frame_data: RawData, frame: FrameContext) -> None:
+        """First half of update_and_get_activated_gestures(): only runs the landmark detector on the frame.
+        Does not touch the position trackers, so it may run while update_gestures() is called with an earlier frame's data.
+
+        :param frame_data: RawData instance to store the detected landmarks in
+        :type frame_data: RawData
+        :param frame: read-only frame shared by all modules
+        :type frame: FrameContext
+        """
+        if not self._active:
+            return
+        self._detect(frame_data, frame)
+
+    def update_gestures(self, frame_data: RawData) -> Set[Gesture]:
+        """Second half of update_and_get_activated_gestures(): updates the position trackers and gesture factories
+        with landmarks previously detected by detect_landmarks().
+
+        :param frame_data: RawData instance containing the detected landmarks
+        :type frame_data: RawData
+        :return: set of the new Gestures that were created
+        :rtype: Set[Gesture]
+        """
+        if not self._active:
+            return set()
+        return self._update_trackers_and_factories(frame_data)
+
+    def set_landmark_filter(self, landmark_filter: Optional[LandmarkFilter]) -> None:
+        """Sets the filter the landmarks are smoothed with after they are detected on each frame.
+
+        :param landmark_filter: the filter, None to use the landmarks as detected
+        :type landmark_filter: Optional[LandmarkFilter]
+        """
+        self._landmark_filter = landmark_filter
+
     def add_gesture(self, gesture_name: str, primitives: Set[Primitive]) -> None:
         """Adds a new available gesture to the module.
 
@@ -75,13 +126,14 @@ class Module:
         :type primitives: Set[Primitive]
         """
         self._active = True
-        factory = GestureFactory(gesture_name, self._gesture_class, primitives)
+        factory = GestureFactory(gesture_name, self._gesture_class, primitives, self._primitive_index)
         self._gesture_name_to_factory[gesture_name] = factory
         # detect what gesture factories are using what primitives
         for primitive in primitives:
             if primitive.name not in self._primitive_to_gesture_factories:
                 self._primitive_to_gesture_factories[primitive.name] = set()
             self._primitive_to_gesture_factories[primitive.name].add(factory)
+        self._update_dependencies()
 
     def remove_gesture(self, gesture_name: str) -> None:
         """Remove the gesture from the module. 
@@ -104,23 +156,26 @@ class Module:
 
         for primitive_name in primitves_to_remove:
             self._primitive_to_gesture_factories.pop(primitive_name)
+        self._update_dependencies()
 
         if len(self._primitive_to_gesture_factories) == 0:
             self.reset()
             self._active = False
 
-    def get_currently_used_primitives(self) -> Set[str]:
+    def get_currently_used_primitives(self) -> FrozenSet[str]:
         """Get names of all primitives that are used by any of the available gestures.
 
         :return: names of currently used primitives
-        :rtype: Set[str]
+        :rtype: FrozenSet[str]
         """
-        return set(self._primitive_to_gesture_factories.keys()).copy()
+        return self._used_primitives
 
     def reset(self) -> None:
-        """Resets all position trackers"""
+        """Resets all position trackers and the landmark filter"""
         for name, tracker in self._position_trackers.items():
             tracker.reset()
+        if self._landmark_filter is not None:
+            self._landmark_filter.reset()
 
     @classmethod
     def calibrate(self, params: Optional[Any] = None) -> None:
@@ -129,38 +184,76 @@ class Module:
         pass
 
     @classmethod
-    def pre_initialize(cls) -> None:
+    def pre_initialize(cls, warm_up_frame: Optional[np.ndarray] = None) -> None:
         """Can be called to perform all of the time consuming setup of the Module before initialization.
         If is not called then all the setup is done when the Module is first initialized. 
+        Can be called from a background thread, the Module waits for it to finish when initialized.
+
+        :param warm_up_frame: if given, a landmark detector is also created and run once on this frame, so the ML models
+            are fully loaded before the first camera frame. The detector is then used by the next instance of the Module
+        :type warm_up_frame: Optional[np.ndarray]
         """
-        if cls._pre_initialized: return
-        cls._do_pre_initialization()
-        cls._pre_initialized = True
+        with cls._get_pre_initialization_lock():
+            if not cls._pre_initialized:
+                cls._do_pre_initialization()
+                cls._pre_initialized = True
+            if warm_up_frame is None or not cls._warm_up_on_frame or cls._prepared_detector is not None: return
+            detector = cls._landmark_detector_class()
+            detector.get_raw_data(RawData(), FrameContext(warm_up_frame))
+            cls._prepared_detector = detector
 
     @classmethod
     def _do_pre_initialization(cls) -> None:
         # all the time consuming setup required for each module should be implemented here.
         pass
 
+    @classmethod
+    def _get_pre_initialization_lock(cls) -> threading.Lock:
+        with _pre_initialization_locks_lock:
+            if cls not in _pre_initialization_locks:
+                _pre_initialization_locks[cls] = threading.Lock()
+            return _pre_initialization_locks[cls]
+
+    @classmethod
+    def _take_prepared_detector(cls) -> Optional[LandmarkDetector]:
+        with cls._get_pre_initialization_lock():
+            detector = cls._prepared_detector
+            cls._prepared_detector = None
+        return detector
+
+    def _update_dependencies(self) -> None:
+        # recalculated only when the gestures change
+        self._used_primitives = frozenset(self._primitive_to_gesture_factories.keys())
+        self._used_mask = self._primitive_index.get_mask(self._used_primitives)
+        self._primitive_factories = {name: tuple(factory for factory in self._gesture_name_to_factory.values() if factory in factories)
+                                     for name, factories in self._primitive_to_gesture_factories.items()}
+
+    def _detect(self, frame_data: RawData, frame: FrameContext) -> None:
+        self._landmark_detector.get_raw_data(frame_data, frame)
+        if self._landmark_filter is not None:
+            self._landmark_filter.apply(frame_data)
+
     def _update_trackers_and_factories(self, raw_data: RawData) -> Set[Gesture]:
         # update the position based on raw data aka coordinates
         new_gestures = set()
         for name, tracker in self._position_trackers.items():
-            used_primitives = self.get_currently_used_primitives()
-            changed_primitives = tracker.update(raw_data, used_primitives)
+            changed_primitives = tracker.update(raw_data, self._used_primitives)
             # update factories
             gest_factories_to_update = self._get_factories_to_update(changed_primitives)
+            if not gest_factories_to_update: continue
+            # the position is encoded once for all the used primitives, each factory then only compares the bits
+            encoded = self._primitive_index.encode(tracker.get_current_position(), self._used_mask)
             # update the needed gesture factories
             for gest_factory in gest_factories_to_update:
-                new_gesture = gest_factory.update(tracker)
+                new_gesture = gest_factory.update(tracker, encoded)
                 if new_gesture is not None:  # if new gesture instance created
                     new_gestures.add(new_gesture)
         return new_gestures
 
-    def _get_factories_to_update(self, changed_primitives: Set[str]) -> Set[GestureFactory]:
-        gest_factories_to_update = set()
-        for prim_name in changed_primitives:
-            if prim_name in self._primitive_to_gesture_factories:  # if primitive used by any gestures
-                gest_factories_for_prim = self._primitive_to_gesture_factories[prim_name]
-                gest_factories_to_update = gest_factories_to_update.union(gest_factories_for_prim)
-        return gest_factories_to_update
+    def _get_factories_to_update(self, changed_primitives: Set[str]) -> List[GestureFactory]:
+        # each factory that uses any of the changed primitives, at most once. Other factories are not visited
+        factories = {}  # dict: factory -> None, as an ordered set
+        for name in changed_primitives:
+            for factory in self._primitive_factories.get(name, ()):
+                factories[factory] = None
+        return list(factories)
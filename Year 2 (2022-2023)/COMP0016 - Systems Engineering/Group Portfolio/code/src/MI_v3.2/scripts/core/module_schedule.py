@@ -0,0 +1,47 @@
+'''
+Comments:
+Decides on which frames the Model updates a Module. Not every module needs the full camera rate (e.g. body exercise
+classification or eye gaze), so each can be updated only on every n-th frame and/or at most a number of times per second.
+On the frames in between the Model reuses the landmarks the module detected last.
+'''
+
+
+class ModuleSchedule:
+    def __init__(self, frame_stride: int = 1, max_update_rate: float = 0) -> None:
+        """
+        :param frame_stride: the module is updated on every frame_stride-th frame, defaults to 1 (every frame)
+        :type frame_stride: int
+        :param max_update_rate: maximum number of updates per second, 0 for no limit, defaults to 0
+        :type max_update_rate: float
+        """
+        self._frame_stride = max(1, int(frame_stride))
+        self._update_interval = 1 / max_update_rate if max_update_rate > 0 else 0
+        self._frames_since_update = 0
+        self._next_update_time = None  # None until the first update
+
+    def is_every_frame(self) -> bool:
+        return self._frame_stride == 1 and self._update_interval == 0
+
+    def should_update(self, now: float) -> bool:
+        """Called once per frame, returns whether the module should be updated on it.
+        The module is always updated on the first frame.
+
+        :param now: time of the frame in seconds (perf_counter)
+        :type now: float
+        :return: True if the module is due for an update
+        :rtype: bool
+        """
+        self._frames_since_update += 1
+        if self._next_update_time is not None:
+            if self._frames_since_update < self._frame_stride: return False
+            if now < self._next_update_time: return False
+        self._frames_since_update = 0
+        if self._update_interval:
+            # keeps the average rate at max_update_rate even though the frames do not arrive exactly on time,
+            # unless too far behind to catch up (e.g. the frames stopped for a while)
+            if self._next_update_time is None or now - self._next_update_time > self._update_interval:
+                self._next_update_time = now
+            self._next_update_time += self._update_interval
+        else:
+            self._next_update_time = now
+        return True
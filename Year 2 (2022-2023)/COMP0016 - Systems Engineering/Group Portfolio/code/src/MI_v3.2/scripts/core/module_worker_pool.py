@@ -0,0 +1,139 @@
+'''
+Comments:
+Long-lived worker threads used by the Model to update all of its Modules on the same frame in parallel.
+Each Module gets one worker for as long as it is in the Model, so no threads are created per frame.
+'''
+import threading
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+
+from .gesture import Gesture
+from .module import Module
+from .raw_data import RawData
+
+
+# task run by a worker on its module: takes the module and the RawData to fill in, returns the activated gestures
+ModuleTask = Callable[[Module, RawData], Set[Gesture]]
+
+
+class ModuleWorker:
+    """Thread that runs a task on a single Module every time one is submitted to it"""
+
+    def __init__(self, name: str, module: Module, on_done: Callable[[], None]) -> None:
+        self._name = name
+        self._module = module
+        self._on_done = on_done  # called by the worker thread once the submitted task is done
+        self._task = None
+        self._frame_data = None
+        self._new_gestures = set()
+        self._error = None
+        self._active = True
+        self._job_ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"Thread Model: {name}", daemon=True)
+        self._thread.start()
+
+    def submit(self, task: ModuleTask) -> None:
+        """Hands a new task over to the worker thread. Must not be called again before the previous task is done.
+
+        :param task: task to run on the module
+        :type task: ModuleTask
+        """
+        self._task = task
+        self._frame_data = RawData()
+        self._new_gestures = set()
+        self._error = None
+        self._job_ready.set()
+
+    def get_result(self) -> Tuple[Set[Gesture], RawData]:
+        """Returns the result of the last task. Re-raises any exception raised by the module.
+
+        :return: the gestures activated in the module and the landmarks detected by it
+        :rtype: Tuple[Set[Gesture], RawData]
+        """
+        if self._error is not None:
+            raise self._error
+        return self._new_gestures, self._frame_data
+
+    def close(self) -> None:
+        """Stops the worker thread. Returns once the thread has finished."""
+        self._active = False
+        self._job_ready.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            self._job_ready.wait()
+            self._job_ready.clear()
+            if not self._active:
+                return
+            try:
+                self._new_gestures = self._task(self._module, self._frame_data)
+            except Exception as error:
+                self._error = error
+            finally:
+                self._task = None
+                self._on_done()
+
+
+class ModuleWorkerPool:
+    """Keeps one ModuleWorker per Module and gathers the results of all of them behind a single barrier"""
+
+    def __init__(self) -> None:
+        self._workers = {}  # dict: name of the module -> ModuleWorker instance
+        self._pending = 0  # number of workers that have not yet finished the current frame
+        self._all_done = threading.Condition()
+
+    def add(self, name: str, module: Module) -> None:
+        """Starts a worker for the given module. If the module already has a worker nothing is done.
+
+        :param name: name of the module
+        :type name: str
+        :param module: module to be updated by the worker
+        :type module: Module
+        """
+        if name in self._workers: return
+        self._workers[name] = ModuleWorker(name, module, self._worker_done)
+
+    def remove(self, name: str) -> None:
+        """Stops the worker of the given module, if it has one.
+
+        :param name: name of the module
+        :type name: str
+        """
+        worker = self._workers.pop(name, None)
+        if worker is not None:
+            worker.close()
+
+    def close(self) -> None:
+        """Stops all the workers"""
+        for name in list(self._workers.keys()):
+            self.remove(name)
+
+    def run(self, task: ModuleTask, names: Optional[Iterable[str]] = None) -> Dict[str, Tuple[Set[Gesture], RawData]]:
+        """Submits the task to every worker at once and waits until all of them are done.
+        The time taken is therefore that of the slowest module rather than the sum of all of them.
+
+        :param task: task to run on every module, e.g. updating it with the current frame
+        :type task: ModuleTask
+        :param names: names of the modules to run the task on, all of them if None
+        :type names: Optional[Iterable[str]]
+        :return: name of each module mapped to the gestures activated in it and the landmarks detected by it
+        :rtype: Dict[str, Tuple[Set[Gesture], RawData]]
+        """
+        if names is None:
+            workers = dict(self._workers)
+        else:
+            workers = {name: self._workers[name] for name in names}
+        with self._all_done:
+            self._pending = len(workers)
+        for worker in workers.values():
+            worker.submit(task)
+        with self._all_done:
+            self._all_done.wait_for(lambda: self._pending == 0)
+        return {name: worker.get_result() for name, worker in workers.items()}
+
+    def _worker_done(self) -> None:
+        with self._all_done:
+            self._pending -= 1
+            if self._pending == 0:
+                self._all_done.notify_all()
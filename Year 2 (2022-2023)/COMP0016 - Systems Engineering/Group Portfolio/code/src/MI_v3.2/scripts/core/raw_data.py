@@ -2,11 +2,72 @@
 Author: Carmen Meinson
 '''
 
-from typing import Dict, Optional, Set
+from collections.abc import MutableMapping
+from itertools import chain
+from typing import Dict, Iterable, Iterator, Optional, Set
 
 import numpy as np
 
 
+class LandmarkArray(MutableMapping):
+    """Landmarks of a body part stored as the rows of a single array (e.g. the 21 x 3 landmarks of a hand),
+    that can still be accessed by name like the dict of landmarks of any other body part.
+    Landmarks added by name that are not rows of the array (e.g. derived ones) are kept alongside it."""
+
+    def __init__(self, array: np.ndarray, rows: Dict[str, int]) -> None:
+        """
+        :param array: coordinates of the landmarks, one row per landmark
+        :type array: np.ndarray
+        :param rows: dict: name of the landmark -> its row in the array. Rows without a name are only in the array
+        :type rows: Dict[str, int]
+        """
+        self._array = array
+        self._rows = rows
+        self._extra = {}  # dict: name -> coordinates of the landmarks that are not rows of the array
+
+    def get_array(self) -> np.ndarray:
+        return self._array
+
+    def get_rows(self) -> Dict[str, int]:
+        return self._rows
+
+    def stack(self, names: Iterable[str]) -> np.ndarray:
+        """
+        :param names: names of the landmarks
+        :type names: Iterable[str]
+        :return: the coordinates of the landmarks as one array, one row per landmark in the given order
+        :rtype: np.ndarray
+        """
+        names = list(names)
+        if all(name in self._rows and name not in self._extra for name in names):
+            return self._array[[self._rows[name] for name in names]]
+        return np.array([self[name] for name in names])
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        if name in self._extra:
+            return self._extra[name]
+        return self._array[self._rows[name]]  # a view of the row
+
+    def __setitem__(self, name: str, coordinates: np.ndarray) -> None:
+        self._extra[name] = coordinates
+
+    def __delitem__(self, name: str) -> None:
+        if name not in self: raise KeyError(name)
+        self._extra.pop(name, None)
+        if name in self._rows:
+            # copied rather than changed, as the same rows may be shared by the arrays of several body parts
+            self._rows = {key: row for key, row in self._rows.items() if key != name}
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._extra or name in self._rows
+
+    def __iter__(self) -> Iterator[str]:
+        return chain(self._rows, (name for name in self._extra if name not in self._rows))
+
+    def __len__(self) -> int:
+        return len(self._rows) + sum(1 for name in self._extra if name not in self._rows)
+
+
 class RawData:
     def __init__(self):
         self._data = {}  # "body": None, "head":None ....
@@ -15,6 +76,19 @@ class RawData:
         if bodypart_name not in self._data: self._data[bodypart_name] = {}
         self._data[bodypart_name][landmark_name] = coordinates
 
+    def add_landmark_array(self, bodypart_name: str, array: np.ndarray, rows: Dict[str, int]) -> None:
+        """Adds all the landmarks of a body part at once, as the rows of a single array.
+        They can still be read by name with get_data and get_landmark, and the array itself with get_array.
+
+        :param bodypart_name: name of the body part e.g. "Left"
+        :type bodypart_name: str
+        :param array: coordinates of the landmarks, one row per landmark
+        :type array: np.ndarray
+        :param rows: dict: name of the landmark -> its row in the array
+        :type rows: Dict[str, int]
+        """
+        self._data[bodypart_name] = LandmarkArray(array, rows)
+
     def combine(self, raw_data: 'RawData') -> None:
         """Combine the data from 2 RawData instances.
         Note the instances MUST contain different body parts.
@@ -46,6 +120,18 @@ class RawData:
         if bodypart_name not in self._data: return None
         return self._data[bodypart_name]
 
+    def get_array(self, bodypart_name: str) -> Optional[np.ndarray]:
+        """Returns the landmarks of the body part as a single array, if they were added with add_landmark_array
+
+        :param bodypart_name: body part e.g. "Left"
+        :type bodypart_name: str
+        :return: coordinates of the landmarks, one row per landmark (see LandmarkArray.get_rows), None if not added as an array
+        :rtype: Optional[np.ndarray]
+        """
+        data = self._data.get(bodypart_name)
+        if not isinstance(data, LandmarkArray): return None
+        return data.get_array()
+
     def get_landmark(self, bodypart_name: str, landmark_name: str) -> Optional[np.ndarray]:
         """Returns the coordinates of the landmark, if it has been added to the specified body part (aka if it has been detected in the frame)
 
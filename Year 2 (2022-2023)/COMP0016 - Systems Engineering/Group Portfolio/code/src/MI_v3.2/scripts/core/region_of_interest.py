@@ -0,0 +1,140 @@
+'''
+Comments:
+Tracks the region of the frame around the landmarks a detector found on the previous frame, so the next frame only
+needs to be processed within it. The region is an expanded bounding box of the landmarks, and is only moved once the
+landmarks get close to its edge, so the ML libraries that track between frames themselves (e.g. MediaPipe with
+static_image_mode=False) mostly see a steady input.
+If nothing is detected within the region the whole of the next frame is processed (see use_full_frame), rather than
+processing the same frame a second time, and every redetect_interval frames the whole frame is processed anyway,
+so e.g. a second hand entering the frame is noticed.
+'''
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .frame_context import FrameContext
+
+Region = Tuple[int, int, int, int]  # (x_min, y_min, x_max, y_max) in pixels
+
+
+class RegionOfInterestTracker:
+    def __init__(self, expansion: float = 2.0, min_size: float = 0.25, redetect_interval: int = 30) -> None:
+        """
+        :param expansion: size of the region relative to the bounding box of the landmarks, defaults to 2.0
+        :type expansion: float
+        :param min_size: minimum width and height of the region as a fraction of the frame, defaults to 0.25
+        :type min_size: float
+        :param redetect_interval: the whole frame is processed at least every this many frames, 0 for never, defaults to 30
+        :type redetect_interval: int
+        """
+        self._expansion = max(1.0, expansion)
+        self._min_size = min_size
+        self._redetect_interval = redetect_interval
+        self._box = None  # (x_min, y_min, x_max, y_max) of the landmarks on the last frame, normalised to the frame
+        self._region = None  # Region processed on the last frame, None if the whole frame
+        self._frames_since_full_frame = 0
+
+    def get_region(self, height: int, width: int) -> Optional[Region]:
+        """Returns the region of the next frame to process, and advances to the next frame.
+
+        :param height: height of the frame
+        :type height: int
+        :param width: width of the frame
+        :type width: int
+        :return: the region in pixels, or None if the whole frame should be processed
+        :rtype: Optional[Region]
+        """
+        self._frames_since_full_frame += 1
+        if self._box is None or (self._redetect_interval and self._frames_since_full_frame >= self._redetect_interval):
+            self._region = None
+        elif self._region is None or not self._is_box_inside(self._region, height, width):
+            self._region = self._expand_box(height, width)
+        if self._region is None:
+            self._frames_since_full_frame = 0
+        return self._region
+
+    def crop(self, frame: FrameContext, colour: str = "rgb") -> Tuple[np.ndarray, Optional[Region]]:
+        """
+        :param frame: the frame to crop
+        :type frame: FrameContext
+        :param colour: "bgr" or "rgb", defaults to "rgb"
+        :type colour: str
+        :return: the image to process (the region of the frame, or the whole frame) and the region, None if the whole frame
+        :rtype: Tuple[np.ndarray, Optional[Region]]
+        """
+        height, width = frame.get_size()
+        region = self.get_region(height, width)
+        if region is None:
+            return (frame.get_rgb() if colour == "rgb" else frame.get_bgr()), None
+        return frame.get_region(*region, colour), region
+
+    def use_full_frame(self) -> None:
+        """Called when nothing was detected within the region, so the whole of the next frame is processed."""
+        self._box = None
+        self._region = None
+
+    def update(self, points: Optional[np.ndarray]) -> None:
+        """Sets the landmarks detected on the current frame, from which the region of the next frame is calculated.
+
+        :param points: normalised xy(z) coordinates in the whole frame of all the landmarks of interest (n x 2 or n x 3), None or empty if nothing was detected
+        :type points: Optional[np.ndarray]
+        """
+        if points is None or len(points) == 0:
+            self._box = None
+            return
+        minimum = points[:, :2].min(axis=0)
+        maximum = points[:, :2].max(axis=0)
+        self._box = (minimum[0], minimum[1], maximum[0], maximum[1])
+
+    def reset(self) -> None:
+        self._box = None
+        self._region = None
+
+    @staticmethod
+    def to_frame(points: np.ndarray, region: Optional[Region], height: int, width: int) -> np.ndarray:
+        """Maps normalised coordinates within the region to normalised coordinates within the whole frame.
+        The z coordinate (if any) is scaled like x, as the ML libraries give it relative to the image width.
+
+        :param points: normalised xy(z) coordinates within the region (n x 2 or n x 3)
+        :type points: np.ndarray
+        :param region: the region the points were detected in, None if the whole frame
+        :type region: Optional[Region]
+        :param height: height of the whole frame
+        :type height: int
+        :param width: width of the whole frame
+        :type width: int
+        :return: the coordinates within the whole frame
+        :rtype: np.ndarray
+        """
+        if region is None:
+            return points
+        x_min, y_min, x_max, y_max = region
+        scale_x = (x_max - x_min) / width
+        scale_y = (y_max - y_min) / height
+        mapped = points * np.array([scale_x, scale_y, scale_x][:points.shape[-1]])
+        mapped[..., 0] += x_min / width
+        mapped[..., 1] += y_min / height
+        return mapped
+
+    def _is_box_inside(self, region: Region, height: int, width: int) -> bool:
+        # the landmarks have to stay clear of the edges of the region by a quarter of the margin around them
+        x_min, y_min, x_max, y_max = self._box
+        margin_x = (x_max - x_min) * (self._expansion - 1) / 8
+        margin_y = (y_max - y_min) * (self._expansion - 1) / 8
+        return (region[0] <= (x_min - margin_x) * width and region[1] <= (y_min - margin_y) * height
+                and (x_max + margin_x) * width <= region[2] and (y_max + margin_y) * height <= region[3])
+
+    def _expand_box(self, height: int, width: int) -> Optional[Region]:
+        x_min, y_min, x_max, y_max = self._box
+        centre_x = (x_min + x_max) / 2
+        centre_y = (y_min + y_max) / 2
+        half_width = max((x_max - x_min) * self._expansion, self._min_size) / 2
+        half_height = max((y_max - y_min) * self._expansion, self._min_size) / 2
+        region = (int(max(0, centre_x - half_width) * width), int(max(0, centre_y - half_height) * height),
+                  int(np.ceil(min(1, centre_x + half_width) * width)), int(np.ceil(min(1, centre_y + half_height) * height)))
+        if region[2] - region[0] < 2 or region[3] - region[1] < 2:
+            return None
+        # not worth cropping if the region is most of the frame anyway
+        if (region[2] - region[0]) * (region[3] - region[1]) > 0.8 * width * height:
+            return None
+        return region
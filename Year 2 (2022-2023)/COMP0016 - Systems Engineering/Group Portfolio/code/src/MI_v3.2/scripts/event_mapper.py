@@ -1,18 +1,21 @@
 '''
 Author: Carmen Meinson
 '''
-from typing import Set, Dict, Optional
+from typing import Callable, Set, Dict, Optional, TYPE_CHECKING
 
 from scripts.core import Model
-from scripts.gesture_event_handlers import *
 from scripts.gesture_events import *
 from scripts.tools.json_editors.event_editor import EventEditor
 #from scripts.tools.json_editors.hotkeys_editor import HotkeysEditor
 from .gesture_loader import GestureLoader
 
+if TYPE_CHECKING:
+    # not imported at runtime, the handlers are only needed once MI runs (see ModeController)
+    from scripts.gesture_event_handlers import GestureEventHandlers
+
 
 class EventMapper:
-    def __init__(self, event_handlers: GestureEventHandlers):
+    def __init__(self, event_handlers: "GestureEventHandlers"):
         self._events = EventEditor().get_all_data()
 
         self._event_classes = GestureEvents()
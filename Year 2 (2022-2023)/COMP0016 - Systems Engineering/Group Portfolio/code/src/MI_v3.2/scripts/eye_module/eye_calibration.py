@@ -93,7 +93,8 @@ class HeadCalibrator:
             elapsed = current - start
  
             _image, _ = self.cap.read()
-            _final_image = np.hstack((_image, black_image))
+            # the camera frames are as captured, mirrored here as the View does, so the preview moves with the user
+            _final_image = np.hstack((cv.flip(_image, 1), black_image))
             cv.imshow(self.windowName,_final_image)
             cv.waitKey(125)
 
@@ -137,7 +138,8 @@ class HeadCalibrator:
 
         while elapsed < seconds:
             _image, _ = self.cap.read()
-            _final_image = np.hstack((_image, black_image))
+            # the camera frames are as captured, mirrored here as the View does, so the preview moves with the user
+            _final_image = np.hstack((cv.flip(_image, 1), black_image))
             cv.imshow(self.windowName,_final_image)
             cv.waitKey(125)
 
@@ -7,10 +7,11 @@ from typing import List, Optional
 
 import numpy as np
 
-from scripts.core import RawData
+from scripts.core import FrameContext, RawData, RegionOfInterestTracker
 from scripts.eye_module.core.result_objs import FaceResult, LandMarkResult
 from scripts.eye_module.gaze_main import *
 from scripts.eye_module.pose3d.pose3d import onlyNose
+from scripts.tools import Config
 
 
 class EyeLandmarkDetector:
@@ -19,35 +20,52 @@ class EyeLandmarkDetector:
         self.my_process = ProcessOnFrame(self.my_arg)
         self.my_mouse_controller = MouseController(self.my_arg)
         self.my_pose3d_obj = onlyNose()
+        # if enabled, face detection, head pose, face landmarks and gaze only process the region around the face
+        # of the previous frame. pose3d still gets the whole frame
+        roi_config = Config().get_data("modules/eye/roi_tracking")
+        self._roi_tracker = None
+        if roi_config["enabled"]:
+            self._roi_tracker = RegionOfInterestTracker(roi_config["expansion"], roi_config["min_size"], roi_config["redetect_interval"])
 
-    def get_raw_data(self, raw_data: RawData, image: np.ndarray) -> None:
-        """Adds the xyz coordinates of all the hand landmarks detected on the image into the RawData instance.
+    def get_raw_data(self, raw_data: RawData, frame: FrameContext) -> None:
+        """Adds the xyz coordinates of all the hand landmarks detected on the frame into the RawData instance.
 
         :param raw_data: RawData instance to add the landmarks to
         :type raw_data: RawData
-        :param image: Image to process with mediapipe and read the landmarks locations from
-        :type image: ndarray
+        :param frame: Frame to process with mediapipe and read the landmarks locations from
+        :type frame: FrameContext
         """
 
-        # NOTE: Old code mirrors the image before process
-        image = cv2.flip(image, 1)
+        # NOTE: the models process the frame as captured (not mirrored), so the eye landmarks are not mirrored either
+        image = frame.get_bgr()
+
+        height, width = image.shape[:2]
+        region = self._roi_tracker.get_region(height, width) if self._roi_tracker is not None else None
+        # (x, y) of the top left corner of the processed image within the frame
+        offset = np.array(region[:2]) if region is not None else np.zeros(2, dtype=int)
+        face_image = image[region[1]:region[3], region[0]:region[2]] if region is not None else image
 
         # check if full face has been detected
-        detections = self._check_face(image)
+        detections = self._check_face(face_image)
+        if region is not None and not detections:
+            # lost within the region, the next frame is processed whole rather than this one again
+            self._roi_tracker.use_full_frame()
+        if self._roi_tracker is not None:
+            self._roi_tracker.update(self._get_headbox_points(detections, offset, height, width))
         if detections:
-            self._add_headbox_landmark(raw_data, detections)
+            self._add_headbox_landmark(raw_data, detections, offset)
 
             # Get head info
             # Roll, Pitch, Yaw
-            head_info = self._process_head_pos(image)
+            head_info = self._process_head_pos(face_image)
             self._add_head_angle_landmark(raw_data, head_info)
 
             # Get FaceLandMark
-            landmarks = self._process_face_landmark(image)
+            landmarks = self._process_face_landmark(face_image)
             self._add_face_landmark(raw_data, landmarks)
 
             # calculate gaze
-            gaze_vector = self._process_eye_gaze(head_info, landmarks, detections, image)
+            gaze_vector = self._process_eye_gaze(head_info, landmarks, detections, face_image)
             self._add_gaze_landmark(raw_data, gaze_vector)
 
             # Add nose3d
@@ -101,16 +119,24 @@ class EyeLandmarkDetector:
         raw_data.add_landmark("eye", "headPos", head_info)
 
     @staticmethod
-    def _add_headbox_landmark(raw_data: RawData, detections: List[FaceResult]) -> None:
+    def _get_headbox_points(detections: List[FaceResult], offset: np.ndarray, height: int, width: int) -> Optional[np.ndarray]:
+        # normalised corners of the head box within the whole frame
+        if not detections:
+            return None
+        roi = detections[0]
+        return np.array([roi.position + offset, roi.position + roi.size + offset]) / np.array([width, height])
+
+    @staticmethod
+    def _add_headbox_landmark(raw_data: RawData, detections: List[FaceResult], offset: np.ndarray) -> None:
         if not detections:
             return
         roi = detections[0]
 
-        # TOP-LEFT coordinate
-        coor_tl = roi.position
+        # TOP-LEFT coordinate, within the whole frame
+        coor_tl = roi.position + offset
 
         # bottom right coordinate
-        coor_br = roi.position + roi.size
+        coor_br = roi.position + roi.size + offset
 
         raw_data.add_landmark("eye", "headBox_tl", coor_tl)
         raw_data.add_landmark("eye", "headBox_br", coor_br)
@@ -148,8 +174,8 @@ class EyeLandmarkDetector:
             return
         landmark = landmarks[0]
 
-        frame_to_crop = image.copy()
-        outputs = self.my_mouse_controller.landmarkPostProcessing(frame_to_crop, landmark, roi, image)
+        # the eye crops are only read from, so there is no need to copy the frame for them
+        outputs = self.my_mouse_controller.landmarkPostProcessing(image, landmark, roi, image)
 
         left_eye = outputs[0]
         right_eye = outputs[1]
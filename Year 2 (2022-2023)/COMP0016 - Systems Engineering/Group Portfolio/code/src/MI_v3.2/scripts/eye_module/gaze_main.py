@@ -148,7 +148,6 @@ class ProcessOnFrame:
         frame: Pre-Processed frame
         """
 
-        orig_image = frame.copy()
         frame = frame.transpose((2, 0, 1))  # HWC to CHW
         frame = np.expand_dims(frame, axis=0)
         return frame
@@ -0,0 +1,195 @@
+"""
+Comments:
+Optional pipelined version of the MotionInputAPI frame loop.
+Capture, landmark inference and gesture/event dispatch each run on their own thread, while the display
+stays on the main thread (OpenCV windows must be handled there). Mode and camera changes are also made by the main
+thread, which holds the stages that use the model or the camera meanwhile, and the event handlers only queue their
+changes of the display elements for the main thread (see View.update_display_element). The stages are connected by LatestQueues
+that only ever hold the newest item, so a slow stage makes the earlier ones drop stale frames instead of
+building up a backlog, and a frame is at most one item behind at every stage.
+"""
+from scripts.tools.logger import get_logger
+log = get_logger(__name__)
+
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from scripts.core.model import Model
+from scripts.mode_controller import ModeController
+from scripts.tools.camera import Camera
+from scripts.tools.latency_metrics import LatencyMetrics
+
+# how long the stage threads wait for an item before checking whether the pipeline was stopped
+STAGE_TIMEOUT = 0.1
+
+
+class LatestQueue:
+    """Queue holding at most one item. Putting an item while the previous one has not been taken drops the previous one."""
+
+    def __init__(self) -> None:
+        self._item = None
+        self._has_item = False
+        self._dropped = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def put(self, item: Any) -> None:
+        with self._condition:
+            if self._has_item:
+                self._dropped += 1
+            self._item = item
+            self._has_item = True
+            self._condition.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Any]:
+        """Takes the newest item, waiting for one if the queue is empty.
+
+        :param timeout: maximum number of seconds to wait, waits until an item is put or the queue is closed if None
+        :type timeout: Optional[float]
+        :return: the newest item, or None if the timeout passed or the queue was closed
+        :rtype: Optional[Any]
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._has_item or self._closed, timeout):
+                return None
+            if not self._has_item:
+                return None
+            item = self._item
+            self._item = None
+            self._has_item = False
+            return item
+
+    def close(self) -> None:
+        """Wakes up anyone waiting on the queue. No more items are returned afterwards."""
+        with self._condition:
+            self._closed = True
+            self._item = None
+            self._has_item = False
+            self._condition.notify_all()
+
+    def get_dropped(self) -> int:
+        """
+        :return: number of items that were replaced before anyone took them
+        :rtype: int
+        """
+        return self._dropped
+
+
+class FramePipeline:
+    def __init__(self, camera: Camera, model: Model, mode_controller: ModeController) -> None:
+        self._camera = camera
+        self._model = model
+        self._mode_controller = mode_controller
+        self._latency_metrics = LatencyMetrics()
+        # modules and events may only be added or removed (by a mode change) while no frame is inferred or dispatched
+        self._inference_lock = threading.Lock()
+        self._dispatch_lock = threading.Lock()
+        # the camera may only be changed while the capture stage is not reading it
+        self._capture_lock = threading.Lock()
+
+        self._to_inference = LatestQueue()  # (image, camera data)
+        self._to_dispatch = LatestQueue()  # (image, camera data, RawData)
+        self._to_display = LatestQueue()  # (image, camera data)
+
+        self._active = False
+        self._error = None
+        self._threads = [
+            threading.Thread(target=self._run_stage, args=(self._capture,), name="Thread Pipeline: capture", daemon=True),
+            threading.Thread(target=self._run_stage, args=(self._infer,), name="Thread Pipeline: inference", daemon=True),
+            threading.Thread(target=self._run_stage, args=(self._dispatch,), name="Thread Pipeline: dispatch", daemon=True),
+        ]
+
+    def start(self) -> None:
+        self._active = True
+        for thread in self._threads:
+            thread.start()
+        log.info("Frame pipeline started")
+
+    def stop(self) -> None:
+        """Stops all the stages. Returns once the stage threads have finished, so the model can be safely changed afterwards."""
+        self._active = False
+        for queue in (self._to_inference, self._to_dispatch, self._to_display):
+            queue.close()
+        for thread in self._threads:
+            if thread.is_alive():
+                thread.join()
+        log.info(f"Frame pipeline stopped, dropped frames: {self.get_dropped_frames()}")
+
+    def get_display_frame(self, timeout: Optional[float] = STAGE_TIMEOUT) -> Optional[Tuple[np.ndarray, Dict[str, Any]]]:
+        """Returns the newest frame that went through all the stages, to be displayed by the main thread.
+        Re-raises any exception that stopped one of the stages.
+
+        :param timeout: maximum number of seconds to wait for a frame
+        :type timeout: Optional[float]
+        :return: the image and the camera data read with it, or None if no frame is ready
+        :rtype: Optional[Tuple[np.ndarray, Dict[str, Any]]]
+        """
+        if self._error is not None:
+            raise self._error
+        return self._to_display.get(timeout)
+
+    def change_mode_if_needed(self) -> None:
+        """Changes the mode if one was set (e.g. by an event handler on the dispatch thread). Called by the main thread,
+        the inference and dispatch stages wait meanwhile."""
+        if not self._mode_controller.is_mode_change_needed(): return
+        with self._inference_lock, self._dispatch_lock:
+            self._mode_controller.change_mode_if_needed()
+
+    def change_camera(self, pressed_key: int) -> bool:
+        """Camera.change_camera() called by the main thread, the capture stage waits meanwhile.
+
+        :param pressed_key: the key pressed in the view
+        :type pressed_key: int
+        :return: see Camera.change_camera()
+        :rtype: bool
+        """
+        with self._capture_lock:
+            return self._camera.change_camera(pressed_key)
+
+    def get_dropped_frames(self) -> Dict[str, int]:
+        """
+        :return: number of stale frames dropped in front of each stage
+        :rtype: Dict[str, int]
+        """
+        return {
+            "inference": self._to_inference.get_dropped(),
+            "dispatch": self._to_dispatch.get_dropped(),
+            "display": self._to_display.get_dropped()
+        }
+
+    def _run_stage(self, stage: Callable[[], None]) -> None:
+        try:
+            while self._active:
+                stage()
+        except Exception as error:
+            log.exception(f"Frame pipeline stage failed: {error}")
+            self._error = error
+            self._active = False
+            self._to_display.close()
+
+    def _capture(self) -> None:
+        with self._capture_lock:
+            with self._latency_metrics.measure("camera_read"):
+                # not waiting indefinitely, so a camera that stopped giving frames can still be changed
+                image, data = self._camera.read(STAGE_TIMEOUT)
+        if image is None: return
+        self._to_inference.put((image, data))
+
+    def _infer(self) -> None:
+        item = self._to_inference.get(STAGE_TIMEOUT)
+        if item is None: return
+        image, data = item
+        with self._inference_lock:
+            frame_data = self._model.detect_landmarks(image)
+        self._to_dispatch.put((image, data, frame_data))
+
+    def _dispatch(self) -> None:
+        item = self._to_dispatch.get(STAGE_TIMEOUT)
+        if item is None: return
+        image, data, frame_data = item
+        with self._dispatch_lock:
+            self._model.dispatch(frame_data)
+        # the frame is only handed over to be drawn on once no other stage reads it anymore
+        self._to_display.put((image, data))
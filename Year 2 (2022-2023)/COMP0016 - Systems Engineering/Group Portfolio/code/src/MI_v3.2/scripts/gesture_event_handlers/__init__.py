@@ -22,8 +22,6 @@ from .extremity_actions import ExtremityActions
 from .in_air_keyboard import InAirKeyboard
 from .keyboard import Keyboard
 from .nose_box import NoseBox
-from .speaker_identification import SpeakerIdentification
-from .transcription import Transcriber
 
 try:
     from .gaming_joystick import GamingJoystick
@@ -516,6 +514,7 @@ class GestureEventHandlers:
     def _check_transcription_initialized(self):
         """ Check Transcription """
         if self._transcriber is None:
+            from .transcription import Transcriber  # imported on first use, as it loads the speech module
             self._transcriber = Transcriber(self._view)    
 # -------------------------------------------------------------------------------------------
 # Correction mode           
@@ -556,4 +555,5 @@ class GestureEventHandlers:
     def _check_speaker_identification_initialized(self):
         """ Check Speaker Identification """
         if self._speaker_identification is None:
+            from .speaker_identification import SpeakerIdentification  # imported on first use, as it loads the speech module
             self._speaker_identification = SpeakerIdentification(self._view)
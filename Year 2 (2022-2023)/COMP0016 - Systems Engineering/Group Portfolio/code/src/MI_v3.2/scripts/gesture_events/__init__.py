@@ -1,112 +1,61 @@
 """
 Author: Carmen Meinson
 """
-from scripts.gesture_events.extremity_walking_event import (
-    ExtremityWalkingEvent,
-)
-from scripts.gesture_events.eye_mode_2 import EyeMode2Event
-from scripts.gesture_events.fps_event import FpsMode1Event, FpsMode2Event, FpsMode3Event
-from scripts.gesture_events.gamepad_event import GamepadMode1Event, GamepadMode2Event, GamepadMode3Event
-from .boundaries_nose_box_event import BoundariesNoseBoxEvent
-from .click_press_event import (
-    ClickPressEvent,
-    SingleHandExclusiveClickPressEvent
-)
-# hand
-from .hand_active_event import HandActiveEvent
-from .hand_depth_click_event import HandDepthClickEvent
-from .palm_height_change_event import PalmHeightChangeEvent
-from .customized_gesture_event import CustomizedGestureEvent
-from .gestures_active_event import GesturesActiveEvent
-from .scroll_event import ScrollEvent
-from .touch_press_event import TouchPressEvent
-from .zoom_event import ZoomEvent
-from .pen_drag_event import PenDragEvent
-from.hand_drive_event import HandDriveRotateEvent, HandDriveForwardBackwardEvent, HandDriveUpDownEvent
-from .mr_swipe_event import MRSwipeEvent
-from .kiosk_swipe_event import KioskSwipeEvent
-from .samurai_swipe_event import SamuraiSwipeEvent
-from .spiderman_thwip import SpidermanThwipEvent
-# body
-from .exercise_event import ExerciseEvent
-from .extremity_trigger_event import ExtremityTriggerEvent
-from .gun_move_event import GunMoveEvent
-from .idle_state_change_event import IdleStateChangeEvent
-from .joystick_event import JoystickButtonPressEvent, JoystickWristEvent
-from .keyboard_active_event import KeyboardActiveEvent
-from .keyboard_click_event import KeyboardClickEvent
-# head
-from .mouth_trigger_event import (
-    OpenMouthEvent,
-    RaiseEyeBrowEvent,
-    SmilingEvent,
-    FishFaceEvent,
-    RotationLeftEvent,
-    RotationRightEvent
-)
-from .move_nose_box_event import MoveNoseBoxEvent
-from .nose_direction_tracking_event import NoseDirectionTrackingEvent
-from .nose_direction_tracking_event_nose_box import \
-    NoseDirectionTrackingEventNoseBox
-from .nose_scroll_event import NoseScrollEvent
-from .nose_tracking_event import NoseTrackingEvent
-from .nose_zoom_event import NoseZoomEvent
-from .eye_tracking_event import EyeTrackingEvent
-# speech
-from .speech_event import SpeechEvent
+from scripts.tools.lazy_registry import LazyRegistry
 
-# this should store every available handler
-events = {
-    "ClickPressEvent": ClickPressEvent,
-    "SingleHandExclusiveClickPressEvent": SingleHandExclusiveClickPressEvent,
-    "TouchPressEvent": TouchPressEvent,
-    "KeyboardActiveEvent": KeyboardActiveEvent,
-    "KeyboardClickEvent": KeyboardClickEvent,
-    "PalmHeightChangeEvent": PalmHeightChangeEvent,
-    "IdleStateChangeEvent": IdleStateChangeEvent,
-    "HandActiveEvent": HandActiveEvent,
-    "HandDepthClickEvent": HandDepthClickEvent,
-    "ScrollEvent": ScrollEvent,
-    "ExtremityTriggerEvent": ExtremityTriggerEvent,
-    "ZoomEvent": ZoomEvent,
-    "ExerciseEvent": ExerciseEvent,
-    "ExtremityWalkingEvent": ExtremityWalkingEvent,
-    "GamepadMode1Event": GamepadMode1Event,
-    "GamepadMode2Event": GamepadMode2Event,
-    "GamepadMode3Event": GamepadMode3Event,
-    "FpsMode1Event": FpsMode1Event,
-    "FpsMode2Event": FpsMode2Event,
-    "FpsMode3Event": FpsMode3Event,
-    "SpeechEvent": SpeechEvent,
-    "SmilingEvent": SmilingEvent,
-    "FishFaceEvent": FishFaceEvent,
-    "RotationLeftEvent": RotationLeftEvent,
-    "RotationRightEvent": RotationRightEvent,
-    "NoseTrackingEvent": NoseTrackingEvent,
-    "NoseDirectionTrackingEvent": NoseDirectionTrackingEvent,
-    "OpenMouthEvent": OpenMouthEvent,
-    "RaiseEyeBrowEvent": RaiseEyeBrowEvent,
-    "GesturesActiveEvent": GesturesActiveEvent,
-    "PenDragEvent": PenDragEvent,
-    "EyeTrackingEvent": EyeTrackingEvent,
-    "EyeMode2Event": EyeMode2Event,
-    "NoseDirectionTrackingEventNoseBox": NoseDirectionTrackingEventNoseBox,
-    "MoveNoseBoxEvent": MoveNoseBoxEvent,
-    "BoundariesNoseBoxEvent": BoundariesNoseBoxEvent,
-    "NoseScrollEvent": NoseScrollEvent,
-    "NoseZoomEvent": NoseZoomEvent,
-    "JoystickButtonPressEvent": JoystickButtonPressEvent,
-    "JoystickWristEvent": JoystickWristEvent,
-    "CustomizedGestureEvent": CustomizedGestureEvent,
-    "GunMoveEvent": GunMoveEvent,
-    "HandDriveRotateEvent": HandDriveRotateEvent,
-    "HandDriveForwardBackwardEvent": HandDriveForwardBackwardEvent,
-    "HandDriveUpDownEvent": HandDriveUpDownEvent,
-    "MRSwipeEvent": MRSwipeEvent,
-    "KioskSwipeEvent": KioskSwipeEvent,
-    "SamuraiSwipeEvent": SamuraiSwipeEvent,
-    "SpidermanThwipEvent": SpidermanThwipEvent
-}
+# this should store every available event, as "python module:class".
+# The classes are only imported when an event is first used, so the dependencies of the unused ones are never loaded
+events = LazyRegistry("event", {
+    "ClickPressEvent": "scripts.gesture_events.click_press_event:ClickPressEvent",
+    "SingleHandExclusiveClickPressEvent": "scripts.gesture_events.click_press_event:SingleHandExclusiveClickPressEvent",
+    "TouchPressEvent": "scripts.gesture_events.touch_press_event:TouchPressEvent",
+    "KeyboardActiveEvent": "scripts.gesture_events.keyboard_active_event:KeyboardActiveEvent",
+    "KeyboardClickEvent": "scripts.gesture_events.keyboard_click_event:KeyboardClickEvent",
+    "PalmHeightChangeEvent": "scripts.gesture_events.palm_height_change_event:PalmHeightChangeEvent",
+    "IdleStateChangeEvent": "scripts.gesture_events.idle_state_change_event:IdleStateChangeEvent",
+    "HandActiveEvent": "scripts.gesture_events.hand_active_event:HandActiveEvent",
+    "HandDepthClickEvent": "scripts.gesture_events.hand_depth_click_event:HandDepthClickEvent",
+    "ScrollEvent": "scripts.gesture_events.scroll_event:ScrollEvent",
+    "ExtremityTriggerEvent": "scripts.gesture_events.extremity_trigger_event:ExtremityTriggerEvent",
+    "ZoomEvent": "scripts.gesture_events.zoom_event:ZoomEvent",
+    "ExerciseEvent": "scripts.gesture_events.exercise_event:ExerciseEvent",
+    "ExtremityWalkingEvent": "scripts.gesture_events.extremity_walking_event:ExtremityWalkingEvent",
+    "GamepadMode1Event": "scripts.gesture_events.gamepad_event:GamepadMode1Event",
+    "GamepadMode2Event": "scripts.gesture_events.gamepad_event:GamepadMode2Event",
+    "GamepadMode3Event": "scripts.gesture_events.gamepad_event:GamepadMode3Event",
+    "FpsMode1Event": "scripts.gesture_events.fps_event:FpsMode1Event",
+    "FpsMode2Event": "scripts.gesture_events.fps_event:FpsMode2Event",
+    "FpsMode3Event": "scripts.gesture_events.fps_event:FpsMode3Event",
+    "SpeechEvent": "scripts.gesture_events.speech_event:SpeechEvent",
+    "SmilingEvent": "scripts.gesture_events.mouth_trigger_event:SmilingEvent",
+    "FishFaceEvent": "scripts.gesture_events.mouth_trigger_event:FishFaceEvent",
+    "RotationLeftEvent": "scripts.gesture_events.mouth_trigger_event:RotationLeftEvent",
+    "RotationRightEvent": "scripts.gesture_events.mouth_trigger_event:RotationRightEvent",
+    "NoseTrackingEvent": "scripts.gesture_events.nose_tracking_event:NoseTrackingEvent",
+    "NoseDirectionTrackingEvent": "scripts.gesture_events.nose_direction_tracking_event:NoseDirectionTrackingEvent",
+    "OpenMouthEvent": "scripts.gesture_events.mouth_trigger_event:OpenMouthEvent",
+    "RaiseEyeBrowEvent": "scripts.gesture_events.mouth_trigger_event:RaiseEyeBrowEvent",
+    "GesturesActiveEvent": "scripts.gesture_events.gestures_active_event:GesturesActiveEvent",
+    "PenDragEvent": "scripts.gesture_events.pen_drag_event:PenDragEvent",
+    "EyeTrackingEvent": "scripts.gesture_events.eye_tracking_event:EyeTrackingEvent",
+    "EyeMode2Event": "scripts.gesture_events.eye_mode_2:EyeMode2Event",
+    "NoseDirectionTrackingEventNoseBox": "scripts.gesture_events.nose_direction_tracking_event_nose_box:NoseDirectionTrackingEventNoseBox",
+    "MoveNoseBoxEvent": "scripts.gesture_events.move_nose_box_event:MoveNoseBoxEvent",
+    "BoundariesNoseBoxEvent": "scripts.gesture_events.boundaries_nose_box_event:BoundariesNoseBoxEvent",
+    "NoseScrollEvent": "scripts.gesture_events.nose_scroll_event:NoseScrollEvent",
+    "NoseZoomEvent": "scripts.gesture_events.nose_zoom_event:NoseZoomEvent",
+    "JoystickButtonPressEvent": "scripts.gesture_events.joystick_event:JoystickButtonPressEvent",
+    "JoystickWristEvent": "scripts.gesture_events.joystick_event:JoystickWristEvent",
+    "CustomizedGestureEvent": "scripts.gesture_events.customized_gesture_event:CustomizedGestureEvent",
+    "GunMoveEvent": "scripts.gesture_events.gun_move_event:GunMoveEvent",
+    "HandDriveRotateEvent": "scripts.gesture_events.hand_drive_event:HandDriveRotateEvent",
+    "HandDriveForwardBackwardEvent": "scripts.gesture_events.hand_drive_event:HandDriveForwardBackwardEvent",
+    "HandDriveUpDownEvent": "scripts.gesture_events.hand_drive_event:HandDriveUpDownEvent",
+    "MRSwipeEvent": "scripts.gesture_events.mr_swipe_event:MRSwipeEvent",
+    "KioskSwipeEvent": "scripts.gesture_events.kiosk_swipe_event:KioskSwipeEvent",
+    "SamuraiSwipeEvent": "scripts.gesture_events.samurai_swipe_event:SamuraiSwipeEvent",
+    "SpidermanThwipEvent": "scripts.gesture_events.spiderman_thwip:SpidermanThwipEvent"
+})
 
 
 class GestureEvents:
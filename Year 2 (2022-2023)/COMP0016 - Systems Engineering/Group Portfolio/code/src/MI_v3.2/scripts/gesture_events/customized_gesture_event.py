@@ -1,5 +1,6 @@
 import ctypes
 import math
+import os
 
 import numpy as np
 
@@ -24,7 +25,7 @@ class CustomizedGestureEvent(SimpleGestureEvent):
     def __init__(self, gesture_name, gesture_type, bodypart_name, fps, action_type, frame_count,
                  camera_w_h_ratio, phrase, attention_point, test_mode):
         self._timer = 0  # so that it doesn't get activated at the beginning
-        self.config_path = "customize_gestures\\"
+        self.config_path = "customize_gestures"
         # put into /data folder
         self.action_type = action_type
         self._gesture_name = gesture_name
@@ -130,7 +131,7 @@ class CustomizedGestureEvent(SimpleGestureEvent):
 
     def _get_recorded_trace_from_json(self):
         """get original trace data from json file"""
-        file_name = self.config_path + self._gesture_name + ".json"
+        file_name = os.path.join(self.config_path, self._gesture_name + ".json")
         json_editor = JSONEditor(file_name)
         data = json_editor.get_all_data()
         return data
@@ -1,17 +1,24 @@
 '''
 Author: Carmen Meinson
 '''
-from scripts.eye_module import EyeModule
+from scripts.core.landmark_filter import LandmarkFilter
 from scripts.core.model import Model
-from typing import Set
-
-from scripts.hand_module import HandModule
-from scripts.body_module import BodyModule
-
-from scripts.speech_module import SpeechModule
-from scripts.head_module import HeadModule
+from scripts.core.module_schedule import ModuleSchedule
+from typing import Optional, Set
 
+from scripts.tools.config import Config
 from scripts.tools.json_editors.gesture_editor import GestureEditor
+from scripts.tools.lazy_registry import LazyRegistry
+from scripts.tools.startup_profiler import StartupProfiler
+
+# the modules are only imported when first used, as each depends on its own heavy libraries (MediaPipe, OpenVINO, Vosk, etc.)
+MODULES = LazyRegistry("module", {
+    "hand": "scripts.hand_module:HandModule",
+    "speech": "scripts.speech_module:SpeechModule",
+    "body": "scripts.body_module:BodyModule",
+    "head": "scripts.head_module:HeadModule",
+    "eye": "scripts.eye_module:EyeModule"
+})
 
 
 # # we may need to split into no_equipment and equipment, because apparently the ML classification may overlap and mistake equipment and no equipment events e.g. squatting and rowing
@@ -22,13 +29,7 @@ class GestureLoader:
         gesture_editor = GestureEditor()
         self._gestures = gesture_editor.get_all_data()
 
-        self._modules = {
-            "hand": HandModule,
-            "speech": SpeechModule,
-            "body": BodyModule,
-            "head": HeadModule,
-            "eye": EyeModule
-        }
+        self._modules = MODULES
 
     def add_gestures_to_model(self, model: Model, gesture_names: Set[str]) -> None:
         """Based on the given gesture names, add the desired gestures to the model as well as the moules used by said gestures
@@ -42,5 +43,23 @@ class GestureLoader:
             for module_name in self._gestures:
                 if gesture_name in self._gestures[module_name]:
                     if module_name not in model.get_module_names():
-                        model.add_module(module_name, self._modules[module_name]())
+                        module_class = self._modules[module_name]
+                        with StartupProfiler().measure("initialize", f"module {module_name}"):
+                            module = module_class()
+                        module.set_landmark_filter(self._get_landmark_filter(module_name))
+                        model.add_module(module_name, module, self._get_schedule(module_name))
                     model.add_gesture(module_name, gesture_name, self._gestures[module_name][gesture_name])
+
+    @staticmethod
+    def _get_schedule(module_name: str) -> ModuleSchedule:
+        # modules/<name>/frame_stride and max_update_rate, modules without them (e.g. speech) are updated on every frame
+        module_config = Config().get_data(f"modules/{module_name}")
+        return ModuleSchedule(module_config.get("frame_stride", 1), module_config.get("max_update_rate", 0))
+
+    @staticmethod
+    def _get_landmark_filter(module_name: str) -> Optional[LandmarkFilter]:
+        # modules/<name>/landmark_filter, modules without it (e.g. speech) use the landmarks as detected
+        filter_config = Config().get_data(f"modules/{module_name}").get("landmark_filter", {})
+        if not filter_config.get("enabled", False): return None
+        return LandmarkFilter(filter_config.get("min_cutoff", 1.0), filter_config.get("beta", 0.0),
+                              filter_config.get("d_cutoff", 1.0))
@@ -3,13 +3,13 @@ Author: Carmen Meinson
 Contributors: Aaryaman Sharma
 Partially based on the Hand class in the MotionInput v2 code
 '''
-import cv2
 import mediapipe as mp
 import numpy as np
 import math
 from collections import defaultdict
+from itertools import chain
 
-from scripts.core import RawData, LandmarkDetector
+from scripts.core import FrameContext, RawData, LandmarkDetector, RegionOfInterestTracker, mirror_name, mirror_x
 from scripts.tools import Config
 
 
@@ -18,6 +18,11 @@ from scripts.tools import Config
 class HandLandmarkDetector(LandmarkDetector):
     def __init__(self):
         config = Config()
+        # if enabled, only the region around the hands of the previous frame is processed
+        roi_config = config.get_data("modules/hand/roi_tracking")
+        self._roi_tracker = None
+        if roi_config["enabled"]:
+            self._roi_tracker = RegionOfInterestTracker(roi_config["expansion"], roi_config["min_size"], roi_config["redetect_interval"])
         self.hands = mp.solutions.hands.Hands(
             min_detection_confidence=config.get_data("modules/hand/min_detection_confidence"),
             min_tracking_confidence=config.get_data("modules/hand/min_tracking_confidence"),
@@ -43,46 +48,65 @@ class HandLandmarkDetector(LandmarkDetector):
             6: "index_lowerj",
             10: "middle_lowerj"
         }
+        # dict: name of the landmark -> its row in the array of the hand landmarks
+        self.landmark_rows = {name: lm for lm, name in self.landmark_names.items()}
 
-    def get_raw_data(self, raw_data: RawData, image: np.ndarray) -> None:
-        """Adds the xyz coordinates of all the hand landmarks detected on the image into the RawData instance.
+    def get_raw_data(self, raw_data: RawData, frame: FrameContext) -> None:
+        """Adds the xyz coordinates of all the hand landmarks detected on the frame into the RawData instance.
 
         :param raw_data: RawData instance to add the landmarks to
         :type raw_data: RawData
-        :param image: Image to process with mediapipe and read the landmarks locations from
-        :type image: ndarray
+        :param frame: Frame to process with mediapipe and read the landmarks locations from
+        :type frame: FrameContext
         """
-        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-
-        image.flags.writeable = False
+        if self._roi_tracker is not None:
+            image, region = self._roi_tracker.crop(frame, "rgb")
+        else:
+            image, region = frame.get_rgb(), None
         camdata = self.hands.process(image)
+        if region is not None and not camdata.multi_handedness:
+            # lost within the region, the next frame is processed whole rather than this one again
+            self._roi_tracker.use_full_frame()
 
+        detected = {}  # dict: "Left"/"Right" -> xyz of the 21 landmarks of the hand chosen for it
         if camdata.multi_handedness:  # If hand(s) present in frame
+            height, width = frame.get_size()
+            # xyz of all 21 landmarks of each hand, in the coordinates of the whole frame
+            hands = [RegionOfInterestTracker.to_frame(self._to_array(hand_landmarks.landmark), region, height, width)
+                     for hand_landmarks in camdata.multi_hand_landmarks]
             best_scores = defaultdict(lambda: {"index": 0, "score": 0})
             for i in range(0, len(camdata.multi_handedness)):  # For each hand
-                bodypart_name = camdata.multi_handedness[i].classification[0].label
-                landmarks = camdata.multi_hand_landmarks[i].landmark
-                score = self._best_hand_heuristic(landmarks)
+                # mediapipe labels the hands as seen on a mirrored image, while the frame is as captured
+                bodypart_name = mirror_name(camdata.multi_handedness[i].classification[0].label)
+                score = self._best_hand_heuristic(hands[i])
                 if score > best_scores[bodypart_name]["score"]:
                     best_scores[bodypart_name]["score"] = score
                     best_scores[bodypart_name]["index"] = i
             
-            for bodypart_name, vals in best_scores.items():
-                i = vals["index"]
-                self._add_base_landmarks(raw_data, bodypart_name, camdata.multi_hand_landmarks[i].landmark)
-                self._add_derived_landmarks(raw_data, bodypart_name)
+            detected = {bodypart_name: hands[vals["index"]] for bodypart_name, vals in best_scores.items()}
+        if self._roi_tracker is not None:
+            # the region is in the coordinates of the captured frame, so it is updated before mirroring
+            self._roi_tracker.update(np.concatenate(list(detected.values())) if detected else None)
+        for bodypart_name, landmarks in detected.items():
+            mirror_x(landmarks, out=landmarks)
+            self._add_base_landmarks(raw_data, bodypart_name, landmarks)
+            self._add_derived_landmarks(raw_data, bodypart_name)
+
+    @staticmethod
+    def _to_array(landmarks) -> np.ndarray:
+        # filled in one go, without a tuple or array per landmark
+        return np.fromiter(chain.from_iterable((landmark.x, landmark.y, landmark.z) for landmark in landmarks),
+                           dtype=float, count=3 * len(landmarks)).reshape(-1, 3)
 
-    def _add_base_landmarks(self, raw_data: RawData, bodypart_name: str, landmarks: dict) -> None:
-        # Get raw data from Mediapipe hands
-        for lm, name in self.landmark_names.items():
-            coordinates = np.array([landmarks[lm].x, landmarks[lm].y, landmarks[lm].z])
-            raw_data.add_landmark(bodypart_name, name, coordinates)
+    def _add_base_landmarks(self, raw_data: RawData, bodypart_name: str, landmarks: np.ndarray) -> None:
+        # Get raw data from Mediapipe hands, the rows of the array are the landmarks in the order of mediapipe
+        raw_data.add_landmark_array(bodypart_name, landmarks, self.landmark_rows)
 
     # Used to store best hand for each hand type in raw_data instead of mediapipe picking at random
-    def _best_hand_heuristic(self, landmark):
+    def _best_hand_heuristic(self, landmark: np.ndarray):
         # indices taken from self.landmark_names
-        wrist_coords = np.array([landmark[0].x, landmark[0].y])
-        middle_base_coords = np.array([landmark[9].x, landmark[9].y])
+        wrist_coords = landmark[0, :2]
+        middle_base_coords = landmark[9, :2]
         # Get distance from centre of frame, which is where (x, y) is at (0.5, 0.5).
         distance_from_centre = np.linalg.norm(middle_base_coords - np.array([0.5, 0.5]))
         # no native depth from camera in mediapipe. Instead, we use the distance between the wrist and the base of the middle finger as an analog. The larger this distance
@@ -3,12 +3,12 @@ Author: Carmen Meinson
 Contributors: Siam Islam, Tianhao Chen
 Partially based on the Hand class in the MotionInput v2 code
 '''
-from typing import Callable, Dict, Optional, Set
+from typing import Dict, List, Optional, Set, Tuple
 
 import numpy as np
 
-from scripts.core import Position
-from scripts.tools import Config
+from scripts.core import LandmarkArray, Position
+from scripts.tools import Config, ConfigSnapshot
 
 
 # TODO: the current methods for calculating some primitives are kinda messed up :) - taken straight from v2
@@ -17,28 +17,85 @@ def dist(x, y):
     return np.sqrt(np.sum((x - y) ** 2))
 
 
+# every primitive of a finger is calculated for all of these
+FINGERS = ("thumb", "index", "middle", "ring", "pinky")
+# sides of the triangle whose perimeter is the palm scalar
+PALM_SCALAR_PAIRS = (("wrist", "index_base"), ("wrist", "pinky_base"), ("pinky_base", "index_base"))
+THRESHOLD_DISTANCE_PAIR = ("index_base", "pinky_base")
+
+
+def _get_primitive_distances() -> Dict[str, Tuple[Tuple[str, str], ...]]:
+    # pairs of landmarks whose distances each primitive is calculated from
+    distances = {"palm_facing_camera": (), "hand_closed": ()}
+    for finger in FINGERS:
+        tip, base, upperj = finger + "_tip", finger + "_base", finger + "_upperj"
+        distances[finger + "_folded"] = ((tip, "palm_center"), (base, "palm_center"))
+        distances[finger + "_pinched"] = ((tip, "thumb_tip"),) + PALM_SCALAR_PAIRS
+        if finger == "thumb":
+            distances[finger + "_stretched"] = ((tip, "palm_center"), (upperj, "palm_center"))
+        else:
+            distances[finger + "_stretched"] = ((tip, base), (upperj, base))
+    for finger in ("index", "middle", "ring"):
+        distances[finger + "_pulldown"] = (("wrist", finger + "_tip"), ("wrist", finger + "_upperj"))
+    distances["index_scissor"] = (("index_tip", "middle_tip"),) + PALM_SCALAR_PAIRS
+    distances["thumb_scissor"] = (("thumb_tip", "index_base"),) + PALM_SCALAR_PAIRS
+    return distances
+
+
+PRIMITIVE_DISTANCES = _get_primitive_distances()
+
+
 class HandPosition(Position):
+    # read from the config once, by the first position created
+    _pinch_sensitivity = None
+    _scissor_sensitivity = None
+    _config_threshold_distance = None
+    _calculators = None  # dict: name of the primitive -> (calculating function, its arguments)
+    # dict: names of the used primitives -> (landmark names, indices of the first and second landmark of each pair, pairs)
+    _distance_plans = {}
 
     def __init__(self, raw_hand_data: Dict[str, np.ndarray], used_primitives: Set[str] = None) -> None:
         # if used_primitives is None then we calculate all primitives
-
-        config = Config()
-
-        self._pinch_sensitivity = config.get_data("modules/hand/position_pinch_sensitivity")
-        self._scissor_sensitivity = config.get_data("modules/hand/position_scissor_sensitivity")
-        self._threshold_distance = config.get_data(
-            "modules/hand/position_threshold_distance")  # TODO: WHERE DOES THIS COME FROM???????? do we read it from config or do we calculate that
+        self._load_class_data()
+        self._threshold_distance = self._config_threshold_distance  # TODO: WHERE DOES THIS COME FROM???????? do we read it from config or do we calculate that
         self._landmarks = raw_hand_data
         self._primitives = {}
-        self._primitives_calculators = self._get_primitives_calculators()
+        self._distances = {}  # dict: (landmark name, landmark name) -> distance between them
 
         self._used_primitives = used_primitives
         if used_primitives is None:  # if used_primitives is None then we calculate all primitives
-            self._used_primitives = self._primitives_calculators.keys()
+            self._used_primitives = self._calculators.keys()
         # calculate primitives
         if self._landmarks is not None:
             self._calculate_primitives()
 
+    @classmethod
+    def _load_class_data(cls) -> None:
+        if cls._calculators is not None: return
+        config = Config()
+        cls._load_config_values(config.get_snapshot())
+        # the sensitivities can be changed at runtime (e.g. from the GUI)
+        config.subscribe(cls._load_config_values)
+        calculators = {
+            "palm_facing_camera": (cls._calculate_palm_facing_camera, ()),
+            "hand_closed": (cls._calculate_hand_closed, ()),
+            "index_scissor": (cls._calculate_scissor, ("index", "middle_tip")),
+            "thumb_scissor": (cls._calculate_scissor, ("thumb", "index_base")),
+        }
+        for finger in ("index", "middle", "ring"):
+            calculators[finger + "_pulldown"] = (cls._calculate_pulldown, (finger,))
+        for finger in FINGERS:
+            calculators[finger + "_folded"] = (cls._calculate_folded, (finger,))
+            calculators[finger + "_stretched"] = (cls._calculate_stretched, (finger,))
+            calculators[finger + "_pinched"] = (cls._calculate_pinched, (finger,))
+        cls._calculators = calculators
+
+    @classmethod
+    def _load_config_values(cls, snapshot: ConfigSnapshot) -> None:
+        cls._pinch_sensitivity = snapshot.get("modules/hand/position_pinch_sensitivity")
+        cls._scissor_sensitivity = snapshot.get("modules/hand/position_scissor_sensitivity")
+        cls._config_threshold_distance = snapshot.get("modules/hand/position_threshold_distance")
+
     def get_primitives_names(self) -> Set[str]:
         return self._used_primitives
 
@@ -73,7 +130,12 @@ class HandPosition(Position):
         return self._landmarks[name]
 
     def get_landmarks_distance(self, name1: str, name2: str) -> float:
-        return dist(self.get_landmark(name1), self.get_landmark(name2))
+        # most distances have already been calculated together with the primitives
+        distance = self._distances.get((name1, name2))
+        if distance is None:
+            distance = dist(self.get_landmark(name1), self.get_landmark(name2))
+            self._distances[(name1, name2)] = self._distances[(name2, name1)] = distance
+        return distance
 
     def get_palm_height(self) -> Optional[float]:
         """Returns the distance between the wrist and the base of the middle finger"""
@@ -83,7 +145,7 @@ class HandPosition(Position):
 
     def get_palm_scalar(self) -> float:
         """Returns the perimeter of the triangle formed from the wrist, index_base and pinky_base"""
-        palm_scalar = (  # TODO: currently calculating it too many times
+        palm_scalar = (
                 self.get_landmarks_distance("wrist", "index_base")
                 + self.get_landmarks_distance("wrist", "pinky_base")
                 + self.get_landmarks_distance("pinky_base", "index_base")
@@ -113,44 +175,49 @@ class HandPosition(Position):
         dx = self._landmarks["middle_base"][0] - self._landmarks["wrist"][0]
         return dx / dy
 
-    def _get_primitives_calculators(self) -> Dict[str, Callable]:
-        primitives_calculators = {
-            "palm_facing_camera": self._calculate_palm_facing_camera,
-            "hand_closed": self._calculate_hand_closed,
-            "index_pulldown": lambda: self._calculate_pulldown("index"),
-            "middle_pulldown": lambda: self._calculate_pulldown("middle"),
-            "ring_pulldown": lambda: self._calculate_pulldown("ring"),
-            "index_scissor": lambda: self._calculate_scissor("index", "middle_tip"),
-            "thumb_scissor": lambda: self._calculate_scissor("thumb", "index_base"),
-            "thumb_folded": lambda: self._calculate_folded("thumb"),
-            "index_folded": lambda: self._calculate_folded("index"),
-            "middle_folded": lambda: self._calculate_folded("middle"),
-            "ring_folded": lambda: self._calculate_folded("ring"),
-            "pinky_folded": lambda: self._calculate_folded("pinky"),
-            "thumb_stretched": lambda: self._calculate_stretched("thumb"),
-            "index_stretched": lambda: self._calculate_stretched("index"),
-            "middle_stretched": lambda: self._calculate_stretched("middle"),
-            "ring_stretched": lambda: self._calculate_stretched("ring"),
-            "pinky_stretched": lambda: self._calculate_stretched("pinky"),
-            "thumb_pinched": lambda: self._calculate_pinched("thumb"),
-            "index_pinched": lambda: self._calculate_pinched("index"),
-            "middle_pinched": lambda: self._calculate_pinched("middle"),
-            "ring_pinched": lambda: self._calculate_pinched("ring"),
-            "pinky_pinched": lambda: self._calculate_pinched("pinky"),
-        }
-        return primitives_calculators
-
     def _calculate_primitives(self) -> None:
+        self._calculate_distances()
         self._update_threshold_distance()  # TODO: investigate what is the threshold distance exactly
 
         for primitive in self._used_primitives:
             self._calculate_primitive(primitive)
 
     def _calculate_primitive(self, primitive_name: str) -> None:
-        if primitive_name not in self._primitives_calculators:
+        if primitive_name not in self._calculators:
             raise RuntimeError("Attempth to calculate an invalid primitive for the Hand mosule: " + primitive_name)
 
-        self._primitives_calculators[primitive_name]()
+        calculator, args = self._calculators[primitive_name]
+        calculator(self, *args)
+
+    def _calculate_distances(self) -> None:
+        # all the distances needed by the used primitives, in one go
+        landmark_names, first, second, pairs = self._get_distance_plan(self._used_primitives)
+        if isinstance(self._landmarks, LandmarkArray):
+            points = self._landmarks.stack(landmark_names)
+        else:
+            points = np.array([self._landmarks[name] for name in landmark_names])
+        distances = np.sqrt(np.sum((points[first] - points[second]) ** 2, axis=1))
+        for (name1, name2), distance in zip(pairs, distances):
+            self._distances[(name1, name2)] = self._distances[(name2, name1)] = distance
+
+    @classmethod
+    def _get_distance_plan(cls, used_primitives: Set[str]) -> Tuple[List[str], np.ndarray, np.ndarray, List[Tuple[str, str]]]:
+        key = frozenset(used_primitives)
+        plan = cls._distance_plans.get(key)
+        if plan is None:
+            pairs = {THRESHOLD_DISTANCE_PAIR: None}  # a dict to keep the order
+            for primitive in key:
+                for pair in PRIMITIVE_DISTANCES.get(primitive, ()):
+                    if pair not in pairs and pair[::-1] not in pairs:
+                        pairs[pair] = None
+            pairs = list(pairs)
+            landmark_names = list(dict.fromkeys(name for pair in pairs for name in pair))
+            index = {name: i for i, name in enumerate(landmark_names)}
+            first = np.array([index[name1] for name1, _ in pairs])
+            second = np.array([index[name2] for _, name2 in pairs])
+            plan = (landmark_names, first, second, pairs)
+            cls._distance_plans[key] = plan
+        return plan
 
     def _calculate_folded(self, finger: str) -> None:
         tip = finger + "_tip"
@@ -9,14 +9,14 @@ Prior dlib landmark detector implemented by Andrzej Szablewski and Rakshita Kuma
 
 import os
 
-import cv2
 import mediapipe as mp
 import numpy as np
 
-from numpy import ndarray
-
+from scripts.core import FrameContext
 from scripts.core import LandmarkDetector
 from scripts.core import RawData
+from scripts.core import RegionOfInterestTracker
+from scripts.core import mirror_name, mirror_x
 from scripts.tools import Config
 
 # Unfortunately, no convenient definitions for the mediapipe face mesh vertices
@@ -33,6 +33,10 @@ EXPORTED_LANDMARKS = {"nose-tip": 4,
     "lip-top-left": 81, "lip-bottom-left": 178, "lip-top-right": 311, "lip-bottom-right": 402,
     "left-cheek": 132, "right-cheek": 361 }
 
+# The frame is processed as captured, so each landmark (named as on the mirrored view) is read from the mesh vertex of
+# its mirror image, e.g. "left-eye-left" from the vertex of "right-eye-right"
+MIRRORED_LANDMARKS = {lm_name: EXPORTED_LANDMARKS[mirror_name(lm_name)] for lm_name in EXPORTED_LANDMARKS}
+
 class HeadLandmarkDetector(LandmarkDetector):
 
     def __init__(self) -> None:
@@ -40,6 +44,12 @@ class HeadLandmarkDetector(LandmarkDetector):
         # initialize camera size
         config = Config()
 
+        # if enabled, only the region around the face of the previous frame is processed
+        roi_config = config.get_data("modules/head/roi_tracking")
+        self._roi_tracker = None
+        if roi_config["enabled"]:
+            self._roi_tracker = RegionOfInterestTracker(roi_config["expansion"], roi_config["min_size"], roi_config["redetect_interval"])
+
         self.tracker = mp.solutions.face_mesh.FaceMesh(
             static_image_mode=False,
             refine_landmarks=False,
@@ -56,17 +66,18 @@ class HeadLandmarkDetector(LandmarkDetector):
             landmarks["nose-tip"]
         )
 
-    def _process_frame(self, frame: np.ndarray) -> tuple:
-
-        # Prepare image array for mediapipe model.
-        # See mediapipe demo on their website, setting writeable flags improves performance
+    def _process_frame(self, frame: FrameContext) -> list:
 
-        frame.flags.writeable = False
-
-        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.tracker.process(frame)
-
-        frame.flags.writeable = True
+        # The RGB image from the frame context is shared with the other modules and is already not writeable,
+        # which is what the mediapipe demo recommends for performance
+        if self._roi_tracker is not None:
+            image, region = self._roi_tracker.crop(frame, "rgb")
+        else:
+            image, region = frame.get_rgb(), None
+        results = self.tracker.process(image)
+        if region is not None and not results.multi_face_landmarks:
+            # lost within the region, the next frame is processed whole rather than this one again
+            self._roi_tracker.use_full_frame()
 
         # Extract landmarks from mediapipe datatypes
         faces = []
@@ -76,22 +87,32 @@ class HeadLandmarkDetector(LandmarkDetector):
             # For efficiency, and the sake of integrating with existing code,
             # compute the depth-based parameters here, and then chuck the z component away.
             # "normalised-left-right-depths" is not really a landmark, but is needed to calculate head rotation
+            height, width = frame.get_size()
             for face_landmarks in results.multi_face_landmarks:
 
+                # xyz of the exported landmarks, in the coordinates of the whole frame
+                points = RegionOfInterestTracker.to_frame(
+                    np.array([(face_landmarks.landmark[lm_index].x, face_landmarks.landmark[lm_index].y, face_landmarks.landmark[lm_index].z)
+                              for lm_index in MIRRORED_LANDMARKS.values()]),
+                    region, height, width)
+                if self._roi_tracker is not None and not faces:
+                    # the region follows the face that is used, in the coordinates of the captured frame
+                    self._roi_tracker.update(points)
+                points = mirror_x(points)
+
                 depths = {"left": [], "right": [], "all": []}
                 face = {}
-                for lm_name, lm_index in EXPORTED_LANDMARKS.items():
+                for lm_name, point in zip(MIRRORED_LANDMARKS, points):
                     
-                    landmark = face_landmarks.landmark[lm_index]
-                    face[lm_name] = np.array([landmark.x, landmark.y])
+                    face[lm_name] = point[:2]
 
                     if lm_name.startswith("left"):
-                        depths["left"].append(landmark.z)
+                        depths["left"].append(point[2])
 
                     elif lm_name.startswith("right"):
-                        depths["right"].append(landmark.z)
+                        depths["right"].append(point[2])
 
-                    depths["all"].append(landmark.z)
+                    depths["all"].append(point[2])
 
 
                 avgDepth = sum(depths["all"]) / len(depths["all"])
@@ -106,12 +127,14 @@ class HeadLandmarkDetector(LandmarkDetector):
 
                 faces.append(face)
 
-        return frame, faces
+        return faces
 
-    def get_raw_data(self, raw_data: RawData, image: ndarray) -> None:
+    def get_raw_data(self, raw_data: RawData, frame: FrameContext) -> None:
 
-        processed_image, tracked_faces = self._process_frame(image)
+        tracked_faces = self._process_frame(frame)
 
+        if self._roi_tracker is not None and not tracked_faces:
+            self._roi_tracker.update(None)
        
         if len(tracked_faces) > 0:
 
@@ -4,7 +4,7 @@ Author: Rakshita Kumar
 Partially based on the Head module in the MotionInput v2 code
 """
 
-from typing import Dict, Optional, Set
+from typing import Callable, Dict, Optional, Set
 
 import numpy as np
 
@@ -23,7 +23,6 @@ class HeadPosition(Position):
     def __init__(self, raw_data: Dict[str, np.ndarray],
                  used_primitives: Set[str] = None) -> None:
         self._landmarks = raw_data
-        # TODO add calculating only used primitives
         self._used_primitives = used_primitives
         self._primitives = {}
         self._biometrics = {}
@@ -152,17 +151,30 @@ class HeadPosition(Position):
         self._primitives["nose_up"] = nose_position[1] < nose_box_centre_Y - nose_box_percentage_size
         self._primitives["nose_down"] = nose_position[1] > nose_box_centre_Y + nose_box_percentage_size
 
-    def _calculate_primitives(self):
-
-        self._calculate_smiling()
-        self._calculate_fish_face()
-        self._calculate_open_mouth()
-        self._calculate_eye_brow()
-
-        self._calculate_eye_close()
+    def _get_primitives_calculators(self) -> Dict[str, Callable[[], None]]:
+        # some calculators set more than one primitive
+        return {
+            "smiling": self._calculate_smiling,
+            "fish_face": self._calculate_fish_face,
+            "open_mouth": self._calculate_open_mouth,
+            "raise_eye_brow": self._calculate_eye_brow,
+            "eyes_close": self._calculate_eye_close,
+            "rotate_left": self._calculate_head_rotation,
+            "rotate_right": self._calculate_head_rotation,
+            "nose_point": self._calculate_nose_point,
+            "nose_right": self._calculate_nose_rlup,
+            "nose_left": self._calculate_nose_rlup,
+            "nose_up": self._calculate_nose_rlup,
+            "nose_down": self._calculate_nose_rlup
+        }
 
-        self._calculate_head_rotation()
-
-        self._calculate_nose_point()
-        self._calculate_nose_rlup()
+    def _calculate_primitives(self):
+        calculators = self._get_primitives_calculators()
+        if self._used_primitives is None:  # if used_primitives is None then we calculate all primitives
+            to_calculate = calculators.values()
+        else:  # otherwise only the ones used by the gestures of the module
+            to_calculate = [calculators[name] for name in self._used_primitives if name in calculators]
+        # call each calculator once, even if more than one of its primitives is used
+        for calculator in dict.fromkeys(to_calculate):
+            calculator()
         
@@ -2,12 +2,13 @@
 Author: Carmen Meinson
 Contributors: Andrzej Szablewski, Anelia Gaydardzhieva
 """
+from queue import Empty, SimpleQueue
 from typing import Optional
 from scripts.core.model import Model
 from scripts.event_mapper import EventMapper
-from scripts.gesture_event_handlers import GestureEventHandlers
 from scripts.tools.config import Config
 from scripts.tools.json_editors.mode_editor import ModeEditor
+from scripts.tools.startup_profiler import StartupProfiler
 from scripts.tools.view import View
 
 # TODO: Complete the Hotkeys Process
@@ -36,9 +37,14 @@ class ModeController:
         self._current_mode = mode_config["current_mode"]
         self._mappings = mode_config["mode_labels"]
         self._next_mode = mode_config["current_mode"]
+        # modes asked for by set_next_mode() (None for the next one in the iteration order), taken by change_mode_if_needed()
+        self._mode_requests = SimpleQueue()
         #self.current_hotkeys_user = ""
 
         self._model = model
+        # imported here, as the handlers load the Windows input libraries (e.g. for the benchmark, which has no ModeController)
+        with StartupProfiler().measure("import", "gesture event handlers"):
+            from scripts.gesture_event_handlers import GestureEventHandlers
         self._event_handlers = GestureEventHandlers(self.set_next_mode, view)
         self._event_mapper = EventMapper(self._event_handlers)
         mode_name = self._current_mode
@@ -263,23 +269,43 @@ class ModeController:
         """set the interaction mode that the model will be set to from the next frame. 
         (next time the change_mode_if_needed() is called)
         If no mode is indicated the next mode is set according to the iteration_order, provided
+        Can be called from any thread (e.g. by the event handlers), the mode is only changed by change_mode_if_needed().
 
         :param mode: name of the mode, defaults to None
         :type mode: Optional[str], optional
         """
-        if mode is not None:
-            self._next_mode = mode
-            return
-        # if no mode given set the next mode according to iteration order
-        self._next_mode = self._iteration_order[self._current_mode]
-        if JOYPAD_ENABLED_FLAG == False and self._next_mode == "joystick":
-            self._next_mode = self._iteration_order[self._next_mode]
+        self._mode_requests.put(mode)
+
+
+    def _take_mode_requests(self) -> None:
+        while True:
+            try:
+                mode = self._mode_requests.get_nowait()
+            except Empty:
+                return
+            if mode is not None:
+                self._next_mode = mode
+                continue
+            # if no mode given set the next mode according to iteration order
+            self._next_mode = self._iteration_order[self._current_mode]
+            if JOYPAD_ENABLED_FLAG == False and self._next_mode == "joystick":
+                self._next_mode = self._iteration_order[self._next_mode]
+
+
+    def is_mode_change_needed(self) -> bool:
+        """
+        :return: True if set_next_mode() has set a mode that has not yet been changed to by change_mode_if_needed()
+        :rtype: bool
+        """
+        return not self._mode_requests.empty() or self._next_mode != self._current_mode
 
 
     def change_mode_if_needed(self) -> None:
         """If the next mode has been previously set by the set_next_mode(), 
         change the events in the model accordingly.
+        Must be called on the thread running the frame loop, while no frame is being processed.
         """
+        self._take_mode_requests()
         if self._next_mode == self._current_mode: return
         current_events = self._modes[self._current_mode]
         new_events = self._modes[self._next_mode]
@@ -289,7 +315,8 @@ class ModeController:
         self._current_mode = self._next_mode
         if "idle" not in self._current_mode:
             self._mode_editor.update("current_mode", self._current_mode)
-            self._mode_editor.save()
+            # written from a background thread, so switching modes does not hold up the frame
+            self._mode_editor.save_later()
         # Print the mode name on the screen
         if SHOW_MODE_NAME:
             self._view.update_display_element("active_mode_name", {"name": self.get_mode_name(self._current_mode)})
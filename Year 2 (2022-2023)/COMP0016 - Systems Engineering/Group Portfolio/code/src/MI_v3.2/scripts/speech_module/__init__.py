@@ -14,6 +14,7 @@ class SpeechModule(Module):
     _landmark_detector_class = SpeechLandmarkDetector
 
     _tracker_names = {"speech"}
+    _warm_up_on_frame = False  # listens to the microphone, not the camera
 
     def reset(self) -> None:
         """Resets all position trackers"""
@@ -4,10 +4,9 @@ Comments:
 This file grabs the recognised words and phrases from Vosk KITA
 and tries to match these to Speech Commands
 '''
-from numpy import ndarray
 from scripts.tools.config import Config
 from .kita import KITA
-from scripts.core import RawData, LandmarkDetector
+from scripts.core import FrameContext, RawData, LandmarkDetector
 
 class SpeechLandmarkDetector(LandmarkDetector):
     kita = None
@@ -22,13 +21,13 @@ class SpeechLandmarkDetector(LandmarkDetector):
         except Exception:
             self._active = False
 
-    def get_raw_data(self, raw_data: RawData, image: ndarray) -> None:
+    def get_raw_data(self, raw_data: RawData, frame: FrameContext) -> None:
         """
         Adds current phrase to RawData Instance so that it can be passed to the position class
         :param raw_data: RawData instance to add the landmarks to
         :type raw_data: RawData
-        :param image: Image to proccess with mediapipe and read the landmarks locations from
-        :type image: ndarray
+        :param frame: Frame to proccess with mediapipe and read the landmarks locations from (unused by speech)
+        :type frame: FrameContext
         Using Vosk Partial results ensures high speed in speech commands execution
         """
 
@@ -1,5 +1,5 @@
 from .camera import Camera
-from .config import Config
+from .config import Config, ConfigSnapshot
 from .json_editors.config_editor import ConfigEditor
 from .json_editors.event_editor import EventEditor
 from .json_editors.gesture_editor import GestureEditor
@@ -0,0 +1,72 @@
+'''
+Comments:
+Measures the brightness of the camera frames, e.g. to warn the user when there is not enough light (or the camera is
+disconnected). The brightness changes slowly, so it is only measured every check_interval frames and on a strided
+sample of the pixels, rather than by converting the whole frame to grayscale every frame.
+The low light flag uses hysteresis, so it does not flicker when the brightness is close to the threshold.
+'''
+import threading
+from typing import Optional
+
+import numpy as np
+
+from scripts.tools.config import Config, singleton
+
+# weights of the blue, green and red channels in the grayscale brightness (as in cv2.COLOR_BGR2GRAY)
+BGR_TO_GRAY = np.array([0.114, 0.587, 0.299])
+
+
+@singleton
+class BrightnessMonitor:
+    def __init__(self) -> None:
+        config = Config()
+        self._threshold = config.get_data("general/view/brightness_threshold")
+        self._hysteresis = config.get_data("general/view/brightness_hysteresis")
+        self._check_interval = max(1, config.get_data("general/view/brightness_check_interval"))
+        self._sample_stride = max(1, config.get_data("general/view/brightness_sample_stride"))
+        self._lock = threading.Lock()
+        self._frames_since_check = None  # None until the first frame, which is always measured
+        self._brightness = None  # average brightness (0-255) of the last measured frame
+        self._low_light = False
+
+    def update(self, image: np.ndarray) -> None:
+        """Called once per frame, measures the brightness of the frame if it is due.
+
+        :param image: the BGR camera frame
+        :type image: np.ndarray
+        """
+        with self._lock:
+            if self._frames_since_check is not None:
+                self._frames_since_check += 1
+                if self._frames_since_check < self._check_interval: return
+            self._frames_since_check = 0
+        sample = image[::self._sample_stride, ::self._sample_stride]
+        brightness = float(sample.reshape(-1, sample.shape[-1]).mean(axis=0) @ BGR_TO_GRAY)
+        with self._lock:
+            self._brightness = brightness
+            if self._low_light:
+                self._low_light = brightness < self._threshold + self._hysteresis
+            else:
+                self._low_light = brightness < self._threshold
+
+    def get_brightness(self) -> Optional[float]:
+        """
+        :return: average brightness (0-255) of the last measured frame, None if no frame has been measured yet
+        :rtype: Optional[float]
+        """
+        with self._lock:
+            return self._brightness
+
+    def is_low_light(self) -> bool:
+        """
+        :return: True once the brightness falls below brightness_threshold, until it rises above it by brightness_hysteresis
+        :rtype: bool
+        """
+        with self._lock:
+            return self._low_light
+
+    def reset(self) -> None:
+        with self._lock:
+            self._frames_since_check = None
+            self._brightness = None
+            self._low_light = False
@@ -11,10 +11,17 @@ import cv2
 import numpy as np
 import time
 import threading
-from typing import NoReturn
+from collections import namedtuple
+from typing import NoReturn, Optional, Tuple
 
 # Local
+from scripts.tools.camera_discovery import find_cameras
 from scripts.tools.config import Config
+from scripts.tools.frame_sources import create_frame_source
+
+
+# image: the frame, sequence: increases by 1 for every frame captured, timestamp: perf_counter() at capture
+CapturedFrame = namedtuple('CapturedFrame', ['image', 'sequence', 'timestamp'])
 
 
 def singleton(cls):
@@ -44,20 +51,31 @@ class Camera:
         self._data["pass"] = True
         self._data["camera_nr"] = Config().get_data("general/camera/camera_nr")
         self._change_camera = False
-        self._cap = cv2.VideoCapture(self._data["camera_nr"], cv2.CAP_DSHOW) 
         self.config = Config()
         self.editor = self.config.get_editor()
         self.width = self.config.get_data("general/camera/camera_w")
         self.height = self.config.get_data("general/camera/camera_h")
+        # live device, video file, image sequence or synthetic frames depending on general/camera/frame_source
+        self._cap = create_frame_source(self._data["camera_nr"], self.width, self.height)
+        self._cap_lock = threading.Lock()  # held while the capture object is read or replaced
         self.black_image = np.zeros((self.height, self.width, 3), dtype=np.uint8)
         self.error_frame = self.create_error_frame()
         
         self.set_camera_properties()
+        # the properties only need to be set again if the camera has not been seen working at this resolution
+        known_camera = self._is_last_working_camera()
         self.check_startup()
-        self.set_camera_properties() # just in case
+        if not known_camera:
+            self.set_camera_properties() # just in case
         
         self._frame = self._get_frame()
-        self._new_frame = False
+        if self._frame is None: self._frame = self.black_image
+        # the latest CapturedFrame, handed over to the readers through the condition
+        self._latest = None
+        self._sequence = 0
+        self._frame_ready = threading.Condition()
+        self._last_read_sequence = 0  # sequence of the last frame returned by read()
+        self._skipped_frames = 0  # frames captured but never returned by read()
         self._thread = threading.Thread(target=self._update_frame, name="Thread Camera")
         self._thread.start()
 
@@ -67,7 +85,8 @@ class Camera:
         msg2 = "Please restart MotionInput."
         cv2.putText(error_frame, msg, (30, 85), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255,255,255), 1, cv2.LINE_AA)
         cv2.putText(error_frame, msg2, (30, 115), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255,255,255), 1, cv2.LINE_AA)
-        return error_frame
+        # the frames are mirrored by the View when displayed, so the text is stored mirrored
+        return cv2.flip(error_frame, 1)
 
     def check_startup(self) -> None:
         """
@@ -75,13 +94,16 @@ class Camera:
         Otherwise the check_camera function is called
         to check if any additional cameras are available.
         """
-        success, _ = self._cap.read()
+        success, image = self._cap.read()
+        if not success and self._switch_to_last_working_camera():
+            success, image = self._cap.read()
         if not success:
             print("Error: could not read camera at startup. Checking cameras...")
             self._data["error_at_startup"] = True
             self._check_camera()
         else:
             print("Successfully read camera at startup")
+            self._remember_working_camera(image)
     
     def set_camera_properties(self) -> None:
         """
@@ -91,36 +113,90 @@ class Camera:
         self._cap.set(3, self.width)
         self._cap.set(4, self.height)
 
-    def read(self) -> np.ndarray:
-        while not self._new_frame:
-            time.sleep(0.01)
-        self._new_frame = False
+    def read(self, timeout: Optional[float] = None) -> Tuple[Optional[np.ndarray], dict]:
+        """Waits until a frame newer than the one previously returned is captured and returns it.
+        If more than one frame was captured in the meantime the older ones are skipped, see get_skipped_frames()
+
+        :param timeout: maximum number of seconds to wait, waits indefinitely if None
+        :type timeout: Optional[float]
+        :return: the newest frame (None on timeout) and the camera data
+        :rtype: Tuple[Optional[np.ndarray], dict]
+        """
+        frame = self.read_frame(self._last_read_sequence, timeout)
+        if frame is None:
+            if not self._active:  # camera closed before a new frame was captured
+                return self._frame, self._data
+            return None, self._data
+        if frame.sequence > self._last_read_sequence + 1 and self._last_read_sequence != 0:
+            self._skipped_frames += frame.sequence - self._last_read_sequence - 1
+        self._last_read_sequence = frame.sequence
+        return frame.image, self._data
+
+    def read_frame(self, after_sequence: int = 0, timeout: Optional[float] = None) -> Optional[CapturedFrame]:
+        """Blocks until a frame with a sequence number greater than after_sequence has been captured and returns the newest one.
+        The caller can compare the sequence numbers of consecutive frames to tell whether any frames were skipped.
+
+        :param after_sequence: sequence number of the last frame the caller has seen, 0 if none
+        :type after_sequence: int
+        :param timeout: maximum number of seconds to wait, waits indefinitely if None
+        :type timeout: Optional[float]
+        :return: the newest frame with its sequence number and capture timestamp, or None on timeout or if the camera has no frames
+        :rtype: Optional[CapturedFrame]
+        """
+        with self._frame_ready:
+            self._frame_ready.wait_for(lambda: self._sequence > after_sequence or not self._active, timeout)
+            if self._latest is None or self._sequence <= after_sequence:
+                return None
+            return self._latest
+
+    def get_last_frame(self) -> Tuple[np.ndarray, dict]:
+        """Returns the last frame captured (or a black image if none was) without waiting, e.g. to be displayed
+        again while the camera gives no new frames.
+
+        :return: the last frame and the camera data
+        :rtype: Tuple[np.ndarray, dict]
+        """
         return self._frame, self._data
 
+    def get_skipped_frames(self) -> int:
+        """
+        :return: number of frames that were captured but never returned by read()
+        :rtype: int
+        """
+        return self._skipped_frames
+
     def _update_frame(self):
         # TODO: check code. Exception handling rn done poorly
         while self._active:
-            self._frame = self._get_frame()
-            self._new_frame = True
+            image = self._get_frame()
+            if image is None:
+                # nothing new was captured, so the readers keep waiting instead of getting the last frame again
+                time.sleep(0.01)
+                continue
+            timestamp = time.perf_counter()
+            with self._frame_ready:
+                self._frame = image
+                self._sequence += 1
+                self._latest = CapturedFrame(image, self._sequence, timestamp)
+                self._frame_ready.notify_all()
             #print("Update Called (Camera Thread)")
         log.info("Camera Thread Ended")
 
 
-    def _get_frame(self):
+    def _get_frame(self) -> Optional[np.ndarray]:
+        """Returns the next frame of the camera, or None if it could not be read (e.g. a dropped frame)"""
         try:
             if not self._data["pass"]:
                 time.sleep(0.01)
                 return self.black_image
-            if self._cap is not None or self._cap.isOpened():
+            if self._cap is None or not self._cap.isOpened():
+                return None
+            with self._cap_lock:
                 success, image = self._cap.read()
-                if not success:
-                    #print("SKIPPED FRAME")
-                    image = self._frame
-                    #print("Not success!")
-                    #raise RuntimeError('reading frame unsuccessful')
-            else:
-                image = self._frame
-            image = cv2.flip(image, 1)  # TODO: not sure at what point should the image be flipped
+            if not success:
+                #print("SKIPPED FRAME")
+                return None
+            # not mirrored here: the detectors mirror the landmarks and the View mirrors the frame it displays
             return image
         except Exception as e:
             return self.error_frame
@@ -129,16 +205,44 @@ class Camera:
             # frame as a just in case measure"
             #raise RuntimeError('Could not read the frame', e)
 
+    def _is_last_working_camera(self) -> bool:
+        last_working = self.config.get_data("general/camera/last_working_camera")
+        return (last_working["index"] == self._data["camera_nr"]
+                and (last_working["width"], last_working["height"]) == (self.width, self.height))
+
+    def _switch_to_last_working_camera(self) -> bool:
+        """
+        If the configured camera cannot be read, switches to the camera that last worked (if it is a different one)
+        before falling back to probing all of them.
+        Returns True if switched.
+        """
+        if self.config.get_data("general/camera/frame_source/type") != "device":
+            return False
+        index = self.config.get_data("general/camera/last_working_camera")["index"]
+        if index < 0 or index == self._data["camera_nr"]:
+            return False
+        print("Trying the camera that last worked: ", index)
+        self.init_new_camera(index)
+        return self._data["pass"]
+
+    def _remember_working_camera(self, image: np.ndarray) -> None:
+        if self.config.get_data("general/camera/frame_source/type") != "device":
+            return
+        height, width = image.shape[:2]
+        last_working = {"index": self._data["camera_nr"], "width": width, "height": height}
+        if last_working != self.config.get_data("general/camera/last_working_camera"):
+            self.editor.update("general/camera/last_working_camera", last_working)
+
     def _check_camera(self):
         """
-        Checks through indexes 0-9 to find out which indexes correspond to a real camera. 
-        Then calls _draw_camera_sources
+        Probes the cameras listed by the platform (or indexes 0-9) concurrently to find out which indexes
+        correspond to a real camera. Then calls _draw_camera_sources
         to display these indexes to the user.
         """
         if self._cap is None or not self._cap.isOpened():
             self._data["pass"] = False
-            for i in range(9, -1, -1):  # test indexes 9 to 0
-                self._test_index(i, self._data["sources"])
+            self._data["sources"] = find_cameras(self.config.get_data("general/camera/frame_source/backend"),
+                                                 self.config.get_data("general/camera/probe_timeout"))
         else:
             self._data["pass"] = True
             return
@@ -149,33 +253,26 @@ class Camera:
         self._draw_camera_sources()
     
     def _draw_camera_sources(self):
+        # drawn on a blank image every time, so the text of earlier calls is not drawn over or flipped back
+        image = np.zeros((self.height, self.width, 3), dtype=np.uint8)
         msg = "Suggested camera numbers: "
         if len(self._data["sources"]) > 0:
             for i, source in enumerate(self._data["sources"]):
                 msg += str(source)
                 if i < len(self._data["sources"]) - 1:
                     msg += ", "
-            cv2.putText(self.black_image, msg, (30, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255,255,255), 1, cv2.LINE_AA)
+            cv2.putText(image, msg, (30, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255,255,255), 1, cv2.LINE_AA)
             msg2 = "Please press full stop and then a number shown above"
             msg3 = "to switch between cameras"
-            cv2.putText(self.black_image, msg2, (30, 85), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255,255,255), 1, cv2.LINE_AA)
-            cv2.putText(self.black_image, msg3, (30, 110), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255,255,255), 1, cv2.LINE_AA)
+            cv2.putText(image, msg2, (30, 85), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255,255,255), 1, cv2.LINE_AA)
+            cv2.putText(image, msg3, (30, 110), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255,255,255), 1, cv2.LINE_AA)
         else:
             msg = "No cameras detected"
-            cv2.putText(self.black_image, msg, (30, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255,255,255), 1, cv2.LINE_AA)
+            cv2.putText(image, msg, (30, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255,255,255), 1, cv2.LINE_AA)
+        # the frames are mirrored by the View when displayed, so the text is stored mirrored
+        self.black_image = cv2.flip(image, 1)
 
 
-    def _test_index(self, index, sources):
-        """
-        Checks if a given camera index can be used to successfully create a capture object. 
-        Adds valid indexes to a sources set.
-        """
-        camera = cv2.VideoCapture(index, cv2.CAP_DSHOW)
-        if camera is None or not camera.isOpened():
-            print("Unable to open: ", index)
-        else:
-            sources.add(index)
-
     def change_camera(self, index: int) -> bool:
         """
         Function to change between cameras. Takes in a camera index, 
@@ -184,7 +281,7 @@ class Camera:
         Allows free switching of the camera if there was no error at startup
         (since available sources are not checked for in this). 
         If there was an error, then available sources were calculated
-        _test_index and allows switching between only those indexes. 
+        _check_camera and allows switching between only those indexes. 
         Returns True if the camera was successfully changed or if the camera
         toggle button (full stop) was pressed.
         """
@@ -206,19 +303,25 @@ class Camera:
         the given camera index. This function is called when there
         is an error with the initial camera index.
         """
-        self._cap.release()
-        self._cap = cv2.VideoCapture(index, cv2.CAP_DSHOW) 
-        self.set_camera_properties()
+        # the camera thread waits meanwhile, so it never reads the released capture object
+        with self._cap_lock:
+            self._cap.release()
+            self._cap = create_frame_source(index, self.width, self.height)
+            self.set_camera_properties()
+            success, image = self._cap.read()
         self._data["pass"] = True
-        success, _ = self._cap.read()
         if not success:
             self._data["pass"] = False
+        else:
+            self._remember_working_camera(image)
         self._data["camera_nr"] = index
         self.editor.update("general/camera/camera_nr", index)
 
 
     def close(self) -> NoReturn: 
         self._active = False
+        with self._frame_ready:
+            self._frame_ready.notify_all()  # wake up any readers still waiting for a frame
         self._thread.join()
         print("Camera Thread: ", self._thread.is_alive())
         self.editor.save()
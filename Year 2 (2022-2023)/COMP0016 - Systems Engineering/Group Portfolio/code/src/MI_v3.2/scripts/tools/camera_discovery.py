@@ -0,0 +1,114 @@
+'''
+Comments:
+Finds the camera devices that can be opened. Opening a device with cv2.VideoCapture can take seconds (or hang) for
+indexes without a camera, so the candidate indexes are taken from the platform's device listing where there is one
+(/dev/video* on Linux) and all of them are probed at the same time, each with a timeout.
+The index and resolution of the last camera that worked are kept in general/camera/last_working_camera, so the next
+start can go straight to it without probing.
+'''
+from scripts.tools.logger import get_logger
+log = get_logger(__name__)
+
+import glob
+import re
+import sys
+import threading
+from time import perf_counter
+from typing import Dict, List, Optional, Set, Tuple
+
+import cv2
+
+from scripts.tools.frame_sources import get_device_backend
+
+MAX_DEVICE_INDEX = 9  # indexes probed when the platform has no device listing
+
+
+def list_device_indexes() -> List[int]:
+    """
+    :return: indexes of the devices listed by the platform (/dev/video* on Linux), or 0 to MAX_DEVICE_INDEX if it has no listing
+    :rtype: List[int]
+    """
+    if sys.platform.startswith("linux"):
+        indexes = set()
+        for path in glob.glob("/dev/video*"):
+            match = re.fullmatch(r"/dev/video(\d+)", path)
+            if match:
+                indexes.add(int(match.group(1)))
+        return sorted(indexes)
+    return list(range(MAX_DEVICE_INDEX + 1))
+
+
+def probe_device(index: int, backend: str = "auto") -> Optional[Tuple[int, int]]:
+    """Opens the device, reads one frame from it and releases it.
+
+    :param index: index of the device
+    :type index: int
+    :param backend: name of the capture backend, defaults to "auto"
+    :type backend: str
+    :return: the height and width of the frame read, None if the device could not be opened or read
+    :rtype: Optional[Tuple[int, int]]
+    """
+    camera = cv2.VideoCapture(index, get_device_backend(backend))
+    try:
+        if camera is None or not camera.isOpened():
+            return None
+        success, image = camera.read()
+        if not success or image is None:
+            return None
+        return image.shape[:2]
+    finally:
+        if camera is not None:
+            camera.release()
+
+
+def probe_devices(indexes: List[int], backend: str = "auto", timeout: float = 2.0) -> Dict[int, Tuple[int, int]]:
+    """Probes all the devices concurrently. Devices that do not respond within the timeout are left to their
+    (daemon) thread and treated as unavailable.
+
+    :param indexes: indexes of the devices to probe
+    :type indexes: List[int]
+    :param backend: name of the capture backend, defaults to "auto"
+    :type backend: str
+    :param timeout: seconds to wait for all the probes, defaults to 2.0
+    :type timeout: float
+    :return: dict: index of every device that could be read -> height and width of its frames
+    :rtype: Dict[int, Tuple[int, int]]
+    """
+    results = {}
+    lock = threading.Lock()
+
+    def probe(index: int) -> None:
+        try:
+            size = probe_device(index, backend)
+        except Exception as error:
+            log.warning(f"Probing camera {index} failed: {error}")
+            return
+        if size is not None:
+            with lock:
+                results[index] = size
+
+    threads = [threading.Thread(target=probe, args=(index,), name=f"Camera Probe {index}", daemon=True) for index in indexes]
+    for thread in threads:
+        thread.start()
+    # the timeout is shared, as the probes run at the same time
+    deadline = perf_counter() + timeout
+    for thread in threads:
+        thread.join(max(0.0, deadline - perf_counter()))
+        if thread.is_alive():
+            log.warning(f"{thread.name} did not finish within {timeout} s")
+    with lock:
+        return dict(results)
+
+
+def find_cameras(backend: str = "auto", timeout: float = 2.0) -> Set[int]:
+    """
+    :param backend: name of the capture backend, defaults to "auto"
+    :type backend: str
+    :param timeout: seconds to wait for the probes, defaults to 2.0
+    :type timeout: float
+    :return: indexes of the devices that could be opened and read
+    :rtype: Set[int]
+    """
+    indexes = list_device_indexes()
+    log.info(f"Probing cameras {indexes}")
+    return set(probe_devices(indexes, backend, timeout))
@@ -1,8 +1,17 @@
 '''
 Author: Carmen Meinson
 '''
-from typing import Any, Optional
+from scripts.tools.logger import get_logger
+log = get_logger(__name__)
+
+import copy
+import threading
+from collections import namedtuple
+from types import MappingProxyType
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
 from scripts.tools.json_editors.config_editor import ConfigEditor
+from scripts.tools.json_editors.json_editor import ERRORS
 
 # Config class is a singelton so that whatever class needs some configuration it can just do Config() instead of having a bunch of parameters
 def singleton(cls):
@@ -13,20 +22,191 @@ def singleton(cls):
         return instances[cls]
     return getinstance
 
+
+class ConfigSnapshot:
+    """Immutable copy of the config, flattened into one dict from every path (e.g. "modules/hand/max_num_hands") to its value,
+    so reading a value is a single dict lookup however deep it is in the JSON.
+    JSON objects and lists are copied when they are returned, so changing them cannot change the snapshot."""
+
+    __slots__ = ("_values", "_sections", "_version")
+
+    def __init__(self, values: Dict[str, Any], version: int) -> None:
+        object.__setattr__(self, "_values", values)
+        object.__setattr__(self, "_sections", {})  # dict: path -> named tuple of the values in it, made on request
+        object.__setattr__(self, "_version", version)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("ConfigSnapshot is immutable, update the config through its editor instead")
+
+    @classmethod
+    def from_data(cls, data: Dict[str, Any], version: int = 0) -> "ConfigSnapshot":
+        """
+        :param data: contents of config.json, copied so later changes to it do not affect the snapshot
+        :type data: Dict[str, Any]
+        :param version: number of the snapshot, increased every time the config changes
+        :type version: int
+        :return: the snapshot of the data
+        :rtype: ConfigSnapshot
+        """
+        values = {}
+        cls._flatten(copy.deepcopy(data), "", values)
+        return cls(values, version)
+
+    def get(self, path: str) -> Any:
+        """
+        :param path: path of the value e.g. "general/view/window_name"
+        :type path: str
+        :raises KeyError: if the path does not exist
+        :return: the value at the path, JSON objects are returned as (copied) dicts
+        :rtype: Any
+        """
+        try:
+            value = self._values[path]
+        except KeyError:
+            log.error(f"get: config path {path} does not exist")
+            raise KeyError(ERRORS["path_does_not_exist"])
+        if isinstance(value, (dict, list)):
+            return copy.deepcopy(value)
+        return value
+
+    def get_section(self, path: str) -> NamedTuple:
+        """Returns the values in a JSON object of the config as a named tuple, e.g. get_section("modules/hand").max_num_hands.
+        Only keys that are valid attribute names are included. JSON objects in it are read-only mappings and lists are tuples.
+
+        :param path: path of the JSON object
+        :type path: str
+        :raises KeyError: if the path does not exist
+        :return: named tuple of the values in the JSON object
+        :rtype: NamedTuple
+        """
+        section = self._sections.get(path)
+        if section is None:
+            data = self.get(path)
+            fields = [key for key in sorted(data) if key.isidentifier() and not key.startswith("_")]
+            section = namedtuple("ConfigSection", fields)(*(self._freeze(data[key]) for key in fields))
+            self._sections[path] = section
+        return section
+
+    def get_version(self) -> int:
+        return self._version
+
+    def updated(self, path: str, value: Any) -> "ConfigSnapshot":
+        """Returns a new snapshot in which only the value at the given path has changed.
+        Only the JSON objects on the path are copied, not the whole config.
+
+        :param path: path of the changed value
+        :type path: str
+        :param value: the new value
+        :type value: Any
+        :return: the new snapshot
+        :rtype: ConfigSnapshot
+        """
+        values = dict(self._values)
+        if isinstance(values.get(path), dict):
+            # the paths inside the replaced JSON object may no longer exist
+            prefix = path + "/"
+            for key in [key for key in values if key.startswith(prefix)]:
+                values.pop(key)
+        self._flatten(copy.deepcopy(value), path, values)
+        # copy the JSON objects on the path, so dicts returned by the previous snapshot do not change
+        child_path = path
+        while "/" in child_path:
+            parent_path, key = child_path.rsplit("/", 1)
+            parent = dict(values[parent_path])
+            parent[key] = values[child_path]
+            values[parent_path] = parent
+            child_path = parent_path
+        return ConfigSnapshot(values, self._version + 1)
+
+    def removed(self, path: str) -> "ConfigSnapshot":
+        """Returns a new snapshot without the value at the given path (and the values inside it).
+
+        :param path: path of the removed value
+        :type path: str
+        :return: the new snapshot
+        :rtype: ConfigSnapshot
+        """
+        if "/" in path:
+            # the same as replacing the JSON object the value was in
+            parent_path, key = path.rsplit("/", 1)
+            parent = dict(self._values[parent_path])
+            parent.pop(key, None)
+            return self.updated(parent_path, parent)
+        prefix = path + "/"
+        values = {key: value for key, value in self._values.items() if key != path and not key.startswith(prefix)}
+        return ConfigSnapshot(values, self._version + 1)
+
+    @classmethod
+    def _freeze(cls, data: Any) -> Any:
+        if isinstance(data, dict):
+            return MappingProxyType({key: cls._freeze(value) for key, value in data.items()})
+        if isinstance(data, list):
+            return tuple(cls._freeze(value) for value in data)
+        return data
+
+    @classmethod
+    def _flatten(cls, data: Any, path: str, values: Dict[str, Any]) -> None:
+        if path:
+            values[path] = data
+        if isinstance(data, dict):
+            for key, value in data.items():
+                cls._flatten(value, path + "/" + key if path else key, values)
+
+
 @singleton
 class Config():
     def __init__(self):
         self._config_editor = ConfigEditor()
-    
+        self._lock = threading.Lock()
+        self._subscribers = []  # functions called with the new snapshot whenever the config changes
+        self._snapshot = ConfigSnapshot.from_data(self._config_editor.get_all_data())
+        self._config_editor.add_update_listener(self._on_change)
+
     def get_data(self, key: str) -> Optional[Any]:
         """Returns value paired with an inputted key in the config dictionary.
         :return: value associated with inputted key string
         :rtype: Optional[Any]"""
-        return self._config_editor.get_data(key)
+        return self._snapshot.get(key)
+
+    def get_snapshot(self) -> ConfigSnapshot:
+        """
+        :return: the current snapshot of the config. It never changes, a new one is made when the config is updated
+        :rtype: ConfigSnapshot
+        """
+        return self._snapshot
 
     def get_editor(self) -> ConfigEditor:
         return self._config_editor
 
+    def subscribe(self, callback: Callable[[ConfigSnapshot], None]) -> None:
+        """Registers a function to be called with the new snapshot every time the config is updated,
+        so values read from the config and kept (e.g. as class attributes) can be read again.
+
+        :param callback: function taking the new ConfigSnapshot
+        :type callback: Callable[[ConfigSnapshot], None]
+        """
+        with self._lock:
+            self._subscribers.append(callback)
 
-            
+    def unsubscribe(self, callback: Callable[[ConfigSnapshot], None]) -> None:
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
 
+    def _on_change(self, path: str, removed: bool) -> None:
+        # called by the editor while its data is locked, so the value cannot change while it is copied into the snapshot
+        with self._lock:
+            # the new snapshot is swapped in as a whole, readers see either the old or the new one
+            if not path:
+                self._snapshot = ConfigSnapshot.from_data(self._config_editor.get_all_data(), self._snapshot.get_version() + 1)
+            elif removed:
+                self._snapshot = self._snapshot.removed(path)
+            else:
+                self._snapshot = self._snapshot.updated(path, self._config_editor.get_data(path))
+            snapshot = self._snapshot
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(snapshot)
+            except Exception as error:
+                log.exception(f"Config subscriber failed: {error}")
@@ -5,7 +5,7 @@ import os
 import cv2
 import numpy as np
 
-from scripts import RawData, HandPosition, HandLandmarkDetector, BodyLandmarkDetector
+from scripts import FrameContext, RawData, HandPosition, HandLandmarkDetector, BodyLandmarkDetector
 
 
 class CustomizeGestureRecorder:
@@ -22,11 +22,11 @@ class CustomizeGestureRecorder:
     }
 
     def __init__(self):
-        self.config_path = os.path.dirname(os.path.realpath(__file__)) + "\\..\\..\\data\\"
+        self.config_path = os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "..", "data"))
         self.gesture_editor = None
         self.mode_editor = None
         self.event_editor = None
-        self.customize_gesture_dir = self.config_path + 'customize_gestures'
+        self.customize_gesture_dir = os.path.join(self.config_path, 'customize_gestures')
         if not os.path.exists(self.customize_gesture_dir):
             os.makedirs(self.customize_gesture_dir)
 
@@ -117,9 +117,8 @@ class CustomizeGestureRecorder:
         ret, frame = videoCapture.read()
         frame_sequence = []
         while ret:
-            image = cv2.flip(frame, 1)
-            # image = frame
-            frame_sequence.append(image)
+            # not mirrored, the landmark detectors mirror the landmarks themselves
+            frame_sequence.append(frame)
             ret, frame = videoCapture.read()
         videoCapture.release()
         self.set_recorder(gesture_type, bodypart_name, gesture_editor, mode_editor, event_editor)
@@ -128,7 +127,7 @@ class CustomizeGestureRecorder:
         last_landmarks = dict()
         for frame in frame_sequence:
             frame_data = RawData()
-            self.landmark_detector.get_raw_data(frame_data, frame)
+            self.landmark_detector.get_raw_data(frame_data, FrameContext(frame))
             gesture_landmark_record = dict()
             loss_flag = False
             for name in self.body_part_name_list:
@@ -373,7 +372,7 @@ class CustomizeGestureRecorder:
         self.event_editor.save()
 
         if len(key_frames_feature) > 0:
-            gesture_json_file_path = self.customize_gesture_dir + '\\' + gesture_tag + '.json'
+            gesture_json_file_path = os.path.join(self.customize_gesture_dir, gesture_tag + '.json')
             with open(gesture_json_file_path, 'w') as gesture_json_file:
                 gesture_json_file.write(json.dumps(key_frames_feature))
         if output_str == "":
@@ -3,7 +3,7 @@ Author: Jason Ho
 Contributors: Andrzej Szablewski, Keyur Narotomo, Siam Islam, Chris Zhang, Anelia Gaydardzhieva
 '''
 from time import perf_counter
-from typing import Dict, Optional, Tuple
+from typing import Callable, Dict, Hashable, Optional, Tuple
 
 import cv2
 import numpy as np
@@ -48,6 +48,68 @@ class DisplayElement:
 
 # -------------------------------------------------------------------------------------
 
+class OverlayCache:
+    """
+    Graphics of a display element that are drawn once and then copied (or blended) onto every frame, only within
+    the bounding rectangle of what was drawn. They are drawn again only when their key changes, e.g. when the state
+    of the element or the config changes.
+    """
+    _NOT_RENDERED = object()
+
+    def __init__(self) -> None:
+        self._key = self._NOT_RENDERED
+        self._position = None  # (x, y) of the top left corner of the drawn pixels in the frame, None if nothing was drawn
+        self._pixels = None  # the drawn pixels within their bounding rectangle
+        self._mask = None  # True where something was drawn within the bounding rectangle
+
+    def is_valid(self, key: Hashable) -> bool:
+        return self._key == key
+
+    def render(self, key: Hashable, shape: Tuple[int, ...], draw: Callable[[np.ndarray], None]) -> None:
+        """
+        Draws the graphics and stores the part of them that was drawn on.
+
+        :param key: everything the graphics depend on
+        :type key: Hashable
+        :param shape: shape of the frames the graphics are drawn onto
+        :type shape: Tuple[int, ...]
+        :param draw: function drawing the graphics onto an image with cv2
+        :type draw: Callable[[np.ndarray], None]
+        """
+        # drawn onto a black and a white image, so that pixels drawn in any colour (even black or white) are found
+        on_black = np.zeros(shape, dtype=np.uint8)
+        on_white = np.full(shape, 255, dtype=np.uint8)
+        draw(on_black)
+        draw(on_white)
+        mask = np.any(on_black != 0, axis=2) | np.any(on_white != 255, axis=2)
+        x, y, w, h = cv2.boundingRect(mask.astype(np.uint8))
+        self._key = key
+        if w == 0 or h == 0:
+            self._position = self._pixels = self._mask = None
+            return
+        self._position = (x, y)
+        self._pixels = on_black[y:y + h, x:x + w].copy()
+        self._mask = mask[y:y + h, x:x + w, np.newaxis].copy()
+
+    def blend(self, image: np.ndarray, alpha: float = 1.0) -> None:
+        """
+        :param image: frame to draw the graphics onto
+        :type image: np.ndarray
+        :param alpha: opacity of the graphics, defaults to 1.0
+        :type alpha: float
+        """
+        if self._pixels is None:
+            return
+        x, y = self._position
+        h, w = self._pixels.shape[:2]
+        region = image[y:y + h, x:x + w]
+        if alpha >= 1:
+            np.copyto(region, self._pixels, where=self._mask)
+        else:
+            np.copyto(region, cv2.addWeighted(self._pixels, alpha, region, 1 - alpha, 0), where=self._mask)
+
+# -------------------------------------------------------------------------------------
+
 class ExerciseDisplayElement(DisplayElement):
     def __init__(self) -> None:
         self._exercise_repeats_dict = {}
@@ -175,6 +237,8 @@ class InAirKeyboardElement(DisplayElement):
         self.key_bg_on_hover = self._colour_dict["white"]
         self.key_bg_on_click = self._colour_dict["green"]
         self.alpha = Config().get_data("events/keyboard/default_transparency")
+        self._config_version = Config().get_snapshot().get_version()
+        self._overlay = OverlayCache()
         
 
     def update(self, buttons: dict, hovered_keys: set, clicked_keys: set):
@@ -188,10 +252,19 @@ class InAirKeyboardElement(DisplayElement):
         """
         Takes a cv2 image and draws all the keyboard buttons, with different colours being used 
         for keys which have been hovered over or clicked.
+        The buttons are only drawn again when a key is hovered, clicked or the config changes, and only the pixels of the
+        buttons are blended with the image.
         """
-        overlay = image.copy()
-        self.draw_buttons(overlay)
-        cv2.addWeighted(overlay, self.alpha, image, 1 - self.alpha, 0, image)
+        config_version = Config().get_snapshot().get_version()
+        if config_version != self._config_version:
+            self._config_version = config_version
+            self.alpha = Config().get_data("events/keyboard/default_transparency")
+        key = (image.shape, config_version,
+               tuple((button.get_position(), button.get_size(), button.text, button.font_size, tuple(button.bg_colour),
+                      button in self.hovered_keys, button in self.clicked_keys) for button in self.buttons.values()))
+        if not self._overlay.is_valid(key):
+            self._overlay.render(key, image.shape, self.draw_buttons)
+        self._overlay.blend(image, self.alpha)
 
 
     def draw_buttons(self, overlay):
@@ -305,29 +378,21 @@ class ActiveModeNameElement(DisplayElement):
 # LowLight Indicator
 class LowLightIndicatorElement(DisplayElement):
     def __init__(self) -> None:
-        config = Config()
-        self._check_low_light = config.get_data("general/view/low_light_indicator_on")
-        self._min_brightness = config.get_data("general/view/brightness_threshold")
+        # the brightness is checked by the View, so it is known even when the view is hidden
+        self._low_light = False
         super().__init__()
 
 
     def update_display(self, image):
-        if not self._check_low_light:
-            return
-        
-        grayscale = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
-        #blurred_image = cv2.blur(grayscale, (640, 480))
-        average_brightness = cv2.mean(grayscale)
-        #print("Brightness :", average_brightness)
-        if average_brightness[0] < self._min_brightness:
+        if self._low_light:
             msg = "Your camera may be disconnected"
             msg2= "Or there is not enough light where you are"
             cv2.putText(image, msg, (160, 230), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1, cv2.LINE_AA)
             cv2.putText(image, msg2, (130, 255), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1, cv2.LINE_AA)
             #print("Dark lighting")
     
-    def update(self):
-        return
+    def update(self, low_light: bool = False) -> None:
+        self._low_light = low_light
 
 # -------------------------------------------------------------------------------------
 # Help Message Element
@@ -335,12 +400,18 @@ class HelpMessageElement(DisplayElement):
     def __init__(self) -> None:
         self._start_time = perf_counter()
         self._show = True
+        self._overlay = OverlayCache()
         super().__init__()
 
     def update_display(self, image) -> None:
         if not self._show:
             return
         
+        if not self._overlay.is_valid(image.shape):
+            self._overlay.render(image.shape, image.shape, self._draw_message)
+        self._overlay.blend(image)
+
+    def _draw_message(self, image) -> None:
         text_pos = (470, 22)
         # white text with black outline, so that the message can be seen clearly both when
         # there is a black screen at startup (due to multiple cameras) and during normal operation
@@ -395,6 +466,7 @@ class ChangeCameraElement(DisplayElement):
     def __init__(self) -> None:
         self._display = False
         self._current_camera = None
+        self._overlay = OverlayCache()
 
         super().__init__()
 
@@ -406,6 +478,12 @@ class ChangeCameraElement(DisplayElement):
         if not self._display or self._current_camera is None:
             return
 
+        key = (image.shape, self._current_camera)
+        if not self._overlay.is_valid(key):
+            self._overlay.render(key, image.shape, self._draw_indicator)
+        self._overlay.blend(image)
+
+    def _draw_indicator(self, image) -> None:
         text_pos = (30, 375)
         self.draw_outlined_text(image, "Camera Switch Mode On", text_pos, 1)
         index_pos = (30, 400)
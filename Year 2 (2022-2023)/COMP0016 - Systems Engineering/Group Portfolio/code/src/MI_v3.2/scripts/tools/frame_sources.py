@@ -0,0 +1,275 @@
+'''
+Comments:
+Sources of the frames read by the Camera. Besides live devices, frames can be replayed from a video file or
+a directory of images, or generated synthetically, so the whole pipeline can be run deterministically on
+machines without a webcam. The source is chosen with general/camera/frame_source in the config.
+'''
+from scripts.tools.logger import get_logger
+log = get_logger(__name__)
+
+import os
+import sys
+import time
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from scripts.tools.config import Config
+
+# capture backends of the live devices, "auto" picks the one of the current platform
+DEVICE_BACKENDS = {
+    "any": cv2.CAP_ANY,
+    "dshow": cv2.CAP_DSHOW,
+    "msmf": cv2.CAP_MSMF,
+    "v4l2": cv2.CAP_V4L2,
+    "avfoundation": cv2.CAP_AVFOUNDATION
+}
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+def get_device_backend(name: str = "auto") -> int:
+    """
+    :param name: name of the backend in DEVICE_BACKENDS or "auto", defaults to "auto"
+    :type name: str
+    :raises RuntimeError: if the backend is not supported
+    :return: the OpenCV capture API constant
+    :rtype: int
+    """
+    if name == "auto":
+        if sys.platform == "win32":
+            return cv2.CAP_DSHOW
+        if sys.platform.startswith("linux"):
+            return cv2.CAP_V4L2
+        return cv2.CAP_ANY
+    if name not in DEVICE_BACKENDS:
+        raise RuntimeError("Attempt to use an unsupported camera backend: " + name)
+    return DEVICE_BACKENDS[name]
+
+
+class FrameSource:
+    """Has the same read/isOpened/get/set/release interface as cv2.VideoCapture, so the Camera can use either"""
+
+    def __init__(self) -> None:
+        self._width = None
+        self._height = None
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        :return: whether a frame was read, and the frame
+        :rtype: Tuple[bool, Optional[np.ndarray]]
+        """
+        raise NotImplementedError()
+
+    def isOpened(self) -> bool:
+        raise NotImplementedError()
+
+    def get(self, prop: int) -> float:
+        if prop == cv2.CAP_PROP_FPS:
+            return self._get_fps()
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return self._width or 0
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return self._height or 0
+        return 0
+
+    def set(self, prop: int, value: float) -> bool:
+        """Only the frame width and height can be set. Frames of a different size are resized to it."""
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            self._width = int(value)
+        elif prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            self._height = int(value)
+        else:
+            return False
+        return True
+
+    def release(self) -> None:
+        pass
+
+    def _get_fps(self) -> float:
+        return 0
+
+    def _resize(self, image: np.ndarray) -> np.ndarray:
+        if self._width is None or self._height is None:
+            return image
+        if image.shape[1] == self._width and image.shape[0] == self._height:
+            return image
+        return cv2.resize(image, (self._width, self._height), interpolation=cv2.INTER_AREA)
+
+
+class PacedFrameSource(FrameSource):
+    """Source of recorded or generated frames, returned either at a given rate or as fast as they are read"""
+
+    def __init__(self, fps: float, paced: bool, loop: bool) -> None:
+        """
+        :param fps: rate of the frames, only used if paced
+        :type fps: float
+        :param paced: if True read() returns the frames at the given fps, otherwise as fast as possible
+        :type paced: bool
+        :param loop: if True starts again from the first frame after the last one
+        :type loop: bool
+        """
+        super().__init__()
+        self._fps = fps
+        self._paced = paced and fps > 0
+        self._loop = loop
+        self._next_frame_time = None
+        self._finished = False
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if self._finished:
+            # nothing more to return, don't let the camera thread spin
+            time.sleep(0.1)
+            return False, None
+        success, image = self._read_next()
+        if not success and self._loop:
+            self._rewind()
+            success, image = self._read_next()
+        if not success:
+            log.info("Frame source finished")
+            self._finished = True
+            return False, None
+        self._wait_for_frame_time()
+        return True, self._resize(image)
+
+    def _get_fps(self) -> float:
+        return self._fps
+
+    def _wait_for_frame_time(self) -> None:
+        if not self._paced: return
+        now = time.perf_counter()
+        if self._next_frame_time is None or now - self._next_frame_time > 1:
+            # first frame, or too far behind (e.g. the reader was paused) to catch up
+            self._next_frame_time = now
+        elif self._next_frame_time > now:
+            time.sleep(self._next_frame_time - now)
+        self._next_frame_time += 1 / self._fps
+
+    def _read_next(self) -> Tuple[bool, Optional[np.ndarray]]:
+        raise NotImplementedError()
+
+    def _rewind(self) -> None:
+        raise NotImplementedError()
+
+
+class VideoFileSource(PacedFrameSource):
+    def __init__(self, path: str, paced: bool = True, loop: bool = True, fps: float = 0) -> None:
+        """
+        :param path: path of the video file
+        :type path: str
+        :param paced: if True the video is played at its native rate, otherwise as fast as possible, defaults to True
+        :type paced: bool
+        :param loop: if True the video is replayed from the start once finished, defaults to True
+        :type loop: bool
+        :param fps: rate to play the video at instead of its native one if greater than 0, defaults to 0
+        :type fps: float
+        """
+        self._cap = cv2.VideoCapture(path)
+        super().__init__(fps or self._cap.get(cv2.CAP_PROP_FPS), paced, loop)
+
+    def isOpened(self) -> bool:
+        return self._cap.isOpened()
+
+    def release(self) -> None:
+        self._cap.release()
+
+    def _read_next(self) -> Tuple[bool, Optional[np.ndarray]]:
+        return self._cap.read()
+
+    def _rewind(self) -> None:
+        self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+
+class ImageSequenceSource(PacedFrameSource):
+    def __init__(self, directory: str, fps: float = 30, paced: bool = True, loop: bool = True) -> None:
+        """
+        :param directory: directory of the images, which are returned in name order
+        :type directory: str
+        :param fps: rate of the images, defaults to 30
+        :type fps: float
+        :param paced: if True the images are returned at the given fps, otherwise as fast as possible, defaults to True
+        :type paced: bool
+        :param loop: if True starts again from the first image after the last one, defaults to True
+        :type loop: bool
+        """
+        super().__init__(fps, paced, loop)
+        self._paths = []
+        if os.path.isdir(directory):
+            self._paths = [os.path.join(directory, name) for name in sorted(os.listdir(directory))
+                           if name.lower().endswith(IMAGE_EXTENSIONS)]
+        self._index = 0
+
+    def isOpened(self) -> bool:
+        return len(self._paths) > 0
+
+    def _read_next(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if self._index >= len(self._paths):
+            return False, None
+        image = cv2.imread(self._paths[self._index])
+        self._index += 1
+        return image is not None, image
+
+    def _rewind(self) -> None:
+        self._index = 0
+
+
+class SyntheticSource(PacedFrameSource):
+    """Generates a deterministic test pattern: a gradient background with a moving square and the frame number"""
+
+    def __init__(self, width: int, height: int, fps: float = 30, paced: bool = True) -> None:
+        super().__init__(fps, paced, loop=False)
+        self._width = width
+        self._height = height
+        self._frame_nr = 0
+        gradient = np.linspace(0, 255, width, dtype=np.uint8)
+        self._background = np.dstack([np.tile(gradient, (height, 1))] * 3)
+
+    def isOpened(self) -> bool:
+        return True
+
+    def set(self, prop: int, value: float) -> bool:
+        # the pattern is generated at the size it was created with
+        return False
+
+    def _read_next(self) -> Tuple[bool, Optional[np.ndarray]]:
+        image = self._background.copy()
+        size = min(self._width, self._height) // 4
+        x = (self._frame_nr * 4) % max(1, self._width - size)
+        y = (self._height - size) // 2
+        cv2.rectangle(image, (x, y), (x + size, y + size), (0, 0, 255), -1)
+        cv2.putText(image, str(self._frame_nr), (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+        self._frame_nr += 1
+        return True, image
+
+    def _rewind(self) -> None:
+        pass
+
+
+def create_frame_source(camera_nr: int, width: int, height: int):
+    """Creates the frame source configured in general/camera/frame_source.
+
+    :param camera_nr: index of the device, only used by the "device" source
+    :type camera_nr: int
+    :param width: width of the frames
+    :type width: int
+    :param height: height of the frames
+    :type height: int
+    :raises RuntimeError: if the configured source type is not supported
+    :return: a cv2.VideoCapture for live devices, a FrameSource otherwise
+    :rtype: Union[cv2.VideoCapture, FrameSource]
+    """
+    settings = Config().get_data("general/camera/frame_source")
+    source_type = settings["type"]
+    if source_type == "device":
+        return cv2.VideoCapture(camera_nr, get_device_backend(settings["backend"]))
+    if source_type == "video":
+        source = VideoFileSource(settings["path"], settings["paced"], settings["loop"], settings["fps"])
+    elif source_type == "images":
+        source = ImageSequenceSource(settings["path"], settings["fps"] or 30, settings["paced"], settings["loop"])
+    elif source_type == "synthetic":
+        source = SyntheticSource(width, height, settings["fps"] or 30, settings["paced"])
+    else:
+        raise RuntimeError("Attempt to use an unsupported frame source: " + source_type)
+    log.info(f"Reading frames from a {source_type} source")
+    return source
@@ -2,7 +2,7 @@
 Author: Oluwaponmile Femi-Sunmaila
 '''
 # Class for reading, and editing the config JSON file
-from typing import Dict, Any
+from typing import Any, Callable, Dict
 from scripts.tools.json_editors.json_editor import JSONEditor
 
 
@@ -11,6 +11,64 @@ class ConfigEditor(JSONEditor):
 
     def __init__(self):
         super().__init__("config.json")
+        self._update_listeners = []  # functions called with the changed path (and whether it was removed) after every change of the data
+
+    def update(self, path: str, val: str) -> None:
+        """Updates the data JSON file and notifies the update listeners of the change.
+
+        :param path: The path of the attribute to be updated
+        :type path: str
+        :param val: The new value of the attribute
+        :type val: Any
+        """
+        with self._lock:
+            try:
+                super().update(path, val)
+            except KeyError:
+                # the data has been read from the file again, dropping any unsaved changes
+                self._notify_update_listeners("", False)
+                raise
+            self._notify_update_listeners(path, False)
+
+    def add(self, path: str, val: Dict[str, Any], key: str) -> None:
+        """Adds an object to the JSON file and notifies the update listeners of the change.
+
+        :param path: The path the object should be added to.
+        :type path: str
+        :param val: The object to be added.
+        :type val: Dict[str, Any]
+        :param key: The name of the object to be added.
+        :type key: str
+        """
+        with self._lock:
+            super().add(path, val, key)
+            self._notify_update_listeners(f"{path}/{key}" if path else key, False)
+
+    def remove(self, path: str) -> None:
+        """Removes an object or attribute from the JSON file and notifies the update listeners of the change.
+
+        :param path: The path of the object or attribute to be removed
+        :type path: str
+        """
+        list_path = path.split("/")
+        with self._lock:
+            parent = self._traverse_json(list_path)
+            parent.pop(list_path[-1])
+            self._notify_update_listeners(path, True)
+
+    def add_update_listener(self, listener: Callable[[str, bool], None]) -> None:
+        """Registers a function to be called with the changed path and whether it was removed after every update, add or remove.
+        The listener is called while the data is locked, so it sees the data just after the change.
+        An empty path means the whole data may have changed (e.g. it was read from the file again).
+
+        :param listener: The function to be called
+        :type listener: Callable[[str, bool], None]
+        """
+        self._update_listeners.append(listener)
+
+    def _notify_update_listeners(self, path: str, removed: bool) -> None:
+        for listener in list(self._update_listeners):
+            listener(path, removed)
 
     def get_activated_gesture_names(self, gesture_type: str) -> list[str]:
         """Gets all the names of the activated gestures in the JSON.values.
@@ -25,8 +25,9 @@ class EventEditor(JSONEditor):
 
     def remove(self, path):
         list_path = path.split("/")
-        mode = self._traverse_json(list_path)
-        mode.pop(list_path[-1], None)
+        with self._lock:
+            mode = self._traverse_json(list_path)
+            mode.pop(list_path[-1], None)
 
     def add(self, path, event):
         """Adds A Gesture to the event JSON
@@ -36,12 +36,14 @@ class GestureEditor(JSONEditor):
         """
         raw_data = super().get_all_data()
         if not self._as_primitives: return raw_data
-        for _, bodypart in enumerate(raw_data):
-            for _, (gesture, primitives) in enumerate(raw_data[bodypart].items()):
-                primitive_set = set()
-                for primitive, val in primitives.items():
-                    primitive_set.add(Primitive(primitive, val))
-                raw_data[bodypart][gesture] = primitive_set
+        # the gestures are replaced in the data itself, so not while it is being saved
+        with self._lock:
+            for _, bodypart in enumerate(raw_data):
+                for _, (gesture, primitives) in enumerate(raw_data[bodypart].items()):
+                    primitive_set = set()
+                    for primitive, val in primitives.items():
+                        primitive_set.add(Primitive(primitive, val))
+                    raw_data[bodypart][gesture] = primitive_set
         return raw_data
 
     def get_data(self, path : str) -> Set[Primitive]:
@@ -67,11 +69,12 @@ class GestureEditor(JSONEditor):
     def remove(self, path):
         if path in MODULES: raise Exception("You almost deleted an entire module worth of gestures, try fixing your path.")
         list_path = path.split("/")
-        mode = self._traverse_json(list_path)
-        try:
-            mode.pop(list_path[-1])
-        except Exception:
-            raise Exception(f"{list_path[-1]} is not in the JSON file")
+        with self._lock:
+            mode = self._traverse_json(list_path)
+            try:
+                mode.pop(list_path[-1])
+            except Exception:
+                raise Exception(f"{list_path[-1]} is not in the JSON file")
 
     def add(self, path, gesture):
         """Adds A Gesture to the gesture JSON
@@ -8,6 +8,7 @@ from scripts.tools.logger import get_logger
 log = get_logger(__name__)
 
 import os
+import threading
 from typing import Dict, Any, Optional
 
 from scripts.tools.json_editors.json_editor import JSONEditor
@@ -22,10 +23,11 @@ class HotkeysEditor(JSONEditor):
         """
         Initialisation # TODO
         """
-        self.path = DATA_PATH + "\\" +path
+        self.path = os.path.join(DATA_PATH, path)
         if not(os.path.exists(self.path) and self.path.endswith(".json")):
             log.error(f"__init__: {self.path} path was not found")
             raise FileNotFoundError(f"file_not_found: {self.path}")
+        self._lock = threading.RLock()
         self._read_data()
         if iter_type:
             self.data = self._to_iter(self.data, iter_type)
@@ -36,8 +38,9 @@ class HotkeysEditor(JSONEditor):
         Remove
         """
         list_path = path.split("/")
-        mode = self._traverse_json(list_path)
-        mode.pop(list_path[-1], None)
+        with self._lock:
+            mode = self._traverse_json(list_path)
+            mode.pop(list_path[-1], None)
 
 
     def add(self, path, event):
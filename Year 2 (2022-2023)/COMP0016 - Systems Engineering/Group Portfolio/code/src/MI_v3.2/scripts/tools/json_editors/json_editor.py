@@ -9,9 +9,12 @@ log = get_logger(__name__)
 
 # Standard
 import ast
+import atexit
 import json
 import sys
 import os
+import threading
+import time
 from typing import Dict, Any, Optional
 
 # Local
@@ -38,6 +41,90 @@ ERRORS = {
 # Pydantic is probably the most advanced open-source validation library.
 # TODO: No method to overwrite a JSON file, only targeted JSON objects
 
+SAVE_DELAY = 0.5  # seconds without a new save_later() call before the file is written
+
+
+def _write_file(path: str, text: str) -> None:
+    """Writes the text to a temporary file which then replaces the file at the path,
+    so the file is never left half written (e.g. if MI crashes while saving)"""
+    temp_path = path + ".tmp"
+    with open(temp_path, "w") as file:
+        file.write(text)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
+
+
+class _WriteBehindSaver:
+    """Saves the editors given to save_later() from a background thread, once they have not been changed for SAVE_DELAY seconds.
+    Many saves of the same file in a short time (e.g. switching modes quickly) result in a single write."""
+
+    def __init__(self) -> None:
+        self._pending = {}  # dict: path of the file -> editor to save it from
+        self._last_request_time = 0
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def save_later(self, editor: "JSONEditor") -> None:
+        with self._condition:
+            self._pending[editor.path] = editor
+            self._last_request_time = time.perf_counter()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="JSONWriter", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def cancel(self, editor: "JSONEditor") -> None:
+        """Called when the editor is saved right away, so it is not written again"""
+        with self._condition:
+            if self._pending.get(editor.path) is editor:
+                self._pending.pop(editor.path)
+
+    def flush(self) -> None:
+        """Writes all the pending saves on the calling thread.
+        Editors that fail to save are kept pending, so they are tried again later rather than their changes being lost.
+
+        :raises Exception: the first error raised by a save, after all the editors have been tried
+        """
+        with self._condition:
+            editors = list(self._pending.values())
+            self._pending.clear()
+        first_error = None
+        for editor in editors:
+            try:
+                editor.save()
+            except Exception as error:
+                self.save_later(editor)
+                if first_error is None: first_error = error
+        if first_error is not None:
+            raise first_error
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+                # wait until the editors have not been changed for a while
+                remaining = self._last_request_time + SAVE_DELAY - time.perf_counter()
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                    continue
+            try:
+                self.flush()
+            except Exception as error:
+                log.exception(f"Failed to save a JSON file: {error}")
+
+
+_saver = _WriteBehindSaver()
+# the background thread is a daemon, so make sure nothing is lost when python exits
+atexit.register(_saver.flush)
+
+
+def flush_pending_saves() -> None:
+    """Writes all the changes given to JSONEditor.save_later() that have not been saved yet.
+    Called when MI stops."""
+    _saver.flush()
+
 
 class JSONEditor:
     """ JSON data handler - Used as abstract class for other editors """
@@ -50,10 +137,11 @@ class JSONEditor:
         :type path: str
         :iter_type: The type of iterable JSON lists should be converted to.
         """
-        self.path = DATA_PATH + "\\" +path
+        self.path = os.path.join(DATA_PATH, path)
         if not(os.path.exists(self.path) and self.path.endswith(".json")):
             log.error(f"__init__: {self.path} path was not found")
             raise FileNotFoundError(f"{ERRORS['file_not_found']}{self.path}")
+        self._lock = threading.RLock()  # held while the data is changed or written to the file
         self._read_data()
         if iter_type:
             self.data = self._to_iter(self.data, iter_type)
@@ -96,13 +184,14 @@ class JSONEditor:
         """
         val = self._to_correct_type(val)
         list_path = path.split("/")
-        try:
-            obj = self._traverse_json(list_path)
-        except KeyError:
-            self._read_data()
-            log.error(f"update: {self.path} path does not exist")
-            raise KeyError(ERRORS["path_does_not_exist"])
-        obj[list_path[-1]] = val
+        with self._lock:
+            try:
+                obj = self._traverse_json(list_path)
+            except KeyError:
+                self._read_data()
+                log.error(f"update: {self.path} path does not exist")
+                raise KeyError(ERRORS["path_does_not_exist"])
+            obj[list_path[-1]] = val
 
 
     def add(self, path: str, val: Dict[str, Any], key: str) -> None:
@@ -119,21 +208,33 @@ class JSONEditor:
         list_path = path.split("/")
         if list_path == [""]:
             list_path = []
-        position = self._traverse_json(list_path)
-        if list_path == []:
-            position[key] = val
-        else:
-            position[list_path[-1]][key] = val
+        with self._lock:
+            position = self._traverse_json(list_path)
+            if list_path == []:
+                position[key] = val
+            else:
+                position[list_path[-1]][key] = val
 
 
     def save(self) -> None:
         """
-        Saves all changed made to the JSON file
+        Saves all changed made to the JSON file.
+        The data is serialised while it is locked, so every change to it has to be made while holding self._lock
+        """
+        _saver.cancel(self)
+        with self._lock:
+            json_object = json.dumps(
+                self.data, indent=4, sort_keys=True, cls=JSONEncoder)
+            _write_file(self.path, json_object)
+
+
+    def save_later(self) -> None:
+        """
+        Saves all changes made to the JSON file from a background thread, 
+        for saves made while MI is running (e.g. on every mode change) that should not slow down the frame processing.
+        Saves requested shortly after each other are combined into one.
         """
-        json_object = json.dumps(
-            self.data, indent=4, sort_keys=True, cls=JSONEncoder)
-        with open(self.path, "w") as file:
-            file.write(json_object)
+        _saver.save_later(self)
 
 
     @classmethod
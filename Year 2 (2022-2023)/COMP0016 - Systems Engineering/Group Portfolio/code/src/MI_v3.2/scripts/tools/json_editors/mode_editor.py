@@ -15,8 +15,9 @@ class ModeEditor(JSONEditor):
         if not path.startswith("modes"): raise Exception("Only modes can be removed from the mode_controller JSON")
         list_path = path.split("/")
         if len(list_path) == 2:
-            modes = self.data["modes"]
-            modes.pop(list_path[-1], None)
+            with self._lock:
+                modes = self.data["modes"]
+                modes.pop(list_path[-1], None)
         else:
             raise Exception(f"Cannot remove element'{list_path[1]}' as it is not a mode")
 
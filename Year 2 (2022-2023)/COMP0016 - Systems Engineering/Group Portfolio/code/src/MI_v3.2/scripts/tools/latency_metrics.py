@@ -0,0 +1,205 @@
+'''
+Comments:
+Per-stage latency measurements of the frame loop (camera read, each module, gesture and event updates, display).
+Each stage keeps a rolling window of its latest durations from which the p50/p95/p99 are calculated on request,
+so recording a measurement only costs two perf_counter() calls and an append.
+The summary can be requested through the Communicator (METRICS) and optionally written to a CSV or JSON file.
+'''
+from scripts.tools.logger import get_logger
+log = get_logger(__name__)
+
+import csv
+import json
+import os
+import threading
+from collections import deque
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+
+from scripts.tools.config import Config
+
+PERCENTILES = (50, 95, 99)
+SUMMARY_FIELDS = ["count", "mean", "p50", "p95", "p99", "max"]
+
+
+def singleton(cls):
+    instances = {}
+    def getinstance():
+        if cls not in instances:
+            instances[cls] = cls()
+        return instances[cls]
+    return getinstance
+
+
+class StageLatency:
+    """Rolling window of the durations (in ms) of one stage"""
+
+    def __init__(self, window_size: int) -> None:
+        self._durations = deque(maxlen=window_size)
+        self._count = 0  # total number of measurements, not only the ones in the window
+        self._lock = threading.Lock()
+
+    def record(self, duration_ms: float) -> None:
+        with self._lock:
+            self._durations.append(duration_ms)
+            self._count += 1
+
+    def get_summary(self) -> Dict[str, float]:
+        """
+        :return: total count of measurements, and the mean, percentiles and max of the ones in the window (in ms)
+        :rtype: Dict[str, float]
+        """
+        with self._lock:
+            durations = np.array(self._durations)
+            count = self._count
+        if len(durations) == 0:
+            return {"count": count}
+        p50, p95, p99 = np.percentile(durations, PERCENTILES)
+        return {
+            "count": count,
+            "mean": round(float(durations.mean()), 3),
+            "p50": round(float(p50), 3),
+            "p95": round(float(p95), 3),
+            "p99": round(float(p99), 3),
+            "max": round(float(durations.max()), 3)
+        }
+
+
+class LatencyRecorder:
+    """Latencies of any number of named stages"""
+
+    def __init__(self, enabled: bool = True, window_size: int = 300, output_file: str = "") -> None:
+        """
+        :param enabled: if False nothing is timed or recorded, defaults to True
+        :type enabled: bool
+        :param window_size: number of latest measurements kept per stage, defaults to 300
+        :type window_size: int
+        :param output_file: file written to by write() if it is not given a path, defaults to ""
+        :type output_file: str
+        """
+        self._enabled = enabled
+        self._window_size = window_size
+        self._output_file = output_file
+        self._stages = {}  # dict: name of the stage -> StageLatency instance
+        self._stages_lock = threading.Lock()
+
+    def is_enabled(self) -> bool:
+        return self._enabled
+
+    def set_enabled(self, enabled: bool) -> None:
+        self._enabled = enabled
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        """Times the code inside the with block and records it under the given stage name.
+
+        :param stage: name of the stage e.g. "camera_read" or "module/hand"
+        :type stage: str
+        """
+        if not self._enabled:
+            yield
+            return
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, (perf_counter() - start) * 1000)
+
+    def record(self, stage: str, duration_ms: float) -> None:
+        """Records a duration measured elsewhere (e.g. across threads).
+
+        :param stage: name of the stage
+        :type stage: str
+        :param duration_ms: duration in milliseconds
+        :type duration_ms: float
+        """
+        if not self._enabled:
+            return
+        if stage not in self._stages:
+            with self._stages_lock:
+                if stage not in self._stages:
+                    self._stages[stage] = StageLatency(self._window_size)
+        self._stages[stage].record(duration_ms)
+
+    def get_summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        :return: name of every stage mapped to its count, mean, p50, p95, p99 and max latency in ms
+        :rtype: Dict[str, Dict[str, float]]
+        """
+        with self._stages_lock:
+            stages = dict(self._stages)
+        return {name: stage.get_summary() for name, stage in sorted(stages.items())}
+
+    def reset(self) -> None:
+        """Forgets all the measurements"""
+        with self._stages_lock:
+            self._stages = {}
+
+    def write(self, path: Optional[str] = None) -> str:
+        """Writes the current summary to a file, as CSV if the path ends with .csv and JSON otherwise.
+
+        :param path: file to write to, defaults to general/latency_metrics/output_file in the config
+        :type path: Optional[str]
+        :raises ValueError: if no path is given and none is configured
+        :return: absolute path of the written file
+        :rtype: str
+        """
+        path = path or self._output_file
+        if not path:
+            raise ValueError("No file given to write the latency metrics to")
+        path = os.path.abspath(path)
+        summary = self.get_summary()
+        if path.endswith(".csv"):
+            with open(path, "w", newline="") as file:
+                writer = csv.DictWriter(file, fieldnames=["stage"] + SUMMARY_FIELDS)
+                writer.writeheader()
+                for stage, values in summary.items():
+                    writer.writerow({"stage": stage, **values})
+        else:
+            with open(path, "w") as file:
+                json.dump(summary, file, indent=4)
+        return path
+
+
+@singleton
+class LatencyMetrics(LatencyRecorder):
+    """Latencies of the stages of the MI frame loop, configured by general/latency_metrics"""
+
+    def __init__(self) -> None:
+        config = Config()
+        super().__init__(config.get_data("general/latency_metrics/enabled"),
+                         config.get_data("general/latency_metrics/window_size"),
+                         config.get_data("general/latency_metrics/output_file"))
+        self._output_interval = config.get_data("general/latency_metrics/output_interval")
+        self._writer = None
+        self._stop_writer = threading.Event()
+
+    def start_writer(self) -> None:
+        """If an output file is configured, writes the summary to it every output_interval seconds from a background thread"""
+        if not self._enabled or not self._output_file or self._writer is not None:
+            return
+        self._stop_writer.clear()
+        self._writer = threading.Thread(target=self._run_writer, name="Thread Latency Metrics", daemon=True)
+        self._writer.start()
+
+    def stop_writer(self) -> None:
+        """Stops the background writer, writing the summary one last time"""
+        if self._writer is None:
+            return
+        self._stop_writer.set()
+        self._writer.join()
+        self._writer = None
+
+    def _run_writer(self) -> None:
+        while not self._stop_writer.wait(self._output_interval):
+            self._write_logging_errors()
+        self._write_logging_errors()
+
+    def _write_logging_errors(self) -> None:
+        try:
+            self.write()
+        except OSError as error:
+            log.error(f"Could not write the latency metrics: {error}")
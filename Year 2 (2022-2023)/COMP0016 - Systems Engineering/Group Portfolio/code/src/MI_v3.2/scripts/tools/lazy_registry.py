@@ -0,0 +1,51 @@
+'''
+Comments:
+Registry of classes that are only imported when they are first used. The modules and gesture events depend on
+heavy libraries (MediaPipe, OpenVINO, Vosk, win32, etc.), so importing all of them up front slows down the start of
+MI even if only one module is used.
+'''
+import importlib
+import threading
+from collections.abc import Mapping
+from typing import Dict, Iterator
+
+from scripts.tools.startup_profiler import StartupProfiler
+
+
+class LazyRegistry(Mapping):
+    """Read only dict of name -> class, where every class is imported on first access"""
+
+    def __init__(self, kind: str, paths: Dict[str, str]) -> None:
+        """
+        :param kind: what the classes are, e.g. "module" or "event". Used in the startup profile and errors
+        :type kind: str
+        :param paths: dict: name -> "python.module.path:ClassName"
+        :type paths: Dict[str, str]
+        """
+        self._kind = kind
+        self._paths = paths
+        self._classes = {}  # dict: name -> the class, once imported
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name: str) -> type:
+        cls = self._classes.get(name)
+        if cls is not None:
+            return cls
+        if name not in self._paths:
+            raise KeyError(name)
+        # imports are not thread safe when the same module is imported from two threads for the first time
+        with self._lock:
+            if name not in self._classes:
+                module_path, class_name = self._paths[name].split(":")
+                with StartupProfiler().measure("import", f"{self._kind} {name}"):
+                    self._classes[name] = getattr(importlib.import_module(module_path), class_name)
+            return self._classes[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._paths)
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._classes
@@ -6,18 +6,58 @@ having a method to provide information about app activities.
 With multithreading in particular, print statements are not always reliable.
 Therefore, other that Visual Studio debugging tools, 
 logging provides an easy way of tracking actions throughout the application.
+The log calls only put the record on a queue, and a background thread writes them to the file,
+so that logging from the frame loop never waits for the disk.
 '''
 import os
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from time import monotonic
 
 MI_LOGGER_NAME = "motioninput_api"
 
+_listener = None  # QueueListener writing the queued records to the file, None if logging is not enabled
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets through at most max_per_second records from each line of code that logs, so a message logged on every frame
+    does not flood the file. The number of records dropped is added to the next record let through from the same line.
+    """
+
+    def __init__(self, max_per_second: float) -> None:
+        super().__init__()
+        self._max_per_second = max_per_second
+        self._call_sites = {}  # dict: (path, line) -> [start of the current second, records let through in it, records dropped]
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self._max_per_second <= 0:
+            return True
+        now = monotonic()
+        with self._lock:
+            call_site = self._call_sites.setdefault((record.pathname, record.lineno), [now, 0, 0])
+            if now - call_site[0] >= 1:
+                call_site[0] = now
+                call_site[1] = 0
+            if call_site[1] >= self._max_per_second:
+                call_site[2] += 1
+                return False
+            call_site[1] += 1
+            dropped = call_site[2]
+            call_site[2] = 0
+        if dropped:
+            record.msg = f"{record.msg} ({dropped} similar messages suppressed)"
+        return True
+
 def logger_config(file_name : str = "", config = None) -> None: 
     """
     Logger Configuration in motioninput_api.py
     Code inspired from https://github.com/yashprakash13/data-another-day 
     """
+    global _listener
     logger = logging.getLogger(MI_LOGGER_NAME)
     logger_enabled = False
     if config:
@@ -27,6 +67,8 @@ def logger_config(file_name : str = "", config = None) -> None:
     else:
         logger.handlers.clear()
         return logger
+    if _listener is not None:
+        _listener.stop()
 
     fmt = "%(asctime)s <%(levelname)s> ['%(message)s']  -  Path: <%(name)s>  -  Function Name: %(funcName)s - Line: %(lineno)s"
 
@@ -53,15 +95,19 @@ def logger_config(file_name : str = "", config = None) -> None:
 
     fileHandler = RotatingFileHandler(
     filename=file_name, 
-    maxBytes=100_000, 
-    backupCount=3
+    maxBytes=config.get_data("general/logging_max_bytes"), 
+    backupCount=config.get_data("general/logging_backup_count")
     )
+    fileHandler.setFormatter(formatter)
 
-    logger.addHandler(fileHandler)
-    fh = logging.FileHandler(file_name)
-    fh.setFormatter(formatter)
+    # the records are only written by the listener thread, the loggers just queue them
+    log_queue = queue.SimpleQueue()
+    queueHandler = QueueHandler(log_queue)
+    queueHandler.addFilter(RateLimitFilter(config.get_data("general/logging_rate_limit")))
     logger.handlers.clear()
-    logger.addHandler(fh)
+    logger.addHandler(queueHandler)
+    _listener = QueueListener(log_queue, fileHandler)
+    _listener.start()
     return logger
 
 
@@ -86,8 +132,12 @@ def get_logger(filename : str):
 def logger_stop() -> None:
     """
     STOP
-    Flush and close all handlers 
+    Write the records still in the queue, then flush and close all handlers 
     """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
     logging.shutdown()
 
 
@@ -0,0 +1,70 @@
+'''
+Comments:
+Measures how long the slow steps of starting MI take: importing the modules and gesture events (which pull in
+MediaPipe, OpenVINO, Vosk, etc.), pre-initializing the modules and creating them.
+The measurements are always taken, as there are only a few of them. If general/startup_profiler is enabled in the
+config they are also logged and printed once MI has started.
+'''
+from scripts.tools.logger import get_logger
+log = get_logger(__name__)
+
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Dict, Iterator, List, Union
+
+from scripts.tools.config import Config
+
+
+def singleton(cls):
+    instances = {}
+    def getinstance():
+        if cls not in instances:
+            instances[cls] = cls()
+        return instances[cls]
+    return getinstance
+
+
+@singleton
+class StartupProfiler:
+    def __init__(self) -> None:
+        self._enabled = Config().get_data("general/startup_profiler")
+        self._timings = []  # list: (stage e.g. "import", name e.g. "module hand", duration in ms) in the order they finished
+        self._lock = threading.Lock()
+
+    def is_enabled(self) -> bool:
+        return self._enabled
+
+    @contextmanager
+    def measure(self, stage: str, name: str) -> Iterator[None]:
+        """Records how long the code inside the with statement took.
+
+        :param stage: step of the startup, e.g. "import", "pre_initialize" or "initialize"
+        :type stage: str
+        :param name: what was imported or initialized, e.g. "module hand"
+        :type name: str
+        """
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            duration = (perf_counter() - start) * 1000
+            with self._lock:
+                self._timings.append((stage, name, duration))
+
+    def get_report(self) -> List[Dict[str, Union[str, float]]]:
+        """
+        :return: the stage, name and duration (in ms) of every measurement
+        :rtype: List[Dict[str, Union[str, float]]]
+        """
+        with self._lock:
+            return [{"stage": stage, "name": name, "ms": duration} for stage, name, duration in self._timings]
+
+    def log_report(self) -> None:
+        """Logs and prints the measurements taken so far, if the profiler is enabled"""
+        if not self._enabled: return
+        report = self.get_report()
+        lines = ["Startup profile:"] + [f"{timing['stage']:<16}{timing['name']:<48}{timing['ms']:>10.1f} ms" for timing in report]
+        lines.append(f"{'total':<64}{sum(timing['ms'] for timing in report):>10.1f} ms")
+        print("\n".join(lines))
+        log.info("\n".join(lines))
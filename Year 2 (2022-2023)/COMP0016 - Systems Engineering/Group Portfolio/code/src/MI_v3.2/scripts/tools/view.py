@@ -2,12 +2,14 @@
 Authors: Carmen Meinson, Jason Ho and Oluwaponmile Femi-Sunmaila
 Contributors: Andrzej Szablewski, Anelia Gaydardzhieva
 '''
+from queue import Empty, SimpleQueue
 from time import perf_counter
-from typing import Dict, Tuple
+from typing import Any, Dict, Tuple
 
 import cv2
 import numpy as np
 
+from scripts.tools.brightness_monitor import BrightnessMonitor
 from scripts.tools.config import Config
 from scripts.tools.display_element import (
     AreaOfInterestElement,
@@ -41,6 +43,9 @@ class View:
         self._current_camera = 0
         self._window_name = config.get_data("general/view/window_name") + " v%s" %config.get_data("general/version")
         self._display_fps = config.get_data("general/view/show_fps")
+        self._check_low_light = config.get_data("general/view/low_light_indicator_on")
+        self._brightness_monitor = BrightnessMonitor()
+        self._brightness_monitor.reset()
         self.frames = 0
         self.second = 0
         self.fps = 0
@@ -123,6 +128,8 @@ class View:
             }
         }
         self._display_element_dict = {}
+        # (name, update args) given to update_display_element(), applied by update_display() on the thread that draws
+        self._element_updates = SimpleQueue()
         self._hidden = hidden
         self._closed_by_user = False
         self._window_open = False
@@ -132,6 +139,8 @@ class View:
         """Updates a display element, e.g. area of interest element, by passing in 
         updated arguments to update its attributes. 
         If the display element class is not already initialised, then it also initialises the class.
+        Can be called from any thread (e.g. by the event handlers when the frame loop is pipelined): the update is
+        queued and applied by the next update_display(), on the thread that draws the elements.
 
         :param name: Reference name of the DisplayElement class handled by the View
         :type name: str
@@ -141,7 +150,18 @@ class View:
         
         if name not in self._display_element_classes:
             raise RuntimeError("Attempt to get an undefined display element :", name)
+        # the handlers keep changing their dicts and sets, so the element is given a copy of them as they are now
+        self._element_updates.put((name, {key: self._copy_arg(value) for key, value in update_args.items()}))
 
+    def _apply_element_updates(self) -> None:
+        while True:
+            try:
+                name, update_args = self._element_updates.get_nowait()
+            except Empty:
+                return
+            self._apply_element_update(name, update_args)
+
+    def _apply_element_update(self, name: str, update_args: Dict[str, Any]) -> None:
         if name not in self._display_element_dict:
             #print("Adding new dictionary element for",name)
             #print("in",self._display_element_dict)
@@ -168,24 +188,31 @@ class View:
         """Takes an image object and loops through all activated DisplayElements, running their update_display method allowing them to draw to the
         image
 
+        While the view is hidden nothing is drawn and there is no window, only the FPS and the low light flag are updated.
+        The frames are captured (and processed) unmirrored, so they are mirrored here, only when displayed.
+
         :param frame: image object for the DisplayElement instances to draw to
         :type frame: np.ndarray
         """
+        self._update_fps()
+        self._brightness_monitor.update(frame)
+        self._apply_element_updates()
         if self._hidden:
             if self._window_open: self.close()
             return
 
-        self.update_display_element("low_light_indicator_element", {})
-        self.update_display_element("change_camera_element", {"display":self._change_camera, "index": self._current_camera})
-        self.update_display_element("help_message_element", {})
+        # a mirrored copy, so the elements do not draw on the frame the modules may still be reading
+        frame = cv2.flip(frame, 1)
+        self._apply_element_update("low_light_indicator_element", {"low_light": self.is_low_light()})
+        self._apply_element_update("change_camera_element", {"display":self._change_camera, "index": self._current_camera})
+        self._apply_element_update("help_message_element", {})
         if self._display_fps:
-            self._draw_fps(frame)
-            self.update_display_element("draw_fps_element", {"fps": str(self.fps)})
+            self._apply_element_update("draw_fps_element", {"fps": str(self.fps)})
 
         for display_element in self._display_element_dict.values():
             display_element.update_display(frame)
 
-        cv2.imshow(self._window_name, np.copy(frame))
+        cv2.imshow(self._window_name, frame)
         self._window_open = True
 
         # if esc pressed or closed with x
@@ -206,15 +233,23 @@ class View:
 
 
 
-    # Draw FPS code from MI2 (slightly modified)
-    def _draw_fps(self, image: np.ndarray) -> None:
+    # Draw FPS code from MI2 (slightly modified), counted even when the view is hidden
+    def _update_fps(self) -> None:
         if perf_counter() < self.second + 1:
             self.frames += 1
         else:
             self.fps = self.frames
             self.second = perf_counter()
             self.frames = 1
-        #cv2.putText(image, str(self.fps), (590, 450), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2, cv2.LINE_AA)
+
+    def get_fps(self) -> int:
+        return self.fps
+
+    def is_low_light(self) -> bool:
+        return self._check_low_light and self._brightness_monitor.is_low_light()
+
+    def is_hidden(self) -> bool:
+        return self._hidden
 
     def hide(self) -> None:
         self._hidden = True
@@ -233,3 +268,9 @@ class View:
     def get_frame_size(self) -> Tuple[int, int]:
         return self._height, self._width
 
+    @staticmethod
+    def _copy_arg(value: Any) -> Any:
+        if isinstance(value, (dict, list, set)):
+            return value.copy()
+        return value
+
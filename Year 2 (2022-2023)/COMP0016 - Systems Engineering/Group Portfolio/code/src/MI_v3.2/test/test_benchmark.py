@@ -0,0 +1,65 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+
+from benchmark import NullEventHandlers, benchmark, read_frames
+
+SMOKE_TEST_MODE = "idle_hand"  # a mode with a single event, so only the hand module is loaded
+FRAME_COUNT = 4
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def setUp(self):
+        self.source = tempfile.mkdtemp()
+        for i in range(FRAME_COUNT):
+            frame = np.zeros((120, 160, 3), dtype=np.uint8)
+            cv2.rectangle(frame, (20 + 10 * i, 20), (60 + 10 * i, 80), (255, 255, 255), -1)
+            cv2.imwrite(os.path.join(self.source, f"frame_{i:02d}.png"), frame)
+
+    def tearDown(self):
+        shutil.rmtree(self.source)
+
+    def test_read_frames_in_name_order_as_recorded(self):
+        frames = list(read_frames(self.source))
+        self.assertEqual(len(frames), FRAME_COUNT)
+        # not mirrored: the white rectangle of the first frame starts at x = 20
+        self.assertEqual(frames[0][50, 20].tolist(), [255, 255, 255])
+        self.assertEqual(frames[0][50, 139].tolist(), [0, 0, 0])
+
+    def test_read_frames_from_directory_without_images_raises_error(self):
+        empty = tempfile.mkdtemp()
+        try:
+            with self.assertRaises(RuntimeError):
+                list(read_frames(empty))
+        finally:
+            shutil.rmtree(empty)
+
+    def test_benchmark_synthetic_frames(self):
+        recorder = benchmark(self.source, SMOKE_TEST_MODE, warmup=1, max_frames=None)
+        summary = recorder.get_summary()
+        self.assertIn("process_frame", summary)
+        self.assertEqual(summary["process_frame"]["count"], FRAME_COUNT - 1)
+
+    def test_benchmark_unknown_mode_raises_error(self):
+        with self.assertRaises(RuntimeError):
+            benchmark(self.source, "not_a_mode", warmup=0, max_frames=None)
+
+    def test_benchmark_without_frames_after_warmup_raises_error(self):
+        with self.assertRaises(RuntimeError):
+            benchmark(self.source, SMOKE_TEST_MODE, warmup=FRAME_COUNT, max_frames=None)
+
+    def test_null_event_handlers_count_the_triggers(self):
+        handlers = NullEventHandlers()
+        trigger = handlers.get_handler_func("DesktopMouse", "left_click")
+        trigger()
+        trigger(1, key="value")
+        self.assertEqual(handlers.triggered["DesktopMouse left_click"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
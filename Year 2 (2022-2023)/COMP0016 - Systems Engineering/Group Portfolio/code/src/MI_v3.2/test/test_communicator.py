@@ -1,7 +1,9 @@
 import json
 import os
 import unittest
+from unittest import mock
 
+import communicator
 from communicator import Communicator
 from scripts.tools.json_editors.json_encoder import JSONEncoder
 from .set_up_configs import *
@@ -158,6 +160,30 @@ class TestCommunicator(unittest.TestCase):
         out = cls.communicator.process_command("REMOVE: code/modes/basic_hand")
         cls.assertEqual(out, f"ERROR: {EXPECTED_ERRORS['bad_json']}")
 
+    def test_metrics_without_frames(cls):
+        out = cls.communicator.process_command("METRICS")
+        cls.assertEqual(out, "SUCCESS: No latency metrics recorded")
+
+    def test_stop_before_start(cls):
+        out = cls.communicator.process_command("STOP")
+        cls.assertEqual(out, "ERROR: MI is not running")
+
+    def test_reboot_before_start(cls):
+        out = cls.communicator.process_command("REBOOT")
+        cls.assertEqual(out, "ERROR: MI is not running")
+
+    def test_reboot_reports_stop_duration(cls):
+        with mock.patch.object(communicator.api, "stop", return_value=12.3) as stop, \
+                mock.patch.object(communicator.api, "start") as start:
+            out = cls.communicator.process_command("REBOOT")
+        cls.assertEqual(out, "SUCCESS: Rebooted (stopped in 12 ms)")
+        stop.assert_called_once_with()
+        start.assert_called_once_with()
+
+    def test_ready_before_start(cls):
+        out = cls.communicator.process_command("READY")
+        cls.assertEqual(out, "SUCCESS: {'modules': {}, 'first_frame_ms': None}")
+
 
 if __name__ == '__main__':
     unittest.main()
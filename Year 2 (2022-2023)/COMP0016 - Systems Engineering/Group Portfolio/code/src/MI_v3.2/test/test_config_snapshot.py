@@ -0,0 +1,78 @@
+import unittest
+
+from scripts.tools.config import ConfigSnapshot
+
+
+class TestConfigSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.data = {
+            "general": {"view": {"window_name": "MI", "size": [640, 480]}},
+            "modules": {"hand": {"max_num_hands": 2, "roi_tracking": {"enabled": False}}},
+        }
+        self.snapshot = ConfigSnapshot.from_data(self.data)
+
+    def test_get_flattened_paths(self):
+        self.assertEqual(self.snapshot.get("general/view/window_name"), "MI")
+        self.assertEqual(self.snapshot.get("modules/hand"), self.data["modules"]["hand"])
+        with self.assertRaises(KeyError):
+            self.snapshot.get("modules/body")
+
+    def test_later_changes_of_data_do_not_change_snapshot(self):
+        self.data["modules"]["hand"]["max_num_hands"] = 1
+        self.data["general"]["view"]["size"].append(3)
+        self.assertEqual(self.snapshot.get("modules/hand/max_num_hands"), 2)
+        self.assertEqual(self.snapshot.get("general/view/size"), [640, 480])
+
+    def test_changing_returned_objects_does_not_change_snapshot(self):
+        self.snapshot.get("modules/hand")["max_num_hands"] = 1
+        self.snapshot.get("modules")["hand"]["roi_tracking"]["enabled"] = True
+        self.snapshot.get("general/view/size").append(3)
+        self.assertEqual(self.snapshot.get("modules/hand/max_num_hands"), 2)
+        self.assertEqual(self.snapshot.get("modules/hand")["max_num_hands"], 2)
+        self.assertFalse(self.snapshot.get("modules/hand/roi_tracking/enabled"))
+        self.assertEqual(self.snapshot.get("general/view/size"), [640, 480])
+
+    def test_section_is_read_only(self):
+        section = self.snapshot.get_section("modules/hand")
+        self.assertEqual(section.max_num_hands, 2)
+        with self.assertRaises(TypeError):
+            section.roi_tracking["enabled"] = True
+        self.assertEqual(self.snapshot.get_section("general/view").size, (640, 480))
+
+    def test_updated(self):
+        updated = self.snapshot.updated("modules/hand/max_num_hands", 1)
+        self.assertEqual(updated.get("modules/hand/max_num_hands"), 1)
+        self.assertEqual(updated.get("modules/hand")["max_num_hands"], 1)
+        self.assertEqual(updated.get("modules")["hand"]["max_num_hands"], 1)
+        self.assertEqual(updated.get_version(), self.snapshot.get_version() + 1)
+        # the previous snapshot is left as it was
+        self.assertEqual(self.snapshot.get("modules/hand/max_num_hands"), 2)
+        self.assertEqual(self.snapshot.get("modules/hand")["max_num_hands"], 2)
+
+    def test_updated_json_object(self):
+        updated = self.snapshot.updated("modules/hand/roi_tracking", {"expansion": 2.0})
+        self.assertEqual(updated.get("modules/hand/roi_tracking/expansion"), 2.0)
+        with self.assertRaises(KeyError):
+            updated.get("modules/hand/roi_tracking/enabled")
+
+    def test_removed(self):
+        removed = self.snapshot.removed("modules/hand/roi_tracking")
+        with self.assertRaises(KeyError):
+            removed.get("modules/hand/roi_tracking")
+        with self.assertRaises(KeyError):
+            removed.get("modules/hand/roi_tracking/enabled")
+        self.assertNotIn("roi_tracking", removed.get("modules/hand"))
+        self.assertNotIn("roi_tracking", removed.get("modules")["hand"])
+        self.assertEqual(removed.get_version(), self.snapshot.get_version() + 1)
+        self.assertFalse(self.snapshot.get("modules/hand/roi_tracking/enabled"))
+
+    def test_removed_top_level_object(self):
+        removed = self.snapshot.removed("general")
+        with self.assertRaises(KeyError):
+            removed.get("general/view/window_name")
+        self.assertEqual(removed.get("modules/hand/max_num_hands"), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import threading
+import time
+import unittest
+
+from scripts.frame_pipeline import LatestQueue
+
+
+class TestLatestQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.queue = LatestQueue()
+
+    def test_put_get(self):
+        self.queue.put(1)
+        self.assertEqual(self.queue.get(0), 1)
+        self.assertEqual(self.queue.get_dropped(), 0)
+
+    def test_keeps_only_newest_item(self):
+        for item in range(3):
+            self.queue.put(item)
+        self.assertEqual(self.queue.get(0), 2)
+        self.assertEqual(self.queue.get_dropped(), 2)
+        # the item is taken
+        self.assertIsNone(self.queue.get(0))
+
+    def test_none_is_an_item(self):
+        self.queue.put(None)
+        self.queue.put("frame")
+        self.assertEqual(self.queue.get_dropped(), 1)
+        self.assertEqual(self.queue.get(0), "frame")
+
+    def test_get_timeout(self):
+        start = time.perf_counter()
+        self.assertIsNone(self.queue.get(0.05))
+        self.assertGreaterEqual(time.perf_counter() - start, 0.04)
+
+    def test_get_waits_for_put(self):
+        timer = threading.Timer(0.05, self.queue.put, args=("frame",))
+        timer.start()
+        try:
+            self.assertEqual(self.queue.get(5), "frame")
+        finally:
+            timer.cancel()
+
+    def test_close_wakes_waiting_get(self):
+        results = []
+        thread = threading.Thread(target=lambda: results.append(self.queue.get()))
+        thread.start()
+        time.sleep(0.05)
+        self.queue.close()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(results, [None])
+
+    def test_close_drops_item(self):
+        self.queue.put("frame")
+        self.queue.close()
+        self.assertIsNone(self.queue.get())
+
+
+if __name__ == '__main__':
+    unittest.main()
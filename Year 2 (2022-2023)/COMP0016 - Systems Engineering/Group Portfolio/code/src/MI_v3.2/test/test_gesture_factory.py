@@ -0,0 +1,134 @@
+import itertools
+import unittest
+
+from scripts.core.gesture import Gesture
+from scripts.core.gesture_factory import GestureFactory, Primitive, PrimitiveIndex
+from scripts.core.position import Position
+from scripts.core.position_tracker import PositionTracker
+from scripts.core.raw_data import RawData
+
+PRIMITIVES = ("index_pinched", "middle_pinched", "palm_facing_camera")
+
+
+class StatePosition(Position):
+    """Position whose primitives are given as the raw data, counting how often each one is read"""
+
+    def __init__(self, raw_data, used_primitives=None):
+        self._states = dict(raw_data) if raw_data is not None else {}
+        self.reads = {}
+
+    def get_primitive(self, name):
+        self.reads[name] = self.reads.get(name, 0) + 1
+        return self._states.get(name)
+
+    def get_primitives_names(self):
+        return set(self._states)
+
+
+def old_check_position(primitives, position):
+    # how GestureFactory checked a position before the primitives were compiled to bitmasks
+    if position is None: return False
+    for primitive in primitives:
+        if position.get_primitive(primitive.name) != primitive.state:
+            return False
+    return True
+
+
+def all_gestures():
+    # every combination of the primitives, each required to be True or False
+    for size in range(len(PRIMITIVES) + 1):
+        for names in itertools.combinations(PRIMITIVES, size):
+            for states in itertools.product((True, False), repeat=size):
+                yield {Primitive(name, state) for name, state in zip(names, states)}
+
+
+def all_positions():
+    # every combination of the primitives being True, False, None or not calculated at all
+    for states in itertools.product((True, False, None, "missing"), repeat=len(PRIMITIVES)):
+        yield {name: state for name, state in zip(PRIMITIVES, states) if state != "missing"}
+
+
+def make_tracker(states):
+    raw_data = RawData()
+    for name, state in states.items():
+        raw_data.add_landmark("Left", name, state)
+    tracker = PositionTracker("Left", StatePosition)
+    tracker.update(raw_data)
+    return tracker
+
+
+class TestPrimitiveIndex(unittest.TestCase):
+
+    def test_same_matches_as_checking_every_primitive(self):
+        index = PrimitiveIndex()
+        factories = [(GestureFactory(str(i), Gesture, primitives, index), primitives)
+                     for i, primitives in enumerate(all_gestures())]
+        for states in all_positions():
+            tracker = make_tracker(states)
+            for factory, primitives in factories:
+                expected = old_check_position(primitives, StatePosition(states))
+                gesture = factory.update(tracker)
+                self.assertEqual(gesture is not None, expected, f"{primitives} on {states}")
+
+    def test_same_matches_with_position_encoded_once(self):
+        index = PrimitiveIndex()
+        factories = [(GestureFactory(str(i), Gesture, primitives, index), primitives)
+                     for i, primitives in enumerate(all_gestures())]
+        used_mask = index.get_mask(PRIMITIVES)
+        for states in all_positions():
+            tracker = make_tracker(states)
+            encoded = index.encode(tracker.get_current_position(), used_mask)
+            for factory, primitives in factories:
+                expected = old_check_position(primitives, StatePosition(states))
+                self.assertEqual(factory.matches(*encoded), expected, f"{primitives} on {states}")
+                self.assertEqual(factory.update(tracker, encoded) is not None, expected)
+
+    def test_no_position_matches_nothing(self):
+        factory = GestureFactory("empty", Gesture, set())
+        self.assertIsNone(factory.update(PositionTracker("Left", StatePosition)))
+
+    def test_each_primitive_read_once_per_position(self):
+        index = PrimitiveIndex()
+        factories = [GestureFactory(str(i), Gesture, primitives, index) for i, primitives in enumerate(all_gestures())]
+        tracker = make_tracker({name: True for name in PRIMITIVES})
+        for factory in factories:
+            factory.update(tracker)
+        self.assertEqual(tracker.get_current_position().reads, {name: 1 for name in PRIMITIVES})
+
+    def test_primitives_of_no_gesture_are_not_read(self):
+        factory = GestureFactory("pinch", Gesture, {Primitive("index_pinched", True)})
+        tracker = make_tracker({name: True for name in PRIMITIVES})
+        self.assertIsNotNone(factory.update(tracker))
+        self.assertEqual(tracker.get_current_position().reads, {"index_pinched": 1})
+
+    def test_compile(self):
+        index = PrimitiveIndex()
+        mask, expected = index.compile({Primitive("index_pinched", True), Primitive("middle_pinched", False)})
+        self.assertEqual(bin(mask).count("1"), 2)
+        self.assertEqual(bin(expected).count("1"), 1)
+        self.assertEqual(expected & ~mask, 0)
+        # the bits of primitives compiled before are kept
+        self.assertEqual(index.compile({Primitive("index_pinched", True)}), (expected, expected))
+        self.assertEqual(index.compile(set()), (0, 0))
+
+    def test_compile_state_no_position_can_be_in(self):
+        index = PrimitiveIndex()
+        self.assertIsNone(index.compile({Primitive("index_pinched", None)}))
+        factory = GestureFactory("never", Gesture, {Primitive("index_pinched", None)}, index)
+        self.assertIsNone(factory.update(make_tracker({})))
+
+    def test_encode(self):
+        index = PrimitiveIndex()
+        mask, _ = index.compile({Primitive(name, True) for name in PRIMITIVES})
+        position = StatePosition({"index_pinched": True, "middle_pinched": False})
+        known, true = index.encode(position, mask)
+        index_bit = index.compile({Primitive("index_pinched", True)})[0]
+        middle_bit = index.compile({Primitive("middle_pinched", True)})[0]
+        self.assertEqual(known, index_bit | middle_bit)
+        self.assertEqual(true, index_bit)
+        # only the bits within the mask are returned
+        self.assertEqual(index.encode(position, middle_bit), (middle_bit, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
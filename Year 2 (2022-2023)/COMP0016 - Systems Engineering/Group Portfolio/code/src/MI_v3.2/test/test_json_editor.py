@@ -0,0 +1,56 @@
+import unittest
+
+from scripts.tools.json_editors.json_editor import _WriteBehindSaver
+
+
+class FailingEditor:
+    """Stands in for a JSONEditor whose file cannot be written the first failures times"""
+
+    def __init__(self, path, failures):
+        self.path = path
+        self.failures = failures
+        self.saves = 0
+
+    def save(self):
+        if self.failures:
+            self.failures -= 1
+            raise OSError(f"Cannot write {self.path}")
+        self.saves += 1
+
+
+class TestWriteBehindSaver(unittest.TestCase):
+
+    def setUp(self):
+        self.saver = _WriteBehindSaver()
+
+    def test_flush_saves_pending_editors_once(self):
+        editor = FailingEditor("a.json", failures=0)
+        self.saver.save_later(editor)
+        self.saver.save_later(editor)
+        self.saver.flush()
+        self.saver.flush()
+        self.assertEqual(editor.saves, 1)
+
+    def test_failed_save_stays_pending(self):
+        failing = FailingEditor("a.json", failures=1)
+        other = FailingEditor("b.json", failures=0)
+        self.saver.save_later(failing)
+        self.saver.save_later(other)
+        with self.assertRaises(OSError):
+            self.saver.flush()
+        # the other editor is still saved, and the failed one is saved on the next flush
+        self.assertEqual(other.saves, 1)
+        self.assertEqual(failing.saves, 0)
+        self.saver.flush()
+        self.assertEqual(failing.saves, 1)
+
+    def test_cancel(self):
+        editor = FailingEditor("a.json", failures=0)
+        self.saver.save_later(editor)
+        self.saver.cancel(editor)
+        self.saver.flush()
+        self.assertEqual(editor.saves, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
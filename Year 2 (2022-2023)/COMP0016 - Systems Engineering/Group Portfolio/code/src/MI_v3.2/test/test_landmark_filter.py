@@ -0,0 +1,170 @@
+import unittest
+
+import numpy as np
+
+from scripts.core.landmark_filter import LandmarkFilter, OneEuroFilter
+from scripts.core.raw_data import RawData
+
+FRAME_TIME = 1 / 30
+ROWS = {"wrist": 0, "index_tip": 1}
+
+
+def jittery(n, centre=0.5, jitter=0.01):
+    # values alternating around the centre, as landmarks held still jitter
+    return [np.array([centre + jitter * (-1) ** i]) for i in range(n)]
+
+
+class TestOneEuroFilter(unittest.TestCase):
+
+    def test_first_values_unchanged(self):
+        values = np.array([[0.1, 0.2], [0.3, 0.4]])
+        np.testing.assert_array_equal(OneEuroFilter().filter(values, 0), values)
+
+    def test_constant_values_unchanged(self):
+        one_euro_filter = OneEuroFilter()
+        for i in range(10):
+            filtered = one_euro_filter.filter(np.array([0.5, 0.25]), i * FRAME_TIME)
+        np.testing.assert_allclose(filtered, [0.5, 0.25])
+
+    def test_removes_jitter(self):
+        one_euro_filter = OneEuroFilter(min_cutoff=1.0, beta=0.0)
+        filtered = [one_euro_filter.filter(values, i * FRAME_TIME)[0] for i, values in enumerate(jittery(60))]
+        self.assertLess(np.ptp(filtered[30:]), 0.1 * 0.02)
+        self.assertAlmostEqual(np.mean(filtered[30:]), 0.5, places=2)
+
+    def test_beta_lags_less_while_moving(self):
+        def lag(beta):
+            one_euro_filter = OneEuroFilter(min_cutoff=1.0, beta=beta)
+            for i in range(30):
+                filtered = one_euro_filter.filter(np.array([i * 0.01]), i * FRAME_TIME)
+            return 29 * 0.01 - filtered[0]
+        self.assertGreater(lag(0.0), 0)
+        self.assertLess(lag(10.0), lag(0.0) / 2)
+
+    def test_each_element_filtered_on_its_own(self):
+        one_euro_filter = OneEuroFilter()
+        one_euro_filter.filter(np.array([0.0, 0.5]), 0)
+        filtered = one_euro_filter.filter(np.array([1.0, 0.5]), FRAME_TIME)
+        self.assertEqual(filtered[1], 0.5)
+        self.assertTrue(0 < filtered[0] < 1)
+
+    def test_shape_change_starts_over(self):
+        one_euro_filter = OneEuroFilter()
+        one_euro_filter.filter(np.array([0.0, 0.0]), 0)
+        values = np.array([1.0, 1.0, 1.0])
+        np.testing.assert_array_equal(one_euro_filter.filter(values, FRAME_TIME), values)
+
+    def test_reset(self):
+        one_euro_filter = OneEuroFilter()
+        one_euro_filter.filter(np.array([0.0]), 0)
+        one_euro_filter.reset()
+        np.testing.assert_array_equal(one_euro_filter.filter(np.array([1.0]), FRAME_TIME), [1.0])
+
+    def test_same_timestamp(self):
+        one_euro_filter = OneEuroFilter()
+        one_euro_filter.filter(np.array([0.0]), 1.0)
+        filtered = one_euro_filter.filter(np.array([1.0]), 1.0)
+        self.assertTrue(np.all(np.isfinite(filtered)))
+
+    def test_out(self):
+        one_euro_filter = OneEuroFilter()
+        values = np.array([0.25, 0.5])
+        self.assertIs(one_euro_filter.filter(values, 0, out=values), values)
+        # the filter keeps its own copy of the values
+        values[0] = 1.0
+        self.assertEqual(one_euro_filter.filter(np.array([0.25, 0.5]), FRAME_TIME)[0], 0.25)
+
+
+class TestLandmarkFilter(unittest.TestCase):
+
+    def setUp(self):
+        self.landmark_filter = LandmarkFilter(min_cutoff=1.0, beta=0.0)
+
+    def apply(self, raw_data, frame_nr):
+        self.landmark_filter.apply(raw_data, frame_nr * FRAME_TIME)
+        return raw_data
+
+    @staticmethod
+    def body(x, **extra):
+        raw_data = RawData()
+        raw_data.add_landmark("body", "nose", np.array([x, 0.5]))
+        for name, value in extra.items():
+            raw_data.add_landmark("body", name, value)
+        return raw_data
+
+    @staticmethod
+    def hand(x, name="Left"):
+        raw_data = RawData()
+        raw_data.add_landmark_array(name, np.array([[x, 0.5, 0.0], [x, 0.25, 0.0]]), ROWS)
+        raw_data.get_data(name)["palm_center"] = np.array([x, 0.375, 0.0])
+        return raw_data
+
+    def test_landmarks_filtered(self):
+        self.apply(self.body(0.0), 0)
+        nose = self.apply(self.body(1.0), 1).get_landmark("body", "nose")
+        self.assertTrue(0 < nose[0] < 1)
+        self.assertEqual(nose[1], 0.5)
+
+    def test_only_float_coordinates_filtered(self):
+        box = np.array([10, 20, 30, 40])
+        self.apply(self.body(0.0, box=box, depth=0.0, phrase="hello"), 0)
+        raw_data = self.apply(self.body(1.0, box=box + 100, depth=1.0, phrase="bye"), 1)
+        np.testing.assert_array_equal(raw_data.get_landmark("body", "box"), box + 100)
+        self.assertEqual(raw_data.get_landmark("body", "phrase"), "bye")
+        depth = raw_data.get_landmark("body", "depth")
+        self.assertIsInstance(depth, float)
+        self.assertTrue(0 < depth < 1)
+
+    def test_landmark_array(self):
+        self.apply(self.hand(0.0), 0)
+        raw_data = self.hand(1.0)
+        unfiltered = raw_data.get_array("Left")
+        self.apply(raw_data, 1)
+        filtered = raw_data.get_array("Left")
+        # the array the detector added is not changed, it may be used for several body parts
+        np.testing.assert_array_equal(unfiltered[:, 0], [1.0, 1.0])
+        self.assertTrue(np.all((0 < filtered[:, 0]) & (filtered[:, 0] < 1)))
+        self.assertEqual(raw_data.get_data("Left").get_rows(), ROWS)
+        np.testing.assert_array_equal(raw_data.get_landmark("Left", "index_tip"), filtered[1])
+        palm_center = raw_data.get_landmark("Left", "palm_center")
+        self.assertAlmostEqual(palm_center[0], filtered[0, 0])
+        self.assertEqual(palm_center[1], 0.375)
+
+    def test_each_bodypart_filtered_on_its_own(self):
+        raw_data = self.hand(0.0, "Left")
+        raw_data.combine(self.hand(0.5, "Right"))
+        self.apply(raw_data, 0)
+        raw_data = self.hand(0.0, "Left")
+        raw_data.combine(self.hand(0.5, "Right"))
+        self.apply(raw_data, 1)
+        np.testing.assert_allclose(raw_data.get_array("Left")[:, 0], 0.0)
+        np.testing.assert_allclose(raw_data.get_array("Right")[:, 0], 0.5)
+
+    def test_layout_change_starts_over(self):
+        self.apply(self.body(0.0), 0)
+        self.apply(self.body(0.0), 1)
+        # a landmark that was not detected before
+        raw_data = self.apply(self.body(1.0, left_wrist=np.array([0.25, 0.25])), 2)
+        np.testing.assert_array_equal(raw_data.get_landmark("body", "nose"), [1.0, 0.5])
+        np.testing.assert_array_equal(raw_data.get_landmark("body", "left_wrist"), [0.25, 0.25])
+        # and the next frame is filtered again
+        raw_data = self.apply(self.body(0.0, left_wrist=np.array([0.25, 0.25])), 3)
+        self.assertTrue(0 < raw_data.get_landmark("body", "nose")[0] < 1)
+
+    def test_lost_bodypart_starts_over(self):
+        self.apply(self.hand(0.0), 0)
+        self.apply(self.hand(0.0), 1)
+        # the hand is lost for a frame and found again elsewhere, it does not slide over from where it was lost
+        self.apply(RawData(), 2)
+        raw_data = self.apply(self.hand(1.0), 3)
+        np.testing.assert_array_equal(raw_data.get_array("Left")[:, 0], [1.0, 1.0])
+
+    def test_reset(self):
+        self.apply(self.body(0.0), 0)
+        self.landmark_filter.reset()
+        raw_data = self.apply(self.body(1.0), 1)
+        np.testing.assert_array_equal(raw_data.get_landmark("body", "nose"), [1.0, 0.5])
+
+
+if __name__ == '__main__':
+    unittest.main()
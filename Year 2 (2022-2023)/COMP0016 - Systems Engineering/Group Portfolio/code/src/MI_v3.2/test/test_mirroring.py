@@ -0,0 +1,62 @@
+import unittest
+
+import numpy as np
+
+from scripts.core.mirroring import mirror_name, mirror_x
+
+
+class TestMirrorX(unittest.TestCase):
+
+    def test_point(self):
+        np.testing.assert_allclose(mirror_x(np.array([0.25, 0.5])), [0.75, 0.5])
+
+    def test_points_with_z(self):
+        points = np.array([[0.0, 0.1, -0.2], [1.0, 0.9, 0.3]])
+        np.testing.assert_allclose(mirror_x(points), [[1.0, 0.1, -0.2], [0.0, 0.9, 0.3]])
+        # a new array is returned
+        np.testing.assert_allclose(points[:, 0], [0.0, 1.0])
+
+    def test_pixels(self):
+        np.testing.assert_allclose(mirror_x(np.array([[10, 20]]), width=640), [[630, 20]])
+
+    def test_twice_is_the_same(self):
+        points = np.random.default_rng(0).random((21, 3))
+        np.testing.assert_allclose(mirror_x(mirror_x(points)), points)
+
+    def test_in_place(self):
+        points = np.array([[0.25, 0.5, 0.1]])
+        self.assertIs(mirror_x(points, out=points), points)
+        np.testing.assert_allclose(points, [[0.75, 0.5, 0.1]])
+
+    def test_out(self):
+        points = np.array([[0.25, 0.5]])
+        out = np.empty_like(points)
+        self.assertIs(mirror_x(points, out=out), out)
+        np.testing.assert_allclose(out, [[0.75, 0.5]])
+        np.testing.assert_allclose(points, [[0.25, 0.5]])
+
+
+class TestMirrorName(unittest.TestCase):
+
+    def test_labels(self):
+        self.assertEqual(mirror_name("Left"), "Right")
+        self.assertEqual(mirror_name("Right"), "Left")
+
+    def test_landmark_names(self):
+        self.assertEqual(mirror_name("left_shoulder"), "right_shoulder")
+        self.assertEqual(mirror_name("left-eye-top-right"), "right-eye-top-left")
+        self.assertEqual(mirror_name("lip-bottom-left"), "lip-bottom-right")
+        self.assertEqual(mirror_name("left_eye_OpenVino"), "right_eye_OpenVino")
+        self.assertEqual(mirror_name("upperLeft"), "upperRight")
+
+    def test_names_without_a_side(self):
+        self.assertEqual(mirror_name("nose"), "nose")
+        self.assertEqual(mirror_name("bright_spot"), "bright_spot")
+
+    def test_twice_is_the_same(self):
+        for name in ("left-eyebrow-top-right", "Right", "mouth_left", "nose"):
+            self.assertEqual(mirror_name(mirror_name(name)), name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+from scripts.core.module_schedule import ModuleSchedule
+
+FRAME_TIME = 1 / 16  # seconds between the frames of the tests, exact in binary so no rounding gets in the way
+
+
+def updated_frames(schedule, frame_times):
+    return [i for i, now in enumerate(frame_times) if schedule.should_update(now)]
+
+
+class TestModuleSchedule(unittest.TestCase):
+
+    def test_every_frame_by_default(self):
+        schedule = ModuleSchedule()
+        self.assertTrue(schedule.is_every_frame())
+        self.assertEqual(updated_frames(schedule, [i * FRAME_TIME for i in range(5)]), [0, 1, 2, 3, 4])
+
+    def test_frame_stride(self):
+        schedule = ModuleSchedule(frame_stride=3)
+        self.assertFalse(schedule.is_every_frame())
+        self.assertEqual(updated_frames(schedule, [i * FRAME_TIME for i in range(10)]), [0, 3, 6, 9])
+
+    def test_invalid_frame_stride_is_every_frame(self):
+        self.assertTrue(ModuleSchedule(frame_stride=0).is_every_frame())
+
+    def test_max_update_rate(self):
+        schedule = ModuleSchedule(max_update_rate=4)
+        self.assertFalse(schedule.is_every_frame())
+        self.assertEqual(updated_frames(schedule, [i * FRAME_TIME for i in range(16)]), [0, 4, 8, 12])
+
+    def test_first_frame_always_updated(self):
+        self.assertTrue(ModuleSchedule(frame_stride=5, max_update_rate=1).should_update(123.0))
+
+    def test_late_frames_keep_average_rate(self):
+        schedule = ModuleSchedule(max_update_rate=4)
+        # the update due at 0.25 s comes late at 0.3125 s, the next one is still due at 0.5 s
+        self.assertEqual(updated_frames(schedule, [0, 0.3125, 0.4375, 0.5]), [0, 1, 3])
+
+    def test_no_burst_of_updates_after_a_pause(self):
+        schedule = ModuleSchedule(max_update_rate=4)
+        self.assertEqual(updated_frames(schedule, [0, 10, 10 + FRAME_TIME, 10 + 2 * FRAME_TIME, 10.25]), [0, 1, 4])
+
+    def test_frame_stride_and_max_update_rate(self):
+        schedule = ModuleSchedule(frame_stride=2, max_update_rate=4)
+        # every 2nd frame would be 8 updates per second, the rate limits it to 4
+        self.assertEqual(updated_frames(schedule, [i * FRAME_TIME for i in range(16)]), [0, 4, 8, 12])
+        schedule = ModuleSchedule(frame_stride=2, max_update_rate=4)
+        # at 4 frames per second the stride limits it to 2
+        self.assertEqual(updated_frames(schedule, [i * 0.25 for i in range(8)]), [0, 2, 4, 6])
+
+
+if __name__ == '__main__':
+    unittest.main()
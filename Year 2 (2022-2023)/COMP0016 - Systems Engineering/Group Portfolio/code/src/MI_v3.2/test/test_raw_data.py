@@ -0,0 +1,87 @@
+import unittest
+
+import numpy as np
+
+from scripts.core.raw_data import LandmarkArray, RawData
+
+ROWS = {"wrist": 0, "thumb_tip": 1, "index_tip": 2}
+
+
+class TestLandmarkArray(unittest.TestCase):
+
+    def setUp(self):
+        self.array = np.arange(12, dtype=float).reshape(4, 3)  # the last row has no name
+        self.landmarks = LandmarkArray(self.array, ROWS)
+
+    def test_rows_by_name(self):
+        self.assertEqual(len(self.landmarks), 3)
+        self.assertEqual(list(self.landmarks), ["wrist", "thumb_tip", "index_tip"])
+        np.testing.assert_array_equal(self.landmarks["thumb_tip"], [3, 4, 5])
+        self.assertIn("index_tip", self.landmarks)
+        self.assertNotIn("pinky_tip", self.landmarks)
+        with self.assertRaises(KeyError):
+            self.landmarks["pinky_tip"]
+        self.assertIsNone(self.landmarks.get("pinky_tip"))
+
+    def test_rows_are_views_of_the_array(self):
+        self.landmarks["wrist"][0] = -1
+        self.assertEqual(self.array[0, 0], -1)
+        self.assertIs(self.landmarks.get_array(), self.array)
+
+    def test_extra_landmarks(self):
+        self.landmarks["palm_center"] = np.array([0.5, 0.5, 0])
+        self.assertEqual(len(self.landmarks), 4)
+        self.assertEqual(list(self.landmarks)[-1], "palm_center")
+        np.testing.assert_array_equal(self.landmarks["palm_center"], [0.5, 0.5, 0])
+        # the array itself is not changed
+        self.assertEqual(self.landmarks.get_array().shape, (4, 3))
+
+    def test_setting_a_row_replaces_it_without_changing_the_array(self):
+        self.landmarks["wrist"] = np.array([9.0, 9.0, 9.0])
+        np.testing.assert_array_equal(self.landmarks["wrist"], [9, 9, 9])
+        np.testing.assert_array_equal(self.array[0], [0, 1, 2])
+        self.assertEqual(len(self.landmarks), 3)
+        self.assertEqual(list(self.landmarks).count("wrist"), 1)
+
+    def test_delete(self):
+        self.landmarks["palm_center"] = np.zeros(3)
+        del self.landmarks["palm_center"]
+        del self.landmarks["thumb_tip"]
+        self.assertEqual(list(self.landmarks), ["wrist", "index_tip"])
+        with self.assertRaises(KeyError):
+            del self.landmarks["thumb_tip"]
+        # the rows passed in (e.g. shared with other hands) are not changed
+        self.assertIn("thumb_tip", ROWS)
+
+    def test_delete_replaced_row(self):
+        self.landmarks["wrist"] = np.zeros(3)
+        del self.landmarks["wrist"]
+        self.assertNotIn("wrist", self.landmarks)
+        self.assertEqual(len(self.landmarks), 2)
+
+    def test_mapping_methods(self):
+        self.assertEqual(set(self.landmarks.keys()), set(ROWS))
+        self.assertEqual(dict(self.landmarks).keys(), ROWS.keys())
+        np.testing.assert_array_equal(self.landmarks.pop("index_tip"), [6, 7, 8])
+        self.assertIsNone(self.landmarks.pop("index_tip", None))
+        self.landmarks.update({"palm_normal": np.ones(3)})
+        self.assertIn("palm_normal", self.landmarks)
+
+    def test_stack(self):
+        np.testing.assert_array_equal(self.landmarks.stack(["index_tip", "wrist"]), [[6, 7, 8], [0, 1, 2]])
+        self.landmarks["palm_center"] = np.array([1.0, 1.0, 1.0])
+        np.testing.assert_array_equal(self.landmarks.stack(["palm_center", "wrist"]), [[1, 1, 1], [0, 1, 2]])
+
+    def test_raw_data(self):
+        raw_data = RawData()
+        raw_data.add_landmark_array("Left", self.array, ROWS)
+        raw_data.add_landmark("body", "nose", np.zeros(3))
+        self.assertIs(raw_data.get_array("Left"), self.array)
+        self.assertIsNone(raw_data.get_array("body"))
+        self.assertIsNone(raw_data.get_array("Right"))
+        np.testing.assert_array_equal(raw_data.get_landmark("Left", "index_tip"), [6, 7, 8])
+        self.assertIsNone(raw_data.get_landmark("Left", "pinky_tip"))
+
+
+if __name__ == '__main__':
+    unittest.main()
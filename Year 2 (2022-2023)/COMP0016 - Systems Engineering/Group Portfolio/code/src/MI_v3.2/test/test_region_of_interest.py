@@ -0,0 +1,96 @@
+import unittest
+
+import numpy as np
+
+from scripts.core.region_of_interest import RegionOfInterestTracker
+
+HEIGHT = 480
+WIDTH = 640
+
+
+class TestRegionOfInterestTracker(unittest.TestCase):
+
+    def setUp(self):
+        self.tracker = RegionOfInterestTracker(expansion=2.0, min_size=0.1, redetect_interval=5)
+
+    def test_whole_frame_without_landmarks(self):
+        self.assertIsNone(self.tracker.get_region(HEIGHT, WIDTH))
+        self.tracker.update(None)
+        self.assertIsNone(self.tracker.get_region(HEIGHT, WIDTH))
+        self.tracker.update(np.empty((0, 2)))
+        self.assertIsNone(self.tracker.get_region(HEIGHT, WIDTH))
+
+    def test_region_around_landmarks(self):
+        self.tracker.update(np.array([[0.375, 0.375], [0.5, 0.5]]))
+        # twice the size of the box, around its centre
+        self.assertEqual(self.tracker.get_region(HEIGHT, WIDTH), (200, 150, 360, 270))
+
+    def test_region_clipped_at_frame_edges(self):
+        self.tracker.update(np.array([[0.0, 0.0], [0.125, 0.125]]))
+        self.assertEqual(self.tracker.get_region(HEIGHT, WIDTH), (0, 0, 120, 90))
+        self.tracker.reset()
+        self.tracker.update(np.array([[0.875, 0.875], [1.0, 1.0]]))
+        self.assertEqual(self.tracker.get_region(HEIGHT, WIDTH), (520, 390, WIDTH, HEIGHT))
+
+    def test_region_at_least_min_size(self):
+        self.tracker.update(np.array([[0.5, 0.5], [0.51, 0.51]]))
+        x_min, y_min, x_max, y_max = self.tracker.get_region(HEIGHT, WIDTH)
+        self.assertGreaterEqual(x_max - x_min, 0.1 * WIDTH - 1)
+        self.assertGreaterEqual(y_max - y_min, 0.1 * HEIGHT - 1)
+
+    def test_whole_frame_if_region_is_most_of_it(self):
+        self.tracker.update(np.array([[0.1, 0.1], [0.9, 0.9]]))
+        self.assertIsNone(self.tracker.get_region(HEIGHT, WIDTH))
+
+    def test_region_kept_while_landmarks_stay_inside(self):
+        self.tracker.update(np.array([[0.4, 0.4], [0.5, 0.5]]))
+        region = self.tracker.get_region(HEIGHT, WIDTH)
+        self.tracker.update(np.array([[0.41, 0.41], [0.51, 0.51]]))
+        self.assertEqual(self.tracker.get_region(HEIGHT, WIDTH), region)
+        self.tracker.update(np.array([[0.6, 0.6], [0.7, 0.7]]))
+        self.assertNotEqual(self.tracker.get_region(HEIGHT, WIDTH), region)
+
+    def test_whole_frame_every_redetect_interval(self):
+        points = np.array([[0.4, 0.4], [0.5, 0.5]])
+        self.tracker.update(points)
+        regions = []
+        for _ in range(10):
+            regions.append(self.tracker.get_region(HEIGHT, WIDTH))
+            self.tracker.update(points)
+        self.assertEqual([region is None for region in regions], [False, False, False, False, True] * 2)
+
+    def test_use_full_frame_on_next_frame(self):
+        points = np.array([[0.4, 0.4], [0.5, 0.5]])
+        self.tracker.update(points)
+        self.assertIsNotNone(self.tracker.get_region(HEIGHT, WIDTH))
+        self.tracker.use_full_frame()
+        self.assertIsNone(self.tracker.get_region(HEIGHT, WIDTH))
+        # found again on the whole frame, which also restarts the redetect interval
+        self.tracker.update(points)
+        regions = [self.tracker.get_region(HEIGHT, WIDTH) for _ in range(5)]
+        self.assertEqual([region is None for region in regions], [False, False, False, False, True])
+
+    def test_to_frame_without_region(self):
+        points = np.array([[0.25, 0.75, 0.1]])
+        self.assertIs(RegionOfInterestTracker.to_frame(points, None, HEIGHT, WIDTH), points)
+
+    def test_to_frame_round_trip(self):
+        region = (160, 120, 480, 360)
+        # landmarks in the whole frame, and the same landmarks normalised within the region
+        in_frame = np.array([[0.25, 0.25, -0.05], [0.5, 0.5, 0.0], [0.75, 0.75, 0.1]])
+        in_region = np.array([[0.0, 0.0, -0.1], [0.5, 0.5, 0.0], [1.0, 1.0, 0.2]])
+        mapped = RegionOfInterestTracker.to_frame(in_region, region, HEIGHT, WIDTH)
+        np.testing.assert_allclose(mapped, in_frame)
+        np.testing.assert_allclose(RegionOfInterestTracker.to_frame(in_region[:, :2], region, HEIGHT, WIDTH), in_frame[:, :2])
+
+    def test_to_frame_of_region_from_tracker(self):
+        self.tracker.update(np.array([[0.0, 0.0], [0.1, 0.1]]))
+        region = self.tracker.get_region(HEIGHT, WIDTH)
+        # the corners of the region are within the frame, so the clipped region is mapped back to the frame
+        corners = RegionOfInterestTracker.to_frame(np.array([[0.0, 0.0], [1.0, 1.0]]), region, HEIGHT, WIDTH)
+        np.testing.assert_allclose(corners, [[region[0] / WIDTH, region[1] / HEIGHT], [region[2] / WIDTH, region[3] / HEIGHT]])
+        self.assertTrue(np.all((corners >= 0) & (corners <= 1)))
+
+
+if __name__ == '__main__':
+    unittest.main()